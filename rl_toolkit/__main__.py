@@ -1,4 +1,5 @@
 import argparse
+import os
 
 import yaml
 
@@ -29,6 +30,12 @@ def main():
         help="Method (SAC, DQN, etc.)",
         required=True,
     )
+    my_parser.add_argument(
+        "--env_kwargs",
+        type=yaml.safe_load,
+        help="Keyword arguments of the environment in YAML, override the Environment section of config (e.g. '{control_rate: 50.0}')",  # noqa
+        default=None,
+    )
 
     # create sub-parser for selecting mode
     sub_parsers = my_parser.add_subparsers(
@@ -46,6 +53,32 @@ def main():
     )
     parser_server.add_argument("--model_path", type=str, help="Path to saved model")
 
+    # create the parser for the "inference" sub-command
+    parser_inference = sub_parsers.add_parser(
+        "inference",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Batched inference server for the agents",
+    )
+    parser_inference.add_argument(
+        "--db_server",
+        type=str,
+        help="Database server name or IP address (e.g. localhost or 192.168.1.1)",
+        default="localhost",
+    )
+
+    # create the parser for the "aggregator" sub-command
+    parser_aggregator = sub_parsers.add_parser(
+        "aggregator",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Node-local proxy merging the inserts of the agents and caching the variables",
+    )
+    parser_aggregator.add_argument(
+        "--db_server",
+        type=str,
+        help="Database server name or IP address (e.g. localhost or 192.168.1.1)",
+        default="localhost",
+    )
+
     # create the parser for the "agent" sub-command
     parser_agent = sub_parsers.add_parser(
         "agent",
@@ -58,6 +91,105 @@ def main():
         help="Database server name or IP address (e.g. localhost or 192.168.1.1)",
         default="localhost",
     )
+    parser_agent.add_argument(
+        "--inference_server",
+        type=str,
+        help="Inference server name or IP address, the policy runs remotely (e.g. localhost or 192.168.1.1)",
+        default=None,
+    )
+    parser_agent.add_argument(
+        "--aggregator",
+        type=str,
+        help="Node-local aggregator (localhost), the agent inserts and reads the variables through it",
+        default=None,
+    )
+
+    # create the parser for the "agents" sub-command
+    parser_agents = sub_parsers.add_parser(
+        "agents",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Multiple agent processes with supervision",
+    )
+    parser_agents.add_argument(
+        "--db_server",
+        type=str,
+        help="Database server name or IP address (e.g. localhost or 192.168.1.1)",
+        default="localhost",
+    )
+    parser_agents.add_argument(
+        "-n",
+        "--num_workers",
+        "--num-workers",
+        type=int,
+        help="Number of agent processes",
+        default=os.cpu_count(),
+    )
+    parser_agents.add_argument(
+        "--pin_cores",
+        action=argparse.BooleanOptionalAction,
+        help="Pin each agent process to its own CPU core",
+        default=True,
+    )
+    parser_agents.add_argument(
+        "--max_restarts",
+        type=int,
+        help="Maximum number of restarts of crashed agents (negative value means unlimited)",
+        default=-1,
+    )
+    parser_agents.add_argument(
+        "--inference_server",
+        type=str,
+        help="Inference server name or IP address, the policy runs remotely (e.g. localhost or 192.168.1.1)",
+        default=None,
+    )
+    parser_agents.add_argument(
+        "--aggregator",
+        type=str,
+        help="Node-local aggregator (localhost), the agents insert and read the variables through it",
+        default=None,
+    )
+
+    # create the parser for the "prefill" sub-command
+    parser_prefill = sub_parsers.add_parser(
+        "prefill",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Fill the replay buffer with random transitions before the agents start",
+    )
+    parser_prefill.add_argument(
+        "--db_server",
+        type=str,
+        help="Database server name or IP address (e.g. localhost or 192.168.1.1)",
+        default="localhost",
+    )
+    parser_prefill.add_argument(
+        "-n",
+        "--num_workers",
+        "--num-workers",
+        type=int,
+        help="Number of worker processes",
+        default=os.cpu_count(),
+    )
+
+    # create the parser for the "benchmark" sub-command
+    parser_benchmark = sub_parsers.add_parser(
+        "benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Measure bytes per item and insert throughput of the replay chunking settings",
+    )
+    parser_benchmark.add_argument(
+        "-t",
+        "--num_steps",
+        type=int,
+        help="Number of inserted transitions per setting",
+        default=10000,
+    )
+    parser_benchmark.add_argument(
+        "--chunk_lengths",
+        type=int,
+        nargs="+",
+        help="Numbers of steps per chunk compared on all columns (besides the auto-tuned and configured chunking)",
+        default=[1, 4, 16, 64],
+    )
 
     # create the parser for the "learner" sub-command
     parser_learner = sub_parsers.add_parser(
@@ -72,6 +204,26 @@ def main():
         default="localhost",
     )
 
+    # create the parser for the "distill" sub-command
+    parser_distill = sub_parsers.add_parser(
+        "distill",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Distillation of the trained model into the smaller student",
+    )
+    parser_distill.add_argument(
+        "--db_server",
+        type=str,
+        help="Database server name or IP address (e.g. localhost or 192.168.1.1)",
+        default="localhost",
+    )
+    parser_distill.add_argument(
+        "-f",
+        "--model_path",
+        type=str,
+        help="Path to saved teacher model",
+        required=True,
+    )
+
     # create the parser for the "tester" sub-command
     parser_tester = sub_parsers.add_parser(
         "tester",
@@ -91,6 +243,53 @@ def main():
     parser_tester.add_argument(
         "-f", "--model_path", type=str, help="Path to saved model"
     )
+    parser_tester.add_argument(
+        "--student",
+        action="store_true",
+        help="The model is the distilled student (see the Distillation section of config)",
+    )
+
+    # create the parser for the "export" sub-command
+    parser_export = sub_parsers.add_parser(
+        "export",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        help="Export the deterministic policy as TFLite model",
+    )
+    parser_export.add_argument(
+        "-f", "--model_path", type=str, help="Path to saved model", required=True
+    )
+    parser_export.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="Path to the TFLite model",
+        default="policy.tflite",
+    )
+    parser_export.add_argument(
+        "-q",
+        "--quantization",
+        type=str,
+        choices=["none", "float16", "int8"],
+        help="Post-training quantization",
+        default="none",
+    )
+    parser_export.add_argument(
+        "--db_server",
+        type=str,
+        help="Database server name or IP address for the int8 calibration samples (e.g. localhost or 192.168.1.1)",
+        default="localhost",
+    )
+    parser_export.add_argument(
+        "--num_samples",
+        type=int,
+        help="Number of replay samples for the int8 calibration",
+        default=1000,
+    )
+    parser_export.add_argument(
+        "--student",
+        action="store_true",
+        help="The model is the distilled student (see the Distillation section of config)",
+    )
 
     # nacitaj zadane argumenty
     args = my_parser.parse_args()
@@ -99,11 +298,50 @@ def main():
     with open(args.config, "r") as f:
         config = yaml.load(f, Loader=yaml.Loader)
 
+    # pixel observations are encoded by the convolutional encoder
+    pixels = config["Model"].get("pixels", False)
+    encoder = config["Model"].get("Encoder") if pixels else None
+
+    # action repeat of the environment (optional)
+    action_repeat = config.get("ActionRepeat", {})
+    action_repeat = action_repeat.get(args.environment, action_repeat.get("default", 1))
+
+    # keyword arguments of the environment (optional)
+    env_kwargs = (config.get("Environment") or {}).get(args.environment)
+    if args.env_kwargs:
+        env_kwargs = {**(env_kwargs or {}), **args.env_kwargs}
+
+    # n-step return of the transitions
+    n_step = config["Learner"].get("n_step", 1)
+
+    # chunking of the replay inserts (optional)
+    chunk_length = config.get("Chunking")
+
+    # storage dtypes of the replay buffer (optional)
+    schema = config.get("Schema")
+
+    # prioritized experience replay (optional)
+    prioritized = config["Server"].get("prioritized", False)
+
     # select method
     if args.agent == "sac":
-        from rl_toolkit.agents.sac import Agent, Learner, Server, Tester
+        from rl_toolkit.agents.sac import (
+            Agent,
+            Distiller,
+            InferenceServer,
+            Learner,
+            Server,
+            Tester,
+        )
     elif args.agent == "dqn":
-        from rl_toolkit.agents.dueling_dqn import Agent, Learner, Server, Tester
+        from rl_toolkit.agents.dueling_dqn import (
+            Agent,
+            Distiller,
+            InferenceServer,
+            Learner,
+            Server,
+            Tester,
+        )
     else:
         raise ValueError(f"Unknown agent: {args.agent}")
 
@@ -112,6 +350,7 @@ def main():
         if args.agent == "sac":
             agent = Server(
                 env_name=args.environment,
+                env_kwargs=env_kwargs,
                 port=config["Server"]["port"],
                 actor_units=config["Model"]["Actor"]["units"],
                 critic_units=config["Model"]["Critic"]["units"],
@@ -126,6 +365,8 @@ def main():
                 gamma=config["Learner"]["gamma"],
                 tau=config["Learner"]["tau"],
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
                 init_alpha=config["Model"]["Alpha"]["init"],
                 init_noise=config["Model"]["Actor"]["init_noise"],
                 min_replay_size=config["Agent"]["warmup_steps"],
@@ -133,10 +374,15 @@ def main():
                 samples_per_insert=config["Server"]["samples_per_insert"],
                 actor_critic_path=args.model_path,
                 db_path=config["db_path"],
+                prioritized=prioritized,
+                priority_exponent=config["Server"].get("priority_exponent", 0.6),
+                distillation=config["Server"].get("distillation", False),
+                schema=schema,
             )
         elif args.agent == "dqn":
             agent = Server(
                 env_name=args.environment,
+                env_kwargs=env_kwargs,
                 port=config["Server"]["port"],
                 num_layers=config["Model"]["num_layers"],
                 embed_dim=config["Model"]["embed_dim"],
@@ -147,11 +393,18 @@ def main():
                 gamma=config["Learner"]["gamma"],
                 tau=config["Learner"]["tau"],
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
                 min_replay_size=config["Agent"]["warmup_steps"],
                 max_replay_size=config["Server"]["max_replay_size"],
                 samples_per_insert=config["Server"]["samples_per_insert"],
                 model_path=args.model_path,
                 db_path=config["db_path"],
+                prioritized=prioritized,
+                priority_exponent=config["Server"].get("priority_exponent", 0.6),
+                distillation=config["Server"].get("distillation", False),
+                n_step=n_step,
+                schema=schema,
             )
 
         try:
@@ -161,12 +414,103 @@ def main():
         finally:
             agent.close()
 
-    # Agent mode
-    elif args.mode == "agent":
+    # Inference server mode
+    elif args.mode == "inference":
         if args.agent == "sac":
-            agent = Agent(
+            agent = InferenceServer(
+                env_name=args.environment,
+                env_kwargs=env_kwargs,
+                db_server=f"{args.db_server}:{config['Server']['port']}",
+                port=config["Inference"]["port"],
+                host=config["Inference"].get("host", "127.0.0.1"),
+                actor_units=config["Model"]["Actor"]["units"],
+                clip_mean_min=config["Model"]["Actor"]["clip_mean_min"],
+                clip_mean_max=config["Model"]["Actor"]["clip_mean_max"],
+                init_noise=config["Model"]["Actor"]["init_noise"],
+                frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                max_batch_size=config["Inference"]["max_batch_size"],
+                max_wait_ms=config["Inference"]["max_wait_ms"],
+                update_interval=config["Inference"]["update_interval"],
+            )
+        elif args.agent == "dqn":
+            agent = InferenceServer(
                 env_name=args.environment,
+                env_kwargs=env_kwargs,
                 db_server=f"{args.db_server}:{config['Server']['port']}",
+                port=config["Inference"]["port"],
+                host=config["Inference"].get("host", "127.0.0.1"),
+                num_layers=config["Model"]["num_layers"],
+                embed_dim=config["Model"]["embed_dim"],
+                ff_mult=config["Model"]["ff_mult"],
+                num_heads=config["Model"]["num_heads"],
+                dropout_rate=config["Model"]["dropout_rate"],
+                attention_dropout_rate=config["Model"]["attention_dropout_rate"],
+                gamma=config["Learner"]["gamma"],
+                tau=config["Learner"]["tau"],
+                frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                max_batch_size=config["Inference"]["max_batch_size"],
+                max_wait_ms=config["Inference"]["max_wait_ms"],
+                update_interval=config["Inference"]["update_interval"],
+            )
+
+        try:
+            agent.run()
+        except KeyboardInterrupt:
+            print("Terminated by user 👋👋👋")
+        finally:
+            agent.close()
+
+    # Aggregator mode
+    elif args.mode == "aggregator":
+        from rl_toolkit.core.aggregator import Aggregator
+
+        agent = Aggregator(
+            db_server=f"{args.db_server}:{config['Server']['port']}",
+            port=config["Aggregator"]["port"],
+            insert_port=config["Aggregator"]["insert_port"],
+            update_interval=config["Aggregator"]["update_interval"],
+            keep_alive_refs=config["Aggregator"]["keep_alive_refs"],
+            max_chunk_length=config["Aggregator"]["max_chunk_length"],
+            max_wait_ms=config["Aggregator"]["max_wait_ms"],
+            chunk_length=chunk_length,
+            insert_queue=config["Agent"].get("InsertQueue"),
+        )
+
+        try:
+            agent.run()
+        except KeyboardInterrupt:
+            print("Terminated by user 👋👋👋")
+        finally:
+            agent.close()
+
+    # Agent mode
+    elif args.mode in ("agent", "agents"):
+        if args.inference_server is not None:
+            inference_server = f"{args.inference_server}:{config['Inference']['port']}"
+        else:
+            inference_server = None
+
+        # The aggregator forwards the inserts and serves the cached variables
+        db_server = f"{args.db_server}:{config['Server']['port']}"
+        insert_queue = config["Agent"].get("InsertQueue")
+        if args.aggregator is not None:
+            variables_server = f"{args.aggregator}:{config['Aggregator']['port']}"
+            insert_queue = {
+                **(insert_queue or {}),
+                "aggregator": f"{args.aggregator}:{config['Aggregator']['insert_port']}",
+            }
+        else:
+            variables_server = None
+
+        if args.agent == "sac":
+            agent_kwargs = dict(
+                env_name=args.environment,
+                env_kwargs=env_kwargs,
+                db_server=db_server,
                 actor_units=config["Model"]["Actor"]["units"],
                 clip_mean_min=config["Model"]["Actor"]["clip_mean_min"],
                 clip_mean_max=config["Model"]["Actor"]["clip_mean_max"],
@@ -174,12 +518,27 @@ def main():
                 warmup_steps=config["Agent"]["warmup_steps"],
                 env_steps=config["Agent"]["env_steps"],
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                action_repeat=action_repeat,
+                n_step=n_step,
+                gamma=config["Learner"]["gamma"],
                 save_path=config["save_path"],
+                num_envs=config["Agent"].get("num_envs", 1),
+                asynchronous_envs=config["Agent"].get("asynchronous_envs", False),
+                pipelined=config["Agent"].get("pipelined", False),
+                inference_server=inference_server,
+                numpy_inference=config["Agent"].get("numpy_inference", False),
+                chunk_length=chunk_length,
+                schema=schema,
+                insert_queue=insert_queue,
+                variables_server=variables_server,
             )
         elif args.agent == "dqn":
-            agent = Agent(
+            agent_kwargs = dict(
                 env_name=args.environment,
-                db_server=f"{args.db_server}:{config['Server']['port']}",
+                env_kwargs=env_kwargs,
+                db_server=db_server,
                 num_layers=config["Model"]["num_layers"],
                 embed_dim=config["Model"]["embed_dim"],
                 ff_mult=config["Model"]["ff_mult"],
@@ -189,20 +548,106 @@ def main():
                 gamma=config["Learner"]["gamma"],
                 tau=config["Learner"]["tau"],
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                action_repeat=action_repeat,
+                n_step=n_step,
                 temp_init=config["Agent"]["temp_init"],
                 temp_min=config["Agent"]["temp_min"],
                 temp_decay=config["Agent"]["temp_decay"],
                 warmup_steps=config["Agent"]["warmup_steps"],
+                env_steps=config["Agent"].get("env_steps", 1),
+                flush=config["Agent"].get("Flush"),
                 save_path=config["save_path"],
+                num_envs=config["Agent"].get("num_envs", 1),
+                asynchronous_envs=config["Agent"].get("asynchronous_envs", False),
+                pipelined=config["Agent"].get("pipelined", False),
+                inference_server=inference_server,
+                chunk_length=chunk_length,
+                schema=schema,
+                insert_queue=insert_queue,
+                variables_server=variables_server,
+            )
+
+        if args.mode == "agent":
+            agent = Agent(**agent_kwargs)
+
+            try:
+                agent.run()
+            except KeyboardInterrupt:
+                print("Terminated by user 👋👋👋")
+            finally:
+                # Save model
+                agent.save()
+                agent.close()
+        else:
+            from rl_toolkit.core.launcher import AgentLauncher
+
+            agent = AgentLauncher(
+                env_name=args.environment,
+                agent_module=Agent.__module__,
+                agent_kwargs=agent_kwargs,
+                num_workers=args.num_workers,
+                pin_cores=args.pin_cores,
+                max_restarts=args.max_restarts,
             )
 
+            try:
+                agent.run()
+            except KeyboardInterrupt:
+                print("Terminated by user 👋👋👋")
+            finally:
+                agent.close()
+
+    # Prefill mode
+    elif args.mode == "prefill":
+        from rl_toolkit.core.prefill import Prefill
+
+        agent = Prefill(
+            env_name=args.environment,
+            env_kwargs=env_kwargs,
+            db_server=f"{args.db_server}:{config['Server']['port']}",
+            frame_stack=config["Model"]["frame_stack"],
+            pixels=pixels,
+            action_repeat=action_repeat,
+            n_step=n_step,
+            gamma=config["Learner"]["gamma"],
+            num_steps=config["Agent"]["warmup_steps"],
+            num_workers=args.num_workers,
+            num_envs=config["Prefill"]["num_envs"],
+            batch_size=config["Prefill"]["batch_size"],
+            chunk_length=chunk_length,
+            schema=schema,
+        )
+
+        try:
+            agent.run()
+        except KeyboardInterrupt:
+            print("Terminated by user 👋👋👋")
+        finally:
+            agent.close()
+
+    # Benchmark mode
+    elif args.mode == "benchmark":
+        from rl_toolkit.core.replay_benchmark import ReplayBenchmark
+
+        agent = ReplayBenchmark(
+            env_name=args.environment,
+            env_kwargs=env_kwargs,
+            frame_stack=config["Model"]["frame_stack"],
+            num_steps=args.num_steps,
+            chunk_length=chunk_length,
+            schema=schema,
+            chunk_lengths=args.chunk_lengths,
+            pixels=pixels,
+            action_repeat=action_repeat,
+        )
+
         try:
             agent.run()
         except KeyboardInterrupt:
             print("Terminated by user 👋👋👋")
         finally:
-            # Save model
-            agent.save()
             agent.close()
 
     # Learner mode
@@ -210,6 +655,7 @@ def main():
         if args.agent == "sac":
             agent = Learner(
                 env_name=args.environment,
+                env_kwargs=env_kwargs,
                 db_server=f"{args.db_server}:{config['Server']['port']}",
                 train_steps=config["Learner"]["train_steps"],
                 batch_size=config["Learner"]["batch_size"],
@@ -230,6 +676,16 @@ def main():
                 gamma=config["Learner"]["gamma"],
                 tau=config["Learner"]["tau"],
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                n_step=n_step,
+                prioritized=prioritized,
+                importance_exponent=config["Learner"].get("importance_exponent", 0.4),
+                priority_update_size=config["Learner"].get(
+                    "priority_update_size", 65536
+                ),
+                sampler=config["Learner"].get("Sampler"),
+                schema=schema,
                 init_alpha=config["Model"]["Alpha"]["init"],
                 init_noise=config["Model"]["Actor"]["init_noise"],
                 merge_index=config["Model"]["Critic"]["merge_index"],
@@ -238,6 +694,7 @@ def main():
         elif args.agent == "dqn":
             agent = Learner(
                 env_name=args.environment,
+                env_kwargs=env_kwargs,
                 db_server=f"{args.db_server}:{config['Server']['port']}",
                 train_steps=config["Learner"]["train_steps"],
                 batch_size=config["Learner"]["batch_size"],
@@ -254,6 +711,16 @@ def main():
                 gamma=config["Learner"]["gamma"],
                 tau=config["Learner"]["tau"],
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                n_step=n_step,
+                prioritized=prioritized,
+                importance_exponent=config["Learner"].get("importance_exponent", 0.4),
+                priority_update_size=config["Learner"].get(
+                    "priority_update_size", 65536
+                ),
+                sampler=config["Learner"].get("Sampler"),
+                schema=schema,
                 save_path=config["save_path"],
             )
 
@@ -265,37 +732,57 @@ def main():
             agent.save()
             agent.close()
 
-    # Tester mode
-    elif args.mode == "tester":
+    # Distillation mode
+    elif args.mode == "distill":
         if args.agent == "sac":
-            agent = Tester(
+            agent = Distiller(
                 env_name=args.environment,
-                render=args.render,
-                max_steps=args.max_steps,
+                env_kwargs=env_kwargs,
+                db_server=f"{args.db_server}:{config['Server']['port']}",
+                train_steps=config["Distillation"]["train_steps"],
+                batch_size=config["Distillation"]["batch_size"],
+                learning_rate=config["Distillation"]["learning_rate"],
                 actor_units=config["Model"]["Actor"]["units"],
+                student_units=config["Distillation"]["Student"]["units"],
                 clip_mean_min=config["Model"]["Actor"]["clip_mean_min"],
                 clip_mean_max=config["Model"]["Actor"]["clip_mean_max"],
                 init_noise=config["Model"]["Actor"]["init_noise"],
-                model_path=args.model_path,
-                enable_wandb=True,
                 frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                schema=schema,
+                eval_interval=config["Distillation"]["eval_interval"],
+                teacher_path=args.model_path,
+                save_path=config["save_path"],
             )
         elif args.agent == "dqn":
-            agent = Tester(
+            agent = Distiller(
                 env_name=args.environment,
-                render=args.render,
-                max_steps=args.max_steps,
+                env_kwargs=env_kwargs,
+                db_server=f"{args.db_server}:{config['Server']['port']}",
+                train_steps=config["Distillation"]["train_steps"],
+                batch_size=config["Distillation"]["batch_size"],
+                learning_rate=config["Distillation"]["learning_rate"],
                 num_layers=config["Model"]["num_layers"],
                 embed_dim=config["Model"]["embed_dim"],
                 ff_mult=config["Model"]["ff_mult"],
                 num_heads=config["Model"]["num_heads"],
+                student_num_layers=config["Distillation"]["Student"]["num_layers"],
+                student_embed_dim=config["Distillation"]["Student"]["embed_dim"],
+                student_ff_mult=config["Distillation"]["Student"]["ff_mult"],
+                student_num_heads=config["Distillation"]["Student"]["num_heads"],
                 dropout_rate=config["Model"]["dropout_rate"],
                 attention_dropout_rate=config["Model"]["attention_dropout_rate"],
                 gamma=config["Learner"]["gamma"],
                 tau=config["Learner"]["tau"],
                 frame_stack=config["Model"]["frame_stack"],
-                model_path=args.model_path,
-                enable_wandb=True,
+                pixels=pixels,
+                encoder=encoder,
+                n_step=n_step,
+                schema=schema,
+                eval_interval=config["Distillation"]["eval_interval"],
+                teacher_path=args.model_path,
+                save_path=config["save_path"],
             )
 
         try:
@@ -303,8 +790,99 @@ def main():
         except KeyboardInterrupt:
             print("Terminated by user 👋👋👋")
         finally:
+            agent.save()
             agent.close()
 
+    # Tester mode
+    elif args.mode in ("tester", "export"):
+        # The student's architecture replaces the model's one
+        if args.student:
+            if args.agent == "sac":
+                config["Model"]["Actor"].update(config["Distillation"]["Student"])
+            else:
+                config["Model"].update(config["Distillation"]["Student"])
+
+        if args.mode == "tester":
+            tester_kwargs = dict(
+                render=args.render, max_steps=args.max_steps, enable_wandb=True
+            )
+        else:
+            tester_kwargs = dict(render=False, max_steps=0, enable_wandb=False)
+
+        if args.agent == "sac":
+            agent = Tester(
+                env_name=args.environment,
+                env_kwargs=env_kwargs,
+                actor_units=config["Model"]["Actor"]["units"],
+                clip_mean_min=config["Model"]["Actor"]["clip_mean_min"],
+                clip_mean_max=config["Model"]["Actor"]["clip_mean_max"],
+                init_noise=config["Model"]["Actor"]["init_noise"],
+                model_path=args.model_path,
+                frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                action_repeat=action_repeat,
+                **tester_kwargs,
+            )
+        elif args.agent == "dqn":
+            agent = Tester(
+                env_name=args.environment,
+                env_kwargs=env_kwargs,
+                num_layers=config["Model"]["num_layers"],
+                embed_dim=config["Model"]["embed_dim"],
+                ff_mult=config["Model"]["ff_mult"],
+                num_heads=config["Model"]["num_heads"],
+                dropout_rate=config["Model"]["dropout_rate"],
+                attention_dropout_rate=config["Model"]["attention_dropout_rate"],
+                gamma=config["Learner"]["gamma"],
+                tau=config["Learner"]["tau"],
+                frame_stack=config["Model"]["frame_stack"],
+                pixels=pixels,
+                encoder=encoder,
+                action_repeat=action_repeat,
+                model_path=args.model_path,
+                **tester_kwargs,
+            )
+
+        if args.mode == "export":
+            if args.quantization == "int8":
+                from rl_toolkit.utils import (
+                    ReplaySchema,
+                    SequenceTransitions,
+                    sample_observations,
+                )
+
+                replay_schema = ReplaySchema(**(schema or {}))
+                calibration_data = sample_observations(
+                    f"{args.db_server}:{config['Server']['port']}",
+                    "experience",
+                    args.num_samples,
+                    replay_schema,
+                    (
+                        SequenceTransitions(
+                            config["Model"]["frame_stack"],
+                            n_step,
+                            config["Learner"]["gamma"],
+                        )
+                        if replay_schema.sequence_length
+                        else None
+                    ),
+                )
+            else:
+                calibration_data = None
+
+            try:
+                agent.export(args.output, args.quantization, calibration_data)
+            finally:
+                agent.close()
+        else:
+            try:
+                agent.run()
+            except KeyboardInterrupt:
+                print("Terminated by user 👋👋👋")
+            finally:
+                agent.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,197 @@
+import os
+
+import reverb
+import tensorflow as tf
+from tensorflow.keras.optimizers import Adam
+from wandb.integration.keras import WandbMetricsLogger
+
+import wandb
+from rl_toolkit.networks.callbacks import EvaluationCallback
+from rl_toolkit.networks.models import (
+    DuelingDQN,
+    DuelingDQNDistillation,
+    DuelingDQNPolicy,
+)
+from rl_toolkit.utils import ReplaySchema, SequenceTransitions, make_reverb_dataset
+
+from ...core.process import Process
+
+
+class Distiller(Process):
+    """
+    Distiller
+    =================
+
+    Distills the trained Dueling DQN into the smaller student on the replay data.
+    The replay data are sampled from the `distillation` table of the server (`Server.distillation`),
+    the copies of the experiences without the rate limiter and priorities of the training.
+
+    Attributes:
+        env_name (str): the name of environment
+        db_server (str): database server name (IP or domain name)
+        train_steps (int): number of training steps
+        batch_size (int): size of mini-batch used for training
+        learning_rate (float): the learning rate for the student's optimizer
+        num_layers (int): number of the teacher's transformer layers
+        embed_dim (int): dimension of the teacher's embedding
+        ff_mult (int): multiplier of the teacher's feed-forward layer's units
+        num_heads (int): number of the teacher's attention heads
+        student_num_layers (int): number of the student's transformer layers
+        student_embed_dim (int): dimension of the student's embedding
+        student_ff_mult (int): multiplier of the student's feed-forward layer's units
+        student_num_heads (int): number of the student's attention heads
+        dropout_rate (float): dropout rate
+        attention_dropout_rate (float): dropout rate of the attention
+        gamma (float): the discount factor
+        tau (float): the soft update coefficient for target networks
+        eval_interval (int): number of training steps between evaluations of the teacher and student
+        teacher_path (str): path to the teacher model
+        save_path (str): path to the models for saving
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        n_step (int): number of rewards summed into the return of the transition (the sequence layout)
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        db_server: str,
+        # ---
+        train_steps: int,
+        batch_size: int,
+        learning_rate: float,
+        # ---
+        num_layers: int,
+        embed_dim: int,
+        ff_mult: int,
+        num_heads: int,
+        student_num_layers: int,
+        student_embed_dim: int,
+        student_ff_mult: int,
+        student_num_heads: int,
+        dropout_rate: float,
+        attention_dropout_rate: float,
+        gamma: float,
+        tau: float,
+        frame_stack: int,
+        # ---
+        eval_interval: int,
+        teacher_path: str,
+        save_path: str,
+        pixels: bool = False,
+        encoder: dict = None,
+        n_step: int = 1,
+        schema: dict = None,
+        env_kwargs: dict = None,
+    ):
+        super(Distiller, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
+
+        tf.config.optimizer.set_jit(True)  # Enable XLA.
+
+        self._train_steps = train_steps
+        self._eval_interval = eval_interval
+        self._save_path = save_path
+
+        # Init teacher's and student's networks
+        teacher = DuelingDQN(
+            self._env.action_space.n,
+            num_layers=num_layers,
+            embed_dim=embed_dim,
+            ff_mult=ff_mult,
+            num_heads=num_heads,
+            dropout_rate=dropout_rate,
+            attention_dropout_rate=attention_dropout_rate,
+            gamma=gamma,
+            tau=tau,
+            encoder=encoder,
+        )
+        teacher.build((None,) + self._env.observation_space.shape)
+        teacher.load_weights(teacher_path)
+
+        self.student = DuelingDQN(
+            self._env.action_space.n,
+            num_layers=student_num_layers,
+            embed_dim=student_embed_dim,
+            ff_mult=student_ff_mult,
+            num_heads=student_num_heads,
+            dropout_rate=dropout_rate,
+            attention_dropout_rate=attention_dropout_rate,
+            gamma=gamma,
+            tau=tau,
+            encoder=encoder,
+        )
+        self.student.build((None,) + self._env.observation_space.shape)
+
+        self.model = DuelingDQNDistillation(teacher, self.student)
+        self.model.compile(optimizer=Adam(learning_rate=learning_rate))
+
+        # Show models details
+        teacher.summary()
+        self.student.summary()
+
+        self._policies = {
+            "Teacher": DuelingDQNPolicy(
+                teacher,
+                self._env.observation_space.shape,
+                self._env.observation_space.dtype,
+            ),
+            "Student": DuelingDQNPolicy(
+                self.student,
+                self._env.observation_space.shape,
+                self._env.observation_space.dtype,
+            ),
+        }
+
+        # The training table is rate-limited by the learner's samples per insert
+        if "distillation" not in reverb.Client(db_server).server_info():
+            raise ValueError(
+                "The database server has no distillation table, "
+                "start it with the `distillation` enabled in the Server section of config"
+            )
+
+        # Initializes the reverb's dataset
+        schema = ReplaySchema(**(schema or {}))
+        self.dataset = make_reverb_dataset(
+            server_address=db_server,
+            table="distillation",
+            batch_size=batch_size,
+            schema=schema,
+            map_func=(
+                SequenceTransitions(frame_stack, n_step, gamma)
+                if schema.sequence_length
+                else None
+            ),
+        )
+
+        # init Weights & Biases
+        wandb.init(project="rl-toolkit", group=f"{env_name}")
+        wandb.config.train_steps = train_steps
+        wandb.config.batch_size = batch_size
+        wandb.config.learning_rate = learning_rate
+        wandb.config.student_num_layers = student_num_layers
+        wandb.config.student_embed_dim = student_embed_dim
+        wandb.config.student_ff_mult = student_ff_mult
+        wandb.config.student_num_heads = student_num_heads
+
+    def run(self):
+        self.model.fit(
+            self.dataset,
+            epochs=self._train_steps,
+            steps_per_epoch=1,
+            verbose=0,
+            callbacks=[
+                EvaluationCallback(self._env, self._policies, self._eval_interval),
+                WandbMetricsLogger(log_freq=10),
+            ],
+        )
+
+    def save(self):
+        if self._save_path:
+            os.makedirs(self._save_path, exist_ok=True)
+            # Save model
+            self.student.save_weights(os.path.join(self._save_path, "student.h5"))
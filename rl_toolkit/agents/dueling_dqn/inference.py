@@ -0,0 +1,181 @@
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import wandb
+from rl_toolkit.networks.models import DuelingDQN, DuelingDQNPolicy
+from rl_toolkit.utils import InferenceService, VariableContainer
+
+from ...core.process import Process
+
+
+class InferenceServer(Process):
+    """
+    Inference server
+    =================
+
+    Runs the Dueling DQN for all connected agents, the requests are batched under the latency deadline.
+
+    Attributes:
+        env_name (str): the name of environment
+        db_server (str): database server name (IP or domain name)
+        port (int): the port number of inference server
+        host (str): the bind address of inference server, `0.0.0.0` serves the agents of the other machines
+        num_layers (int): number of transformer's layers
+        embed_dim (int): dimension of the embedding
+        ff_mult (int): multiplier of the feed-forward layer's units
+        num_heads (int): number of attention heads
+        dropout_rate (float): dropout rate
+        attention_dropout_rate (float): dropout rate of the attention
+        gamma (float): the discount factor
+        tau (float): the soft update coefficient for target networks
+        max_batch_size (int): maximum number of observations in one batch
+        max_wait_ms (float): maximum waiting time of the request for the batch
+        update_interval (float): interval of loading the policy weights and logging in seconds
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        db_server: str,
+        port: int,
+        # ---
+        num_layers: int,
+        embed_dim: int,
+        ff_mult: int,
+        num_heads: int,
+        dropout_rate: float,
+        attention_dropout_rate: float,
+        gamma: float,
+        tau: float,
+        frame_stack: int,
+        # ---
+        max_batch_size: int,
+        max_wait_ms: float,
+        update_interval: float = 1.0,
+        host: str = "127.0.0.1",
+        pixels: bool = False,
+        encoder: dict = None,
+        env_kwargs: dict = None,
+    ):
+        super(InferenceServer, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
+
+        self._update_interval = update_interval
+
+        # Init actor's network
+        self.model = DuelingDQN(
+            self._env.action_space.n,
+            num_layers=num_layers,
+            embed_dim=embed_dim,
+            ff_mult=ff_mult,
+            num_heads=num_heads,
+            dropout_rate=dropout_rate,
+            attention_dropout_rate=attention_dropout_rate,
+            gamma=gamma,
+            tau=tau,
+            encoder=encoder,
+        )
+        self.model.build((None,) + self._env.observation_space.shape)
+
+        # Show models details
+        self.model.summary()
+
+        # The batch size varies, XLA would re-compile the graph for each of them
+        self._policy = DuelingDQNPolicy(
+            self.model,
+            self._env.observation_space.shape,
+            self._env.observation_space.dtype,
+            jit_compile=False,
+        )
+
+        # Variables
+        self._train_step = tf.Variable(
+            0,
+            trainable=False,
+            dtype=tf.uint64,
+            aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA,
+            shape=(),
+        )
+        self._stop_agents = tf.Variable(
+            False,
+            trainable=False,
+            dtype=tf.bool,
+            aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA,
+            shape=(),
+        )
+
+        # Table for storing variables
+        self._variable_container = VariableContainer(
+            db_server=db_server,
+            table="variables",
+            variables={
+                "policy_variables": self.model.variables,
+                "train_step": self._train_step,
+                "stop_agents": self._stop_agents,
+            },
+        )
+        self._variable_container.update_variables()
+
+        self._service = InferenceService(
+            port=port,
+            host=host,
+            infer_fn=self.infer,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+
+        # Init Weights & Biases
+        wandb.init(
+            project="rl-toolkit",
+            group=f"{env_name}",
+        )
+        wandb.config.max_batch_size = max_batch_size
+        wandb.config.max_wait_ms = max_wait_ms
+
+    def infer(self, requests):
+        observations = [request["observation"] for _, request in requests]
+
+        # Each agent decays its own temperature
+        temperature = np.concatenate(
+            [
+                np.full(len(x), request["temperature"], dtype=np.float32)
+                for x, (_, request) in zip(observations, requests)
+            ]
+        )
+        action = self._policy(np.concatenate(observations), temperature=temperature)
+
+        response = {
+            "train_step": int(self._train_step.numpy()),
+            "stop_agents": bool(self._stop_agents.numpy()),
+        }
+        splits = np.cumsum([len(x) for x in observations])[:-1]
+        return [{**response, "action": x} for x in np.split(action, splits)]
+
+    def run(self):
+        last_update = time.monotonic()
+
+        # Serve until the learner stops all agents and they disconnect
+        while not (self._stop_agents and self._service.num_connections == 0):
+            self._service.serve()
+
+            if time.monotonic() - last_update > self._update_interval:
+                last_update = time.monotonic()
+
+                # Load content of variables
+                self._variable_container.update_variables()
+
+                metrics = self._service.metrics()
+                if metrics:
+                    wandb.log(metrics, step=self._train_step.numpy())
+
+    def close(self):
+        self._service.close()
+        super(InferenceServer, self).close()
+        print("The inference server is successfully closed! 🔥🔥🔥")
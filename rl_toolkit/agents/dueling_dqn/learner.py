@@ -4,9 +4,19 @@ from tensorflow.keras.callbacks import LearningRateScheduler
 from wandb.integration.keras import WandbMetricsLogger
 
 import wandb
-from rl_toolkit.networks.callbacks import DQNAgentCallback, PrintLR, cosine_schedule
+from rl_toolkit.networks.callbacks import (
+    DQNAgentCallback,
+    PrintLR,
+    PriorityCallback,
+    cosine_schedule,
+)
 from rl_toolkit.networks.models import DuelingDQN
-from rl_toolkit.utils import make_reverb_dataset
+from rl_toolkit.utils import (
+    ReplaySchema,
+    SequenceTransitions,
+    autotune_reverb_dataset,
+    make_reverb_dataset,
+)
 
 from ...core.process import Process
 
@@ -36,6 +46,15 @@ class Learner(Process):
         init_alpha (float): initialization of alpha param
         init_noise (float): initialization of the Actor's noise
         save_path (str): path to the models for saving
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        n_step (int): number of rewards summed into the return of the transition
+        prioritized (bool): the experiences are sampled by the priorities, the learner writes back their TD errors
+        importance_exponent (float): exponent of the importance-sampling weights of the prioritized replay
+        priority_update_size (int): number of priorities sent to the database at once
+        sampler (dict): arguments of the replay sampling pipeline (`make_reverb_dataset`), `num_workers: auto` is autotuned
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`), the windows of the sequence layout are mapped to transitions
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -64,14 +83,27 @@ class Learner(Process):
         tau: float,
         # ---
         save_path: str,
+        pixels: bool = False,
+        encoder: dict = None,
+        n_step: int = 1,
+        prioritized: bool = False,
+        importance_exponent: float = 0.4,
+        priority_update_size: int = 65536,
+        sampler: dict = None,
+        schema: dict = None,
+        env_kwargs: dict = None,
     ):
-        super(Learner, self).__init__(env_name, False, frame_stack)
+        super(Learner, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
 
         tf.config.optimizer.set_jit(True)  # Enable XLA.
 
         self._train_steps = train_steps
         self._save_path = save_path
         self._db_server = db_server
+        self._prioritized = prioritized
+        self._priority_update_size = priority_update_size
         self._warmup_steps = warmup_steps
         action_space = self._env.action_space.n
 
@@ -86,6 +118,8 @@ class Learner(Process):
             attention_dropout_rate=attention_dropout_rate,
             gamma=gamma,
             tau=tau,
+            encoder=encoder,
+            n_step=n_step,
         )
         target_dqn_model.build((None,) + self._env.observation_space.shape)
 
@@ -100,6 +134,9 @@ class Learner(Process):
             target_dqn_model=target_dqn_model,
             gamma=gamma,
             tau=tau,
+            encoder=encoder,
+            n_step=n_step,
+            importance_exponent=importance_exponent if prioritized else 0.0,
         )
         self.model.build((None,) + self._env.observation_space.shape)
 
@@ -120,39 +157,71 @@ class Learner(Process):
         target_dqn_model.summary()
 
         # Initializes the reverb's dataset
-        self.dataset = make_reverb_dataset(
-            server_address=self._db_server,
-            table="experience",
-            batch_size=batch_size,
-        )
+        sampler = dict(sampler or {})
+        schema = ReplaySchema(**(schema or {}))
+        if schema.sequence_length:
+            sampler["map_func"] = SequenceTransitions(frame_stack, n_step, gamma)
+        if sampler.get("num_workers") == "auto":
+            del sampler["num_workers"]
+            self.dataset, sampler["num_workers"] = autotune_reverb_dataset(
+                self.model,
+                server_address=self._db_server,
+                table="experience",
+                batch_size=batch_size,
+                schema=schema,
+                **sampler,
+            )
+        else:
+            self.dataset = make_reverb_dataset(
+                server_address=self._db_server,
+                table="experience",
+                batch_size=batch_size,
+                schema=schema,
+                **sampler,
+            )
 
         # init Weights & Biases
         wandb.init(project="rl-toolkit", group=f"{env_name}")
         wandb.config.train_steps = train_steps
         wandb.config.batch_size = batch_size
+        wandb.config.sampler = {
+            key: value for key, value in sampler.items() if key != "map_func"
+        }
+        wandb.config.sequence_length = schema.sequence_length
         wandb.config.learning_rate = learning_rate
         wandb.config.global_clipnorm = global_clipnorm
         wandb.config.gamma = gamma
+        wandb.config.n_step = n_step
+        wandb.config.prioritized = prioritized
+        wandb.config.importance_exponent = importance_exponent
         wandb.config.tau = tau
 
     def run(self):
+        callbacks = [DQNAgentCallback(self._db_server)]
+
+        # The priority telemetry is logged with the metrics of the step
+        if self._prioritized:
+            callbacks.append(
+                PriorityCallback(self._db_server, self._priority_update_size)
+            )
+        callbacks += [
+            WandbMetricsLogger(log_freq=10),
+            LearningRateScheduler(
+                cosine_schedule(
+                    base_lr=wandb.config.learning_rate,
+                    total_steps=self._train_steps,
+                    warmup_steps=self._warmup_steps,
+                )
+            ),
+            PrintLR(),
+        ]
+
         self.model.fit(
             self.dataset,
             epochs=self._train_steps,
             steps_per_epoch=1,
             verbose=0,
-            callbacks=[
-                DQNAgentCallback(self._db_server),
-                WandbMetricsLogger(log_freq=10),
-                LearningRateScheduler(
-                    cosine_schedule(
-                        base_lr=wandb.config.learning_rate,
-                        total_steps=self._train_steps,
-                        warmup_steps=self._warmup_steps,
-                    )
-                ),
-                PrintLR(),
-            ],
+            callbacks=callbacks,
         )
 
     def close(self):
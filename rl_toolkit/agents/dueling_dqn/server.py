@@ -2,7 +2,7 @@ import reverb
 import tensorflow as tf
 
 from rl_toolkit.networks.models import DuelingDQN
-from rl_toolkit.utils import VariableContainer
+from rl_toolkit.utils import ReplaySchema, VariableContainer
 
 from ...core.process import Process
 
@@ -31,6 +31,14 @@ class Server(Process):
         samples_per_insert (int): samples per insert ratio (SPI) `= num_sampled_items / num_inserted_items`
         actor_critic_path (str): path to the Actor-Critic model
         db_path (str): path to the database checkpoint
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        prioritized (bool): sample the experiences proportionally to their priorities
+        priority_exponent (float): the prioritization exponent (`0.0` is the uniform sampling)
+        distillation (bool): keep the copies of the experiences in the `distillation` table for the distiller
+        n_step (int): number of rewards summed into the return of the transition
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`), with `sequence_length` the replay sizes and SPI count the transitions
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -55,8 +63,18 @@ class Server(Process):
         # ---
         model_path: str,
         db_path: str,
+        pixels: bool = False,
+        encoder: dict = None,
+        prioritized: bool = False,
+        priority_exponent: float = 0.6,
+        distillation: bool = False,
+        n_step: int = 1,
+        schema: dict = None,
+        env_kwargs: dict = None,
     ):
-        super(Server, self).__init__(env_name, False, frame_stack)
+        super(Server, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
 
         # Init actor-critic network
         model = DuelingDQN(
@@ -69,6 +87,7 @@ class Server(Process):
             attention_dropout_rate=attention_dropout_rate,
             gamma=gamma,
             tau=tau,
+            encoder=encoder,
         )
         model.build((None,) + self._env.observation_space.shape)
 
@@ -112,6 +131,13 @@ class Server(Process):
         else:
             checkpointer = reverb.checkpointers.DefaultCheckpointer(path=db_path)
 
+        # Each item holds `sequence_length` transitions, one of them is sampled
+        schema = ReplaySchema(**(schema or {}))
+        if schema.sequence_length:
+            min_replay_size = max(1, min_replay_size // schema.sequence_length)
+            max_replay_size = max(1, max_replay_size // schema.sequence_length)
+            samples_per_insert *= schema.sequence_length
+
         if samples_per_insert:
             # 10% tolerance in rate
             samples_per_insert_tolerance = 0.1 * samples_per_insert
@@ -124,33 +150,51 @@ class Server(Process):
         else:
             limiter = reverb.rate_limiters.MinSize(min_replay_size)
 
+        if prioritized:
+            sampler = reverb.selectors.Prioritized(priority_exponent)
+        else:
+            sampler = reverb.selectors.Uniform()
+
+        # Size the replay buffer against RAM
+        signature = schema.signature(
+            self._env.observation_space, self._env.action_space, n_step
+        )
+        bytes_per_item = ReplaySchema.bytes_per_item(signature)
+        print(
+            f"Replay item: {bytes_per_item} bytes, "
+            f"{bytes_per_item * max_replay_size / 2**30:.2f} GiB at max_replay_size"
+        )
+
+        # The distiller samples the copies of the items without the rate limiter of the training,
+        # it neither blocks nor consumes the learner's sampling budget
+        if distillation:
+            distillation_tables = [
+                reverb.Table(  # Uniform replay buffer of the distiller
+                    name="distillation",
+                    sampler=reverb.selectors.Uniform(),
+                    remover=reverb.selectors.Fifo(),
+                    rate_limiter=reverb.rate_limiters.MinSize(min_replay_size),
+                    max_size=max_replay_size,
+                    max_times_sampled=0,
+                    signature=signature,
+                )
+            ]
+        else:
+            distillation_tables = []
+
         # Initialize the reverb server
         self.server = reverb.Server(
             tables=[
                 reverb.Table(  # Off-policy Replay buffer
                     name="experience",
-                    sampler=reverb.selectors.Uniform(),
+                    sampler=sampler,
                     remover=reverb.selectors.Fifo(),
                     rate_limiter=limiter,
                     max_size=max_replay_size,
                     max_times_sampled=0,
-                    signature={
-                        "observation": tf.TensorSpec(
-                            [*self._env.observation_space.shape],
-                            self._env.observation_space.dtype,
-                        ),
-                        "action": tf.TensorSpec(
-                            [*self._env.action_space.shape],
-                            self._env.action_space.dtype,
-                        ),
-                        "ext_reward": tf.TensorSpec([1], tf.float64),
-                        "next_observation": tf.TensorSpec(
-                            [*self._env.observation_space.shape],
-                            self._env.observation_space.dtype,
-                        ),
-                        "terminal": tf.TensorSpec([1], tf.bool),
-                    },
+                    signature=signature,
                 ),
+                *distillation_tables,
                 reverb.Table(  # Variables container
                     name="variables",
                     sampler=reverb.selectors.Uniform(),
@@ -1,8 +1,11 @@
+import time
+
 import numpy as np
 import tensorflow as tf
 
 import wandb
-from rl_toolkit.networks.models import DuelingDQN
+from rl_toolkit.networks.models import DuelingDQN, DuelingDQNPolicy
+from rl_toolkit.networks.tflite import TFLitePolicy, export_tflite
 
 from ...core.process import Process
 
@@ -20,8 +23,12 @@ class Tester(Process):
         clip_mean_min (float): the minimum value of mean
         clip_mean_max (float): the maximum value of mean
         init_noise (float): initialization of the Actor's noise
-        model_path (str): path to the model
+        model_path (str): path to the model (`.tflite` file runs the exported policy)
         enable_wandb (bool): enable Weights & Biases logging module
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        action_repeat (int): number of environment steps per action, the policy is called once per the repeated steps
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -43,32 +50,50 @@ class Tester(Process):
         # ---
         model_path: str,
         enable_wandb: bool,
+        pixels: bool = False,
+        encoder: dict = None,
+        action_repeat: int = 1,
+        env_kwargs: dict = None,
     ):
-        super(Tester, self).__init__(env_name, render, frame_stack)
+        super(Tester, self).__init__(
+            env_name, render, frame_stack, pixels, action_repeat, env_kwargs
+        )
 
         self._max_steps = max_steps
         self._render = render
         self._enable_wandb = enable_wandb
 
-        # Init actor's network
-        self.model = DuelingDQN(
-            self._env.action_space.n,
-            num_layers=num_layers,
-            embed_dim=embed_dim,
-            ff_mult=ff_mult,
-            num_heads=num_heads,
-            dropout_rate=dropout_rate,
-            attention_dropout_rate=attention_dropout_rate,
-            gamma=gamma,
-            tau=tau,
-        )
-        self.model.build((None,) + self._env.observation_space.shape)
+        if model_path is not None and model_path.endswith(".tflite"):
+            # The exported policy runs without the Keras model
+            self.model = None
+            self._policy = TFLitePolicy(model_path)
+        else:
+            # Init actor's network
+            self.model = DuelingDQN(
+                self._env.action_space.n,
+                num_layers=num_layers,
+                embed_dim=embed_dim,
+                ff_mult=ff_mult,
+                num_heads=num_heads,
+                dropout_rate=dropout_rate,
+                attention_dropout_rate=attention_dropout_rate,
+                gamma=gamma,
+                tau=tau,
+                encoder=encoder,
+            )
+            self.model.build((None,) + self._env.observation_space.shape)
 
-        if model_path is not None:
-            self.model.load_weights(model_path)
+            if model_path is not None:
+                self.model.load_weights(model_path)
 
-        # Show models details
-        self.model.summary()
+            self._policy = DuelingDQNPolicy(
+                self.model,
+                self._env.observation_space.shape,
+                self._env.observation_space.dtype,
+            )
+
+            # Show models details
+            self.model.summary()
 
         # Init Weights & Biases
         if not self._render and self._enable_wandb:
@@ -78,19 +103,28 @@ class Tester(Process):
             )
             wandb.config.max_steps = max_steps
 
-    @tf.function(jit_compile=True)
     def policy(self, inputs):
-        logits = self.model(
-            tf.expand_dims(inputs, axis=0),
-            training=False,
-        )  # Q values
-        return tf.argmax(logits, axis=-1)
+        return self._policy(inputs, deterministic=True)
+
+    def export(self, path, quantization="none", calibration_data=None):
+        if self.model is None:
+            raise ValueError("The policy is exported from the Keras model")
+        export_tflite(
+            lambda x: tf.argmax(self.model(x, training=False), axis=-1),
+            self.model,
+            self._env.observation_space.shape,
+            path,
+            quantization=quantization,
+            calibration_data=calibration_data,
+            observation_dtype=self._env.observation_space.dtype,
+        )
 
     def run(self):
         self._total_steps = 0
         self._total_episodes = 0
         self._episode_reward = 0.0
         self._episode_steps = 0
+        self._episode_latency = 0.0
 
         # Init environment
         self._last_obs, _ = self._env.reset()
@@ -98,7 +132,9 @@ class Tester(Process):
         # Main loop
         while self._total_steps < self._max_steps:
             # Get the action
+            start = time.perf_counter()
             action = self.policy(self._last_obs)
+            self._episode_latency += time.perf_counter() - start
             action = np.array(action, copy=False, dtype=self._env.action_space.dtype)
 
             # Perform action
@@ -116,6 +152,9 @@ class Tester(Process):
                 print(f"Epoch: {self._total_episodes}")
                 print(f"Score: {self._episode_reward}")
                 print(f"Steps: {self._episode_steps}")
+                print(
+                    f"Latency: {self._episode_latency * 1000.0 / self._episode_steps} ms"
+                )
                 print(f"TotalInteractions: {self._total_steps}")
                 print("=============================================")
                 print(
@@ -127,6 +166,9 @@ class Tester(Process):
                             "Epoch": self._total_episodes,
                             "Score": self._episode_reward,
                             "Steps": self._episode_steps,
+                            "Latency": self._episode_latency
+                            * 1000.0
+                            / self._episode_steps,
                         },
                         step=self._total_steps,
                     )
@@ -134,6 +176,7 @@ class Tester(Process):
                 # Init variables
                 self._episode_reward = 0.0
                 self._episode_steps = 0
+                self._episode_latency = 0.0
                 self._total_episodes += 1
 
                 # Init environment
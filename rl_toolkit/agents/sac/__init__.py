@@ -1,4 +1,6 @@
 from .agent import Agent  # noqa
+from .distiller import Distiller  # noqa
+from .inference import InferenceServer  # noqa
 from .learner import Learner  # noqa
 from .server import Server  # noqa
 from .tester import Tester  # noqa
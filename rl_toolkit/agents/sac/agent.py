@@ -1,14 +1,26 @@
 import os
+from contextlib import ExitStack
+from functools import partial
 
 import numpy as np
 import reverb
 import tensorflow as tf
 
 import wandb
-from rl_toolkit.networks.models import Actor
-from rl_toolkit.utils import VariableContainer
-
+from rl_toolkit.networks.models import Actor, ActorPolicy
+from rl_toolkit.networks.numpy_actor import NumpyActor
+from rl_toolkit.utils import (
+    InferenceClient,
+    InsertQueue,
+    ReplaySchema,
+    VariableContainer,
+    make_trajectory_writer,
+)
+
+from ...core.env import make_vector_env
 from ...core.process import Process
+from ...core.transitions import TransitionWriter
+from ...core.wrappers import FrameStack
 
 
 class Agent(Process):
@@ -23,9 +35,26 @@ class Agent(Process):
         clip_mean_min (float): the minimum value of mean
         clip_mean_max (float): the maximum value of mean
         init_noise (float): initialization of the Actor's noise
-        warmup_steps (int): number of interactions before using policy network
+        warmup_steps (int): number of interactions before using policy network (the transitions already in the replay buffer are subtracted)
         env_steps (int): number of steps per rollout
         save_path (str): path to the models for saving
+        num_envs (int): number of sub-environments stepped as one batch
+        asynchronous_envs (bool): step sub-environments in parallel processes
+        pipelined (bool): overlap stepping of two asynchronous environment buffers with the policy inference
+        stats_queue (multiprocessing.Queue): queue for episode statistics instead of logging (used by `AgentLauncher`)
+        worker_id (int): index of the agent process
+        inference_server (str): inference server address, the policy runs remotely instead of the local Actor (e.g. localhost:8001)
+        numpy_inference (bool): run the local Actor in NumPy instead of Tensorflow (lower latency of small batches)
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        action_repeat (int): number of environment steps per action, the policy is called once per the repeated steps
+        n_step (int): number of rewards summed into the return of the transition
+        gamma (float): the discount factor of the n-step return
+        chunk_length (dict): number of steps per chunk of the replay columns, the missing columns are auto-tuned
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        insert_queue (dict): parameters of the background sender (`InsertQueue`), the writers only queue the inserts
+        variables_server (str): server of the policy variables (e.g. the node-local `Aggregator`), the `db_server` by default
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -44,31 +73,130 @@ class Agent(Process):
         frame_stack: int,
         # ---
         save_path: str,
+        # ---
+        num_envs: int = 1,
+        asynchronous_envs: bool = False,
+        pipelined: bool = False,
+        stats_queue=None,
+        worker_id: int = 0,
+        inference_server: str = None,
+        numpy_inference: bool = False,
+        pixels: bool = False,
+        encoder: dict = None,
+        action_repeat: int = 1,
+        n_step: int = 1,
+        gamma: float = 0.99,
+        chunk_length: dict = None,
+        schema: dict = None,
+        insert_queue: dict = None,
+        variables_server: str = None,
+        env_kwargs: dict = None,
     ):
-        super(Agent, self).__init__(env_name, False, frame_stack)
+        super(Agent, self).__init__(
+            env_name, False, frame_stack, pixels, action_repeat, env_kwargs
+        )
 
         self._env_steps = env_steps
+        self._n_step = n_step
+        self._gamma = gamma
+
+        # The items waiting for the incomplete chunks are not forced out by the flush
+        self._chunk_length = chunk_length
+        self._pending_items = max((chunk_length or {}).values(), default=0)
+
+        # The observations and rewards are encoded before the insertion
+        self._schema = ReplaySchema(**(schema or {}))
+
+        # dm_control tasks are not stacked
+        self._frame_stack = frame_stack if isinstance(self._env, FrameStack) else 1
         self._warmup_steps = warmup_steps
         self._save_path = save_path
+        self._num_envs = num_envs
+        self._pipelined = pipelined
+        self._stats_queue = stats_queue
+        self._worker_id = worker_id
 
+        # The real-time environment is connected and stepped by this process only
         if (
             self._env.unwrapped.spec is not None
             and self._env.unwrapped.spec.id == "HumanoidRobot-v0"
         ):
-            self._env.connect()
-
-        # Init actor's network
-        self.model = Actor(
-            units=actor_units,
-            n_outputs=np.prod(self._env.action_space.shape),
-            clip_mean_min=clip_mean_min,
-            clip_mean_max=clip_mean_max,
-            init_noise=init_noise,
-        )
-        self.model.build((None,) + self._env.observation_space.shape)
+            if pipelined or asynchronous_envs or num_envs > 1:
+                raise ValueError(
+                    "The real-time environment supports only one synchronous sub-environment, "
+                    "disable `pipelined` and `asynchronous_envs` and set `num_envs` to 1"
+                )
+            self._env.unwrapped.connect()
+
+        # Init vectorized environment, double-buffered in the pipelined mode
+        if self._pipelined:
+            self._vec_envs = [
+                make_vector_env(
+                    env_name,
+                    num_envs,
+                    frame_stack,
+                    asynchronous=True,
+                    pixels=pixels,
+                    action_repeat=action_repeat,
+                    env_kwargs=env_kwargs,
+                )
+                for _ in range(2)
+            ]
+
+            # The sub-environments run in the worker processes, the local one only describes the spaces
+            self._env.close()
+        else:
+            self._vec_envs = [
+                make_vector_env(
+                    env_name,
+                    num_envs,
+                    frame_stack,
+                    asynchronous=asynchronous_envs,
+                    env=self._env,
+                    pixels=pixels,
+                    action_repeat=action_repeat,
+                    env_kwargs=env_kwargs,
+                )
+            ]
+        self._pending = [None] * len(self._vec_envs)
+
+        if inference_server is None:
+            # Init actor's network
+            self.model = Actor(
+                units=actor_units,
+                n_outputs=np.prod(self._env.action_space.shape),
+                clip_mean_min=clip_mean_min,
+                clip_mean_max=clip_mean_max,
+                init_noise=init_noise,
+                encoder=encoder,
+            )
+            self.model.build((None,) + self._env.observation_space.shape)
+
+            # Separate gSDE noise matrix for each sub-environment
+            self._epsilon = self.model.sample_noise(
+                len(self._vec_envs) * num_envs
+            ).numpy()
 
-        # Show models details
-        self.model.summary()
+            # Show models details
+            self.model.summary()
+
+            if numpy_inference:
+                self._policy = NumpyActor.from_actor(self.model)
+            else:
+                # Compiled inference for the batch of sub-environments
+                self._policy = ActorPolicy(
+                    self.model,
+                    self._env.observation_space.shape,
+                    self._env.observation_space.dtype,
+                    warmup_batch_sizes=[num_envs],
+                )
+
+            self._inference_client = None
+        else:
+            # The inference server keeps the weights and noise matrices
+            self.model = None
+            self._inference_client = InferenceClient(inference_server)
+            self._reset_noise = [True] * len(self._vec_envs)
 
         # Variables
         self._train_step = tf.Variable(
@@ -87,176 +215,277 @@ class Agent(Process):
         )
 
         # Table for storing variables
-        self._variable_container = VariableContainer(
-            db_server=db_server,
-            table="variables",
-            variables={
-                "policy_variables": self.model.variables,
-                "train_step": self._train_step,
-                "stop_agents": self._stop_agents,
-            },
-        )
+        if self.model is not None:
+            self._variable_container = VariableContainer(
+                db_server=variables_server or db_server,
+                table="variables",
+                variables={
+                    "policy_variables": self.model.variables,
+                    "train_step": self._train_step,
+                    "stop_agents": self._stop_agents,
+                },
+            )
 
         # Initializes the reverb client
         self.client = reverb.Client(db_server)
+        self._db_server = db_server
+        self._insert_queue = insert_queue
 
         # Init Weights & Biases
-        wandb.init(
-            project="rl-toolkit",
-            group=f"{env_name}",
-        )
-        wandb.config.warmup_steps = warmup_steps
-        wandb.config.env_steps = env_steps
-
-    def random_policy(self, inputs):
-        action = self._env.action_space.sample()
+        if self._stats_queue is None:
+            wandb.init(
+                project="rl-toolkit",
+                group=f"{env_name}",
+            )
+            wandb.config.warmup_steps = warmup_steps
+            wandb.config.env_steps = env_steps
+            wandb.config.num_envs = num_envs
+            wandb.config.pipelined = pipelined
+            wandb.config.remote_inference = inference_server is not None
+            wandb.config.n_step = n_step
+
+    def random_policy(self, inputs, b):
+        action = self._vec_envs[b].action_space.sample()
         return action
 
-    @tf.function(jit_compile=True)
-    def collect_policy(self, inputs):
-        action = self.model(
-            tf.expand_dims(inputs, axis=0),
-            with_log_prob=False,
-            deterministic=False,
-            training=False,
+    def collect_policy(self, inputs, b):
+        return self._policy(
+            inputs,
+            epsilon=self._epsilon[b * self._num_envs : (b + 1) * self._num_envs],
+        )
+
+    def remote_policy(self, inputs, b):
+        response = self._inference_client.act(
+            {
+                "observation": inputs,
+                "stream": b,
+                "reset_noise": self._reset_noise[b],
+            }
         )
-        return tf.squeeze(action, axis=0)
+        self._reset_noise[b] = False
+
+        # The variables are sent with the actions
+        self._train_step.assign(response["train_step"])
+        self._stop_agents.assign(response["stop_agents"])
+        return response["action"]
+
+    def _get_action(self, policy, inputs, b):
+        action = policy(inputs, b)
+        return np.array(action, copy=False, dtype=self._vec_envs[b].action_space.dtype)
+
+    def collect(self, writers, max_steps, policy):
+        if self._pipelined:
+            # Start stepping of the idle buffers in the background, each step of the rollout is recorded
+            for b, vec_env in enumerate(self._vec_envs):
+                if self._pending[b] is None:
+                    action = self._get_action(policy, self._last_obs[b], b)
+                    vec_env.step_async(action)
+                    self._pending[b] = (self._last_obs[b], action)
 
-    def collect(self, writer, max_steps, policy):
         # Collect the rollout
         for _ in range(max_steps):
-            # Get the action
-            action = policy(self._last_obs)
-            action = np.array(action, copy=False, dtype=self._env.action_space.dtype)
+            for b, vec_env in enumerate(self._vec_envs):
+                if not self._pipelined:
+                    # Get the actions for all sub-environments
+                    action = self._get_action(policy, self._last_obs[b], b)
 
-            # Perform action
-            new_obs, ext_reward, terminated, truncated, _ = self._env.step(action)
+                    # Perform actions
+                    results = vec_env.step(action)
+                    self._record(b, writers[b], self._last_obs[b], action, *results)
 
-            # Update variables
-            self._episode_reward += ext_reward
-            self._episode_steps += 1
-            self._total_steps += 1
+                    # The finished sub-environments are already reset
+                    self._last_obs[b] = results[0]
+                else:
+                    # The other buffer is stepping meanwhile
+                    results = vec_env.step_wait()
+                    last_obs, last_action = self._pending[b]
 
-            # Update the replay buffer
-            writer.append(
-                {
-                    "observation": self._last_obs,
-                    "action": action,
-                    "ext_reward": np.array([ext_reward], dtype=np.float64),
-                    "terminal": np.array([terminated]),
-                }
-            )
+                    # Re-start stepping before writing to the replay buffer
+                    action = self._get_action(policy, results[0], b)
+                    vec_env.step_async(action)
+                    self._pending[b] = (results[0], action)
 
-            # Enough samples to store in the database
-            if self._episode_steps > 1:
-                writer.create_item(
-                    table="experience",
-                    priority=1.0,
-                    trajectory={
-                        "observation": writer.history["observation"][-2],
-                        "action": writer.history["action"][-2],
-                        "ext_reward": writer.history["ext_reward"][-2],
-                        "next_observation": writer.history["observation"][-1],
-                        "terminal": writer.history["terminal"][-2],
-                    },
-                )
+                    self._record(b, writers[b], last_obs, last_action, *results)
+
+        # send all experiences to DB server
+        for buffer_writers in writers:
+            for writer in buffer_writers:
+                writer.flush(self._pending_items)
+
+    def _record(
+        self, b, writers, obs, action, new_obs, ext_reward, terminated, truncated, info
+    ):
+        # Update variables
+        self._episode_reward[b] += ext_reward
+        self._episode_steps[b] += 1
+        self._total_steps += self._num_envs
+
+        for i, writer in enumerate(writers):
+            # The stacked observations are stored as single frames
+            transitions = self._transitions[b][i]
+            transitions.append(obs[i], action[i], ext_reward[i])
 
             # Check the end of episode
-            if terminated or truncated:
-                # Write the final interaction !!!
-                writer.append(
-                    {
-                        "observation": new_obs,
-                    }
-                )
-                writer.create_item(
-                    table="experience",
-                    priority=1.0,
-                    trajectory={
-                        "observation": writer.history["observation"][-2],
-                        "action": writer.history["action"][-2],
-                        "ext_reward": writer.history["ext_reward"][-2],
-                        "next_observation": writer.history["observation"][-1],
-                        "terminal": writer.history["terminal"][-2],
-                    },
-                )
+            if terminated[i] or truncated[i]:
+                transitions.end_episode(info["final_obs"][i], terminated[i])
 
                 # Block until all the items have been sent to the server
                 writer.end_episode()
 
-                # Store best weights
-                if self._episode_reward > self._best_episode_reward:
-                    self._best_episode_reward = self._episode_reward
-                    self._best_episode = self._total_episodes
-                    if self._save_path:
-                        os.makedirs(self._save_path, exist_ok=True)
-                        # Save model
-                        self.model.save_weights(
-                            os.path.join(self._save_path, "best_actor.h5")
-                        )
-
-                # Logging
-                print("=============================================")
-                print(f"Epoch: {self._total_episodes}")
-                print(f"Score: {self._episode_reward}")
-                print(
-                    f"Best score: {self._best_episode_reward} (at epoch {self._best_episode})"
-                )
-                print(f"Steps: {self._episode_steps}")
-                print(f"TotalInteractions: {self._total_steps}")
-                print(f"Train step: {self._train_step.numpy()}")
-                print("=============================================")
-                wandb.log(
+                # Statistics of the real-time control loop
+                real_time = info["final_info"].get("real_time", {})
+                self._end_episode(
+                    b,
+                    i,
                     {
-                        "Epoch": self._total_episodes,
-                        "Score": self._episode_reward,
-                        "Steps": self._episode_steps,
+                        f"Real-time/{key}": value[i]
+                        for key, value in real_time.items()
+                        if not key.startswith("_")
                     },
-                    step=self._train_step.numpy(),
                 )
 
-                # Init variables
-                self._episode_reward = 0.0
-                self._episode_steps = 0
-                self._total_episodes += 1
+        if np.any(terminated | truncated) and self.model is not None:
+            # Load content of variables
+            self._variable_container.update_variables()
 
-                # Init environment
-                self._last_obs, _ = self._env.reset()
+            if isinstance(self._policy, NumpyActor):
+                self._policy.set_weights(NumpyActor.export_weights(self.model))
 
-                # Load content of variables
-                self._variable_container.update_variables()
-            else:
-                # Super critical !!!
-                self._last_obs = new_obs
+    def _end_episode(self, b, i, extra_stats=None):
+        # Store best weights
+        if self._episode_reward[b, i] > self._best_episode_reward:
+            self._best_episode_reward = self._episode_reward[b, i]
+            self._best_episode = self._total_episodes
+            if self._save_path and self.model is not None:
+                os.makedirs(self._save_path, exist_ok=True)
+                # Save model
+                self.model.save_weights(os.path.join(self._save_path, "best_actor.h5"))
+
+        # Logging
+        stats = {
+            "Epoch": self._total_episodes,
+            "Score": self._episode_reward[b, i],
+            "Steps": self._episode_steps[b, i],
+            **(extra_stats or {}),
+        }
+        if self._inserter is not None:
+            stats.update(self._inserter.metrics())
+        if self._stats_queue is not None:
+            # The launcher merges statistics of all agents
+            self._stats_queue.put(
+                {
+                    **stats,
+                    "Worker": self._worker_id,
+                    "TotalInteractions": self._total_steps,
+                    "Train step": int(self._train_step.numpy()),
+                }
+            )
+        else:
+            print("=============================================")
+            print(f"Epoch: {self._total_episodes}")
+            print(f"Score: {self._episode_reward[b, i]}")
+            print(
+                f"Best score: {self._best_episode_reward} (at epoch {self._best_episode})"
+            )
+            print(f"Steps: {self._episode_steps[b, i]}")
+            print(f"TotalInteractions: {self._total_steps}")
+            print(f"Train step: {self._train_step.numpy()}")
+            print("=============================================")
+            wandb.log(stats, step=self._train_step.numpy())
 
-        # send all experiences to DB server
-        writer.flush()
+        # Init variables
+        self._episode_reward[b, i] = 0.0
+        self._episode_steps[b, i] = 0
+        self._total_episodes += 1
 
     def run(self):
         # Init environment
-        self._episode_reward = 0.0
+        num_buffers = len(self._vec_envs)
+        self._episode_reward = np.zeros((num_buffers, self._num_envs))
         self._best_episode_reward = float("-inf")
         self._best_episode = None
-        self._episode_steps = 0
+        self._episode_steps = np.zeros((num_buffers, self._num_envs), dtype=np.int64)
         self._total_episodes = 0
         self._total_steps = 0
-        self._last_obs, _ = self._env.reset()
+        self._last_obs = [vec_env.reset()[0] for vec_env in self._vec_envs]
+        self._pending = [None] * num_buffers
+        self._inserter = None
+
+        # Connect to database, one trajectory stream per sub-environment
+        with ExitStack() as stack:
+            if self._insert_queue is not None:
+                # The unreachable server does not block the environment loop
+                self._inserter = stack.enter_context(
+                    InsertQueue(
+                        self._db_server,
+                        TransitionWriter.num_keep_alive_refs(
+                            self._frame_stack, self._n_step
+                        ),
+                        self._chunk_length,
+                        **self._insert_queue,
+                    )
+                )
+                make_writer = self._inserter.writer
+            else:
+                make_writer = partial(
+                    make_trajectory_writer,
+                    self.client,
+                    TransitionWriter.num_keep_alive_refs(
+                        self._frame_stack, self._n_step
+                    ),
+                    self._chunk_length,
+                )
 
-        # Connect to database
-        with self.client.trajectory_writer(num_keep_alive_refs=2) as writer:
-            for _ in range(0, self._warmup_steps, self._env_steps):
+            writers = [
+                [stack.enter_context(make_writer()) for _ in range(self._num_envs)]
+                for _ in range(num_buffers)
+            ]
+
+            # The items are copied into the distiller's table, if the server has it
+            info = self.client.server_info()
+            tables = [
+                table for table in ("experience", "distillation") if table in info
+            ]
+            self._transitions = [
+                [
+                    TransitionWriter(
+                        writer,
+                        self._schema,
+                        self._frame_stack,
+                        self._n_step,
+                        self._gamma,
+                        tables,
+                    )
+                    for writer in buffer_writers
+                ]
+                for buffer_writers in writers
+            ]
+
+            # The prefilled transitions replace the warmup steps
+            warmup_steps = max(0, self._warmup_steps - info["experience"].current_size)
+
+            for _ in range(
+                0, warmup_steps, self._env_steps * self._num_envs * num_buffers
+            ):
                 # Warmup steps
-                self.collect(writer, self._env_steps, self.random_policy)
+                self.collect(writers, self._env_steps, self.random_policy)
 
             # Main loop
             while not self._stop_agents:
-                # Re-new noise matrix
-                self.model.reset_noise()
-
-                self.collect(writer, self._env_steps, self.collect_policy)
+                # Re-new noise matrices
+                if self._inference_client is None:
+                    self._epsilon = self.model.sample_noise(
+                        self._num_envs * num_buffers
+                    ).numpy()
+                    policy = self.collect_policy
+                else:
+                    self._reset_noise = [True] * num_buffers
+                    policy = self.remote_policy
+
+                self.collect(writers, self._env_steps, policy)
 
     def save(self, path=""):
-        if self._save_path:
+        if self._save_path and self.model is not None:
             try:
                 os.makedirs(os.path.join(os.path.join(self._save_path, path)))
             except OSError:
@@ -266,3 +495,17 @@ class Agent(Process):
                 self.model.save_weights(
                     os.path.join(os.path.join(self._save_path, path), "actor.h5")
                 )
+                if self.model.encoder is None:
+                    NumpyActor.from_actor(self.model).save(
+                        os.path.join(os.path.join(self._save_path, path), "actor.npz")
+                    )
+
+    def close(self):
+        for vec_env, pending in zip(self._vec_envs, self._pending):
+            if pending is not None:
+                # Finish the step running in the background
+                vec_env.step_wait()
+            vec_env.close()
+        if self._inference_client is not None:
+            self._inference_client.close()
+        super(Agent, self).close()
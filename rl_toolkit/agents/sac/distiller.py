@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+import reverb
+import tensorflow as tf
+from tensorflow.keras.optimizers import Adam
+from wandb.integration.keras import WandbMetricsLogger
+
+import wandb
+from rl_toolkit.networks.callbacks import EvaluationCallback
+from rl_toolkit.networks.models import Actor, ActorDistillation, ActorPolicy
+from rl_toolkit.networks.numpy_actor import NumpyActor
+from rl_toolkit.utils import ReplaySchema, make_reverb_dataset
+
+from ...core.process import Process
+
+
+class Distiller(Process):
+    """
+    Distiller
+    =================
+
+    Distills the trained Actor into the smaller student Actor on the replay data.
+    The replay data are sampled from the `distillation` table of the server (`Server.distillation`),
+    the copies of the experiences without the rate limiter and priorities of the training.
+
+    Attributes:
+        env_name (str): the name of environment
+        db_server (str): database server name (IP or domain name)
+        train_steps (int): number of training steps
+        batch_size (int): size of mini-batch used for training
+        learning_rate (float): the learning rate for the student's optimizer
+        actor_units (list): list of the numbers of units in each teacher Actor's layer
+        student_units (list): list of the numbers of units in each student Actor's layer
+        clip_mean_min (float): the minimum value of mean
+        clip_mean_max (float): the maximum value of mean
+        init_noise (float): initialization of the Actor's noise
+        eval_interval (int): number of training steps between evaluations of the teacher and student
+        teacher_path (str): path to the teacher Actor
+        save_path (str): path to the models for saving
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        db_server: str,
+        # ---
+        train_steps: int,
+        batch_size: int,
+        learning_rate: float,
+        # ---
+        actor_units: list,
+        student_units: list,
+        clip_mean_min: float,
+        clip_mean_max: float,
+        init_noise: float,
+        frame_stack: int,
+        # ---
+        eval_interval: int,
+        teacher_path: str,
+        save_path: str,
+        pixels: bool = False,
+        encoder: dict = None,
+        schema: dict = None,
+        env_kwargs: dict = None,
+    ):
+        super(Distiller, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
+
+        tf.config.optimizer.set_jit(True)  # Enable XLA.
+
+        self._train_steps = train_steps
+        self._eval_interval = eval_interval
+        self._save_path = save_path
+
+        # Init teacher's and student's networks
+        teacher = Actor(
+            units=actor_units,
+            n_outputs=np.prod(self._env.action_space.shape),
+            clip_mean_min=clip_mean_min,
+            clip_mean_max=clip_mean_max,
+            init_noise=init_noise,
+            encoder=encoder,
+        )
+        teacher.build((None,) + self._env.observation_space.shape)
+        teacher.load_weights(teacher_path)
+
+        self.student = Actor(
+            units=student_units,
+            n_outputs=np.prod(self._env.action_space.shape),
+            clip_mean_min=clip_mean_min,
+            clip_mean_max=clip_mean_max,
+            init_noise=init_noise,
+            encoder=encoder,
+        )
+        self.student.build((None,) + self._env.observation_space.shape)
+
+        self.model = ActorDistillation(teacher, self.student)
+        self.model.compile(optimizer=Adam(learning_rate=learning_rate))
+
+        # Show models details
+        teacher.summary()
+        self.student.summary()
+
+        self._policies = {
+            "Teacher": ActorPolicy(
+                teacher,
+                self._env.observation_space.shape,
+                self._env.observation_space.dtype,
+            ),
+            "Student": ActorPolicy(
+                self.student,
+                self._env.observation_space.shape,
+                self._env.observation_space.dtype,
+            ),
+        }
+
+        # The training table is rate-limited by the learner's samples per insert
+        if "distillation" not in reverb.Client(db_server).server_info():
+            raise ValueError(
+                "The database server has no distillation table, "
+                "start it with the `distillation` enabled in the Server section of config"
+            )
+
+        # Initializes the reverb's dataset
+        self.dataset = make_reverb_dataset(
+            server_address=db_server,
+            table="distillation",
+            batch_size=batch_size,
+            schema=ReplaySchema(**(schema or {})),
+        )
+
+        # init Weights & Biases
+        wandb.init(project="rl-toolkit", group=f"{env_name}")
+        wandb.config.train_steps = train_steps
+        wandb.config.batch_size = batch_size
+        wandb.config.learning_rate = learning_rate
+        wandb.config.actor_units = actor_units
+        wandb.config.student_units = student_units
+
+    def run(self):
+        self.model.fit(
+            self.dataset,
+            epochs=self._train_steps,
+            steps_per_epoch=1,
+            verbose=0,
+            callbacks=[
+                EvaluationCallback(self._env, self._policies, self._eval_interval),
+                WandbMetricsLogger(log_freq=10),
+            ],
+        )
+
+    def save(self):
+        if self._save_path:
+            os.makedirs(self._save_path, exist_ok=True)
+            # Save model
+            self.student.save_weights(os.path.join(self._save_path, "student.h5"))
+            if self.student.encoder is None:
+                NumpyActor.from_actor(self.student).save(
+                    os.path.join(self._save_path, "student.npz")
+                )
@@ -0,0 +1,179 @@
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import wandb
+from rl_toolkit.networks.models import Actor, ActorPolicy
+from rl_toolkit.utils import InferenceService, VariableContainer
+
+from ...core.process import Process
+
+
+class InferenceServer(Process):
+    """
+    Inference server
+    =================
+
+    Runs the Actor for all connected agents, the requests are batched under the latency deadline.
+
+    Attributes:
+        env_name (str): the name of environment
+        db_server (str): database server name (IP or domain name)
+        port (int): the port number of inference server
+        host (str): the bind address of inference server, `0.0.0.0` serves the agents of the other machines
+        actor_units (list): list of the numbers of units in each Actor's layer
+        clip_mean_min (float): the minimum value of mean
+        clip_mean_max (float): the maximum value of mean
+        init_noise (float): initialization of the Actor's noise
+        max_batch_size (int): maximum number of observations in one batch
+        max_wait_ms (float): maximum waiting time of the request for the batch
+        update_interval (float): interval of loading the policy weights and logging in seconds
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        db_server: str,
+        port: int,
+        # ---
+        actor_units: list,
+        clip_mean_min: float,
+        clip_mean_max: float,
+        init_noise: float,
+        frame_stack: int,
+        # ---
+        max_batch_size: int,
+        max_wait_ms: float,
+        update_interval: float = 1.0,
+        host: str = "127.0.0.1",
+        pixels: bool = False,
+        encoder: dict = None,
+        env_kwargs: dict = None,
+    ):
+        super(InferenceServer, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
+
+        self._update_interval = update_interval
+
+        # Init actor's network
+        self.model = Actor(
+            units=actor_units,
+            n_outputs=np.prod(self._env.action_space.shape),
+            clip_mean_min=clip_mean_min,
+            clip_mean_max=clip_mean_max,
+            init_noise=init_noise,
+            encoder=encoder,
+        )
+        self.model.build((None,) + self._env.observation_space.shape)
+
+        # Show models details
+        self.model.summary()
+
+        # The batch size varies, XLA would re-compile the graph for each of them
+        self._policy = ActorPolicy(
+            self.model,
+            self._env.observation_space.shape,
+            self._env.observation_space.dtype,
+            jit_compile=False,
+        )
+
+        # gSDE noise matrices of the agents' sub-environments
+        self._epsilon = {}
+
+        # Variables
+        self._train_step = tf.Variable(
+            0,
+            trainable=False,
+            dtype=tf.uint64,
+            aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA,
+            shape=(),
+        )
+        self._stop_agents = tf.Variable(
+            False,
+            trainable=False,
+            dtype=tf.bool,
+            aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA,
+            shape=(),
+        )
+
+        # Table for storing variables
+        self._variable_container = VariableContainer(
+            db_server=db_server,
+            table="variables",
+            variables={
+                "policy_variables": self.model.variables,
+                "train_step": self._train_step,
+                "stop_agents": self._stop_agents,
+            },
+        )
+        self._variable_container.update_variables()
+
+        self._service = InferenceService(
+            port=port,
+            host=host,
+            infer_fn=self.infer,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+
+        # Init Weights & Biases
+        wandb.init(
+            project="rl-toolkit",
+            group=f"{env_name}",
+        )
+        wandb.config.max_batch_size = max_batch_size
+        wandb.config.max_wait_ms = max_wait_ms
+
+    def infer(self, requests):
+        epsilon = []
+        for conn, request in requests:
+            # Each sub-environment keeps its noise matrix during the rollout
+            key = (conn, request["stream"])
+            if request["reset_noise"] or key not in self._epsilon:
+                self._epsilon[key] = self.model.sample_noise(
+                    len(request["observation"])
+                )
+            epsilon.append(self._epsilon[key])
+
+        observations = [request["observation"] for _, request in requests]
+        action = self._policy(
+            np.concatenate(observations), epsilon=tf.concat(epsilon, axis=0)
+        )
+
+        response = {
+            "train_step": int(self._train_step.numpy()),
+            "stop_agents": bool(self._stop_agents.numpy()),
+        }
+        splits = np.cumsum([len(x) for x in observations])[:-1]
+        return [{**response, "action": x} for x in np.split(action, splits)]
+
+    def run(self):
+        last_update = time.monotonic()
+
+        # Serve until the learner stops all agents and they disconnect
+        while not (self._stop_agents and self._service.num_connections == 0):
+            for conn in self._service.serve():
+                self._epsilon = {
+                    key: x for key, x in self._epsilon.items() if key[0] is not conn
+                }
+
+            if time.monotonic() - last_update > self._update_interval:
+                last_update = time.monotonic()
+
+                # Load content of variables
+                self._variable_container.update_variables()
+
+                metrics = self._service.metrics()
+                if metrics:
+                    wandb.log(metrics, step=self._train_step.numpy())
+
+    def close(self):
+        self._service.close()
+        super(InferenceServer, self).close()
+        print("The inference server is successfully closed! 🔥🔥🔥")
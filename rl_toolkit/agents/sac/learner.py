@@ -7,9 +7,13 @@ from tensorflow.keras.optimizers import Adam
 from wandb.integration.keras import WandbMetricsLogger
 
 import wandb
-from rl_toolkit.networks.callbacks import SACAgentCallback
+from rl_toolkit.networks.callbacks import PriorityCallback, SACAgentCallback
 from rl_toolkit.networks.models import ActorCritic
-from rl_toolkit.utils import make_reverb_dataset
+from rl_toolkit.utils import (
+    ReplaySchema,
+    autotune_reverb_dataset,
+    make_reverb_dataset,
+)
 
 from ...core.process import Process
 
@@ -39,6 +43,15 @@ class Learner(Process):
         init_alpha (float): initialization of alpha param
         init_noise (float): initialization of the Actor's noise
         save_path (str): path to the models for saving
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        n_step (int): number of rewards summed into the return of the transition
+        prioritized (bool): the experiences are sampled by the priorities, the learner writes back their TD errors
+        importance_exponent (float): exponent of the importance-sampling weights of the prioritized replay
+        priority_update_size (int): number of priorities sent to the database at once
+        sampler (dict): arguments of the replay sampling pipeline (`make_reverb_dataset`), `num_workers: auto` is autotuned
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -74,14 +87,27 @@ class Learner(Process):
         frame_stack: int,
         # ---
         save_path: str,
+        pixels: bool = False,
+        encoder: dict = None,
+        n_step: int = 1,
+        prioritized: bool = False,
+        importance_exponent: float = 0.4,
+        priority_update_size: int = 65536,
+        sampler: dict = None,
+        schema: dict = None,
+        env_kwargs: dict = None,
     ):
-        super(Learner, self).__init__(env_name, False, frame_stack)
+        super(Learner, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
 
         tf.config.optimizer.set_jit(True)  # Enable XLA.
 
         self._train_steps = train_steps
         self._save_path = save_path
         self._db_server = db_server
+        self._prioritized = prioritized
+        self._priority_update_size = priority_update_size
 
         # Init actor-critic's network
         self.model = ActorCritic(
@@ -97,6 +123,9 @@ class Learner(Process):
             tau=tau,
             init_alpha=init_alpha,
             init_noise=init_noise,
+            encoder=encoder,
+            n_step=n_step,
+            importance_exponent=importance_exponent if prioritized else 0.0,
             merge_index=merge_index,
         )
         self.model.build((None,) + self._env.observation_space.shape)
@@ -116,16 +145,32 @@ class Learner(Process):
         self.model.summary()
 
         # Initializes the reverb's dataset
-        self.dataset = make_reverb_dataset(
-            server_address=self._db_server,
-            table="experience",
-            batch_size=batch_size,
-        )
+        sampler = dict(sampler or {})
+        schema = ReplaySchema(**(schema or {}))
+        if sampler.get("num_workers") == "auto":
+            del sampler["num_workers"]
+            self.dataset, sampler["num_workers"] = autotune_reverb_dataset(
+                self.model,
+                server_address=self._db_server,
+                table="experience",
+                batch_size=batch_size,
+                schema=schema,
+                **sampler,
+            )
+        else:
+            self.dataset = make_reverb_dataset(
+                server_address=self._db_server,
+                table="experience",
+                batch_size=batch_size,
+                schema=schema,
+                **sampler,
+            )
 
         # init Weights & Biases
         wandb.init(project="rl-toolkit", group=f"{env_name}")
         wandb.config.train_steps = train_steps
         wandb.config.batch_size = batch_size
+        wandb.config.sampler = sampler
         wandb.config.actor_units = actor_units
         wandb.config.critic_units = critic_units
         wandb.config.actor_learning_rate = actor_learning_rate
@@ -139,20 +184,29 @@ class Learner(Process):
         wandb.config.clip_mean_min = clip_mean_min
         wandb.config.clip_mean_max = clip_mean_max
         wandb.config.gamma = gamma
+        wandb.config.n_step = n_step
+        wandb.config.prioritized = prioritized
+        wandb.config.importance_exponent = importance_exponent
         wandb.config.tau = tau
         wandb.config.init_alpha = init_alpha
         wandb.config.init_noise = init_noise
 
     def run(self):
+        callbacks = [SACAgentCallback(self._db_server)]
+
+        # The priority telemetry is logged with the metrics of the step
+        if self._prioritized:
+            callbacks.append(
+                PriorityCallback(self._db_server, self._priority_update_size)
+            )
+        callbacks.append(WandbMetricsLogger(log_freq=10))
+
         self.model.fit(
             self.dataset,
             epochs=self._train_steps,
             steps_per_epoch=1,
             verbose=0,
-            callbacks=[
-                SACAgentCallback(self._db_server),
-                WandbMetricsLogger(log_freq=10),
-            ],
+            callbacks=callbacks,
         )
 
     def save(self):
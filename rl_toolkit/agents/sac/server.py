@@ -3,7 +3,7 @@ import reverb
 import tensorflow as tf
 
 from rl_toolkit.networks.models import ActorCritic
-from rl_toolkit.utils import VariableContainer
+from rl_toolkit.utils import ReplaySchema, VariableContainer
 
 from ...core.process import Process
 
@@ -32,6 +32,13 @@ class Server(Process):
         samples_per_insert (int): samples per insert ratio (SPI) `= num_sampled_items / num_inserted_items`
         actor_critic_path (str): path to the Actor-Critic model
         db_path (str): path to the database checkpoint
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        prioritized (bool): sample the experiences proportionally to their priorities
+        priority_exponent (float): the prioritization exponent (`0.0` is the uniform sampling)
+        distillation (bool): keep the copies of the experiences in the `distillation` table for the distiller
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -63,8 +70,17 @@ class Server(Process):
         # ---
         actor_critic_path: str,
         db_path: str,
+        pixels: bool = False,
+        encoder: dict = None,
+        prioritized: bool = False,
+        priority_exponent: float = 0.6,
+        distillation: bool = False,
+        schema: dict = None,
+        env_kwargs: dict = None,
     ):
-        super(Server, self).__init__(env_name, False, frame_stack)
+        super(Server, self).__init__(
+            env_name, False, frame_stack, pixels, env_kwargs=env_kwargs
+        )
 
         # Init actor-critic network
         actor_critic = ActorCritic(
@@ -80,6 +96,7 @@ class Server(Process):
             tau=tau,
             init_alpha=init_alpha,
             init_noise=init_noise,
+            encoder=encoder,
             merge_index=merge_index,
         )
         actor_critic.build((None,) + self._env.observation_space.shape)
@@ -136,33 +153,54 @@ class Server(Process):
         else:
             limiter = reverb.rate_limiters.MinSize(min_replay_size)
 
+        if prioritized:
+            sampler = reverb.selectors.Prioritized(priority_exponent)
+        else:
+            sampler = reverb.selectors.Uniform()
+
+        # Size the replay buffer against RAM
+        schema = ReplaySchema(**(schema or {}))
+        if schema.sequence_length:
+            raise ValueError("The sequence layout is supported by the DQN only")
+        signature = schema.signature(
+            self._env.observation_space, self._env.action_space
+        )
+        bytes_per_item = ReplaySchema.bytes_per_item(signature)
+        print(
+            f"Replay item: {bytes_per_item} bytes, "
+            f"{bytes_per_item * max_replay_size / 2**30:.2f} GiB at max_replay_size"
+        )
+
+        # The distiller samples the copies of the items without the rate limiter of the training,
+        # it neither blocks nor consumes the learner's sampling budget
+        if distillation:
+            distillation_tables = [
+                reverb.Table(  # Uniform replay buffer of the distiller
+                    name="distillation",
+                    sampler=reverb.selectors.Uniform(),
+                    remover=reverb.selectors.Fifo(),
+                    rate_limiter=reverb.rate_limiters.MinSize(min_replay_size),
+                    max_size=max_replay_size,
+                    max_times_sampled=0,
+                    signature=signature,
+                )
+            ]
+        else:
+            distillation_tables = []
+
         # Initialize the reverb server
         self.server = reverb.Server(
             tables=[
                 reverb.Table(  # Off-policy Replay buffer
                     name="experience",
-                    sampler=reverb.selectors.Uniform(),
+                    sampler=sampler,
                     remover=reverb.selectors.Fifo(),
                     rate_limiter=limiter,
                     max_size=max_replay_size,
                     max_times_sampled=0,
-                    signature={
-                        "observation": tf.TensorSpec(
-                            [*self._env.observation_space.shape],
-                            self._env.observation_space.dtype,
-                        ),
-                        "action": tf.TensorSpec(
-                            [*self._env.action_space.shape],
-                            self._env.action_space.dtype,
-                        ),
-                        "ext_reward": tf.TensorSpec([1], tf.float64),
-                        "next_observation": tf.TensorSpec(
-                            [*self._env.observation_space.shape],
-                            self._env.observation_space.dtype,
-                        ),
-                        "terminal": tf.TensorSpec([1], tf.bool),
-                    },
+                    signature=signature,
                 ),
+                *distillation_tables,
                 reverb.Table(  # Variables container
                     name="variables",
                     sampler=reverb.selectors.Uniform(),
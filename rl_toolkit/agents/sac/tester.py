@@ -1,9 +1,12 @@
+import time
+
 import numpy as np
-import tensorflow as tf
 from dm_control import viewer
 
 import wandb
-from rl_toolkit.networks.models import Actor
+from rl_toolkit.networks.models import Actor, ActorPolicy
+from rl_toolkit.networks.numpy_actor import NumpyActor
+from rl_toolkit.networks.tflite import TFLitePolicy, export_tflite
 
 from ...core.process import Process
 from ...core.wrappers import dmControlGymWrapper
@@ -22,8 +25,12 @@ class Tester(Process):
         clip_mean_min (float): the minimum value of mean
         clip_mean_max (float): the maximum value of mean
         init_noise (float): initialization of the Actor's noise
-        model_path (str): path to the model
+        model_path (str): path to the model (`.npz` file runs the Actor in NumPy, `.tflite` file runs the exported policy)
         enable_wandb (bool): enable Weights & Biases logging module
+        pixels (bool): the observations are the rendered `uint8` frames
+        encoder (dict): parameters of the convolutional encoder of the pixel observations
+        action_repeat (int): number of environment steps per action, the policy is called once per the repeated steps
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -41,28 +48,57 @@ class Tester(Process):
         # ---
         model_path: str,
         enable_wandb: bool,
+        pixels: bool = False,
+        encoder: dict = None,
+        action_repeat: int = 1,
+        env_kwargs: dict = None,
     ):
-        super(Tester, self).__init__(env_name, render, frame_stack)
+        super(Tester, self).__init__(
+            env_name, render, frame_stack, pixels, action_repeat, env_kwargs
+        )
 
         self._max_steps = max_steps
         self._render = render
         self._enable_wandb = enable_wandb
 
-        # Init actor's network
-        self.model = Actor(
-            units=actor_units,
-            n_outputs=np.prod(self._env.action_space.shape),
-            clip_mean_min=clip_mean_min,
-            clip_mean_max=clip_mean_max,
-            init_noise=init_noise,
-        )
-        self.model.build((None,) + self._env.observation_space.shape)
+        if (
+            self._env.unwrapped.spec is not None
+            and self._env.unwrapped.spec.id == "HumanoidRobot-v0"
+            and max_steps > 0
+        ):
+            self._env.unwrapped.connect()
+
+        if model_path is not None and model_path.endswith(".tflite"):
+            # The exported policy runs without the Keras model
+            self.model = None
+            self._policy = TFLitePolicy(model_path)
+        else:
+            # Init actor's network
+            self.model = Actor(
+                units=actor_units,
+                n_outputs=np.prod(self._env.action_space.shape),
+                clip_mean_min=clip_mean_min,
+                clip_mean_max=clip_mean_max,
+                init_noise=init_noise,
+                encoder=encoder,
+            )
+            self.model.build((None,) + self._env.observation_space.shape)
+
+            if model_path is not None and model_path.endswith(".npz"):
+                # Exported weights are used without Tensorflow
+                self._policy = NumpyActor.load(model_path)
+            else:
+                if model_path is not None:
+                    self.model.load_weights(model_path)
 
-        if model_path is not None:
-            self.model.load_weights(model_path)
+                self._policy = ActorPolicy(
+                    self.model,
+                    self._env.observation_space.shape,
+                    self._env.observation_space.dtype,
+                )
 
-        # Show models details
-        self.model.summary()
+            # Show models details
+            self.model.summary()
 
         # Init Weights & Biases
         if not self._render and self._enable_wandb:
@@ -72,30 +108,47 @@ class Tester(Process):
             )
             wandb.config.max_steps = max_steps
 
-    @tf.function(jit_compile=True)
     def policy(self, inputs):
-        action = self.model(
-            tf.expand_dims(inputs, axis=0),
-            with_log_prob=False,
-            deterministic=True,
-            training=False,
+        return self._policy(inputs, deterministic=True)
+
+    def export(self, path, quantization="none", calibration_data=None):
+        if self.model is None:
+            raise ValueError("The policy is exported from the Keras model")
+        export_tflite(
+            lambda x: self.model(
+                x, with_log_prob=False, deterministic=True, training=False
+            ),
+            self.model,
+            self._env.observation_space.shape,
+            path,
+            quantization=quantization,
+            calibration_data=calibration_data,
+            observation_dtype=self._env.observation_space.dtype,
         )
-        return tf.squeeze(action, axis=0)
 
     def dm_policy(self, timestep):
-        state = self._env.flatten_observation(timestep.observation)
-        return self._env.scale_action(self.policy(state))
+        env = self._env.unwrapped
+
+        # The action is held for the repeated physics steps
+        if timestep.first():
+            self._viewer_steps = 0
+        if self._viewer_steps % env.action_repeat == 0:
+            state = env.get_observation(timestep.observation)
+            self._viewer_action = np.copy(env.scale_action(self.policy(state)))
+        self._viewer_steps += 1
+        return self._viewer_action
 
     def run(self):
-        if isinstance(self._env, dmControlGymWrapper) and self._render:
+        if isinstance(self._env.unwrapped, dmControlGymWrapper) and self._render:
             # Launch the viewer application.
-            viewer.launch(self._env.env, policy=self.dm_policy)
+            viewer.launch(self._env.unwrapped.env, policy=self.dm_policy)
             return
 
         self._total_steps = 0
         self._total_episodes = 0
         self._episode_reward = 0.0
         self._episode_steps = 0
+        self._episode_latency = 0.0
 
         # Init environment
         self._last_obs, _ = self._env.reset()
@@ -103,11 +156,13 @@ class Tester(Process):
         # Main loop
         while self._total_steps < self._max_steps:
             # Get the action
+            start = time.perf_counter()
             action = self.policy(self._last_obs)
+            self._episode_latency += time.perf_counter() - start
             action = np.array(action, copy=False, dtype=self._env.action_space.dtype)
 
             # Perform action
-            new_obs, reward, terminated, truncated, _ = self._env.step(action)
+            new_obs, reward, terminated, truncated, info = self._env.step(action)
 
             # Update variables
             self._episode_reward += reward
@@ -121,7 +176,17 @@ class Tester(Process):
                 print(f"Epoch: {self._total_episodes}")
                 print(f"Score: {self._episode_reward}")
                 print(f"Steps: {self._episode_steps}")
+                print(
+                    f"Latency: {self._episode_latency * 1000.0 / self._episode_steps} ms"
+                )
                 print(f"TotalInteractions: {self._total_steps}")
+                # Statistics of the real-time control loop
+                real_time = {
+                    f"Real-time/{key}": value
+                    for key, value in info.get("real_time", {}).items()
+                }
+                for key, value in real_time.items():
+                    print(f"{key}: {value}")
                 print("=============================================")
                 print(
                     f"Testing ... {(self._total_steps * 100) / self._max_steps} %"  # noqa
@@ -132,6 +197,10 @@ class Tester(Process):
                             "Epoch": self._total_episodes,
                             "Score": self._episode_reward,
                             "Steps": self._episode_steps,
+                            "Latency": self._episode_latency
+                            * 1000.0
+                            / self._episode_steps,
+                            **real_time,
                         },
                         step=self._total_steps,
                     )
@@ -139,6 +208,7 @@ class Tester(Process):
                 # Init variables
                 self._episode_reward = 0.0
                 self._episode_steps = 0
+                self._episode_latency = 0.0
                 self._total_episodes += 1
 
                 # Init environment
@@ -0,0 +1,195 @@
+import socket
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import reverb
+
+from rl_toolkit.utils import InsertQueue
+from rl_toolkit.utils.inference import get_authkey
+
+
+class Aggregator:
+    """
+    Aggregator
+    =================
+
+    Node-local proxy of the database server shared by the agents of one machine. The agents' insert queues
+    (`InsertQueue` with the `aggregator`) send their appended steps and item slices in batches to the insert port
+    on the localhost. The streams of all agents are merged into one trajectory writer, its chunks of
+    `max_chunk_length` steps hold the steps of all agents and one flush every `max_wait_ms` milliseconds
+    confirms the items of all agents, instead of the chunks and flushes of every agent's stream.
+    The items still reference the shared steps (e.g. the stacked frames) by the slices of each agent's stream.
+    The calls are queued by one sender (`InsertQueue`), the agents are never blocked by the server.
+    The remote variables are cached in the local variables table and refreshed every `update_interval` seconds,
+    so the agents read them without the remote round trips.
+
+    Attributes:
+        db_server (str): the remote database server address (e.g. 192.168.1.2:8000)
+        port (int): the port number of the local variables server
+        insert_port (int): the port number of the agents' inserts on the localhost
+        update_interval (float): seconds between the refreshes of the cached variables
+        keep_alive_refs (int): number of the last steps of all agents kept by the merged writer
+        max_chunk_length (int): number of steps per chunk of the columns missing in `chunk_length`
+        max_wait_ms (float): latency deadline of the items, milliseconds between the flushes of the merged writer
+        chunk_length (dict): number of steps per chunk of the replay columns
+        insert_queue (dict): parameters of the background sender (`InsertQueue`)
+        table (str): the name of experience table
+    """
+
+    def __init__(
+        self,
+        # ---
+        db_server: str,
+        port: int,
+        insert_port: int,
+        # ---
+        update_interval: float = 1.0,
+        keep_alive_refs: int = 4096,
+        max_chunk_length: int = 64,
+        max_wait_ms: float = 50.0,
+        chunk_length: dict = None,
+        insert_queue: dict = None,
+        table: str = "experience",
+    ):
+        self._update_interval = update_interval
+        self._authkey = get_authkey()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        # The local variables table mirrors the signature of the remote one
+        self._remote = reverb.Client(db_server)
+        info = self._remote.server_info()
+        self.server = reverb.Server(
+            tables=[
+                reverb.Table(  # Variables cache
+                    name="variables",
+                    sampler=reverb.selectors.Uniform(),
+                    remover=reverb.selectors.Fifo(),
+                    rate_limiter=reverb.rate_limiters.MinSize(1),
+                    max_size=1,
+                    signature=info["variables"].signature,
+                ),
+            ],
+            port=port,
+        )
+        self._local = self.server.localhost_client()
+
+        # The agents wait for the first variables
+        self._update_variables()
+
+        # The keep-alive of the streams is set by the agents, their steps are merged into the long chunks
+        self._insert_queue = InsertQueue(
+            db_server,
+            1,
+            {
+                column: (chunk_length or {}).get(column, max_chunk_length)
+                for column in info[table].signature
+            },
+            table=table,
+            shared_keep_alive_refs=keep_alive_refs,
+            flush_interval=max_wait_ms / 1000.0,
+            **(insert_queue or {}),
+        )
+        self._insert_port = insert_port
+        self._listener = Listener(("127.0.0.1", insert_port), authkey=self._authkey)
+        self._connections = set()
+        self._readers = []
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+        # Statistics
+        self.num_calls = 0
+        self.num_batches = 0
+        self.num_streams = 0
+
+    def _update_variables(self):
+        # The inserted variables are the trajectory of one step
+        sample = next(self._remote.sample("variables", emit_timesteps=False))
+        self._local.insert(
+            [value[0] for value in sample.data], priorities={"variables": 1.0}
+        )
+        self._last_update = time.monotonic()
+
+    def _accept(self):
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                continue
+            if self._stop.is_set():
+                conn.close()
+                break
+            self._connections.add(conn)
+            reader = threading.Thread(target=self._read, args=(conn,), daemon=True)
+            reader.start()
+            self._readers.append(reader)
+
+    def _read(self, conn):
+        # The agent's streams are mapped to the streams of the sender
+        streams = {}
+        try:
+            while True:
+                messages = conn.recv()
+                for stream, method, args in messages:
+                    if method == "open":
+                        streams[stream] = self._insert_queue.open_stream(args)
+                        self.num_streams += 1
+                    else:
+                        self._insert_queue.put(streams[stream], method, args)
+                self.num_calls += len(messages)
+                self.num_batches += 1
+        except (OSError, EOFError):
+            # Agent disconnected, its writers are closed
+            for stream in streams.values():
+                self._insert_queue.put(stream, "release", None)
+        finally:
+            self._connections.discard(conn)
+            conn.close()
+
+    def run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                if self._stop.is_set():
+                    break
+                self._update_variables()
+            self._stop.wait(self._update_interval)
+
+    def metrics(self):
+        return {
+            "Aggregator/calls": self.num_calls,
+            "Aggregator/batches": self.num_batches,
+            "Aggregator/calls_per_batch": self.num_calls / max(self.num_batches, 1),
+            "Aggregator/streams": self.num_streams,
+            "Aggregator/connections": len(self._connections),
+            **self._insert_queue.metrics(),
+        }
+
+    def close(self):
+        # The variables being refreshed are inserted first
+        with self._lock:
+            self._stop.set()
+
+        # The blocked acceptor is woken up by the last connection
+        Client(("localhost", self._insert_port), authkey=self._authkey).close()
+        self._acceptor.join()
+        self._listener.close()
+
+        # The readers release the streams of the connected agents
+        for conn in list(self._connections):
+            try:
+                with socket.fromfd(
+                    conn.fileno(), socket.AF_INET, socket.SOCK_STREAM
+                ) as sock:
+                    sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                continue
+        for reader in self._readers:
+            reader.join()
+        self._insert_queue.close()
+        self.server.stop()
+        print(
+            f"Forwarded {self.num_calls} calls in {self.num_batches} batches to the database server"
+        )
+        print("The aggregator is successfully closed! 🔥🔥🔥")
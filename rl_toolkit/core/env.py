@@ -0,0 +1,121 @@
+from functools import partial
+
+import gymnasium
+
+from .wrappers import (
+    ActionRepeat,
+    FrameStack,
+    PixelObservation,
+    VectorFrameStack,
+    dmControlGetTasks,
+    dmControlGymWrapper,
+)
+
+
+def _is_dm_control(env_name: str):
+    return any(x[0] in env_name and x[1] in env_name for x in dmControlGetTasks())
+
+
+def make_env(
+    env_name: str,
+    render: bool = False,
+    frame_stack: int = 1,
+    pixels: bool = False,
+    action_repeat: int = 1,
+    env_kwargs: dict = None,
+):
+    """Create a single (optionally frame-stacked) environment
+
+    With `pixels` the observations are the rendered `uint8` frames.
+    With `action_repeat` the observation is made (rendered) only after the last repeated step.
+    The `env_kwargs` are passed to the environment (e.g. `dtype` of the dm_control observations).
+    """
+    env_kwargs = env_kwargs or {}
+    if _is_dm_control(env_name):
+        s = env_name.split("-")
+        env = dmControlGymWrapper(
+            domain_name=s[0],
+            task_name=s[1],
+            pixels=pixels,
+            action_repeat=action_repeat,
+            **env_kwargs,
+        )
+    else:
+        # Import third-party environments
+        try:
+            import flappy_bird_gymnasium  # noqa
+        except ImportError as e:
+            print(f"The third-party environment {e} is not available!")
+
+        env = gymnasium.make(
+            env_name,
+            render_mode="rgb_array" if pixels else ("human" if render else None),
+            **env_kwargs,
+        )
+        if action_repeat > 1:
+            env = ActionRepeat(env, action_repeat)
+        if pixels:
+            env = PixelObservation(env)
+        if frame_stack > 1:
+            env = FrameStack(env, frame_stack)
+
+    return env
+
+
+def make_vector_env(
+    env_name: str,
+    num_envs: int,
+    frame_stack: int,
+    asynchronous: bool = False,
+    env=None,
+    pixels: bool = False,
+    action_repeat: int = 1,
+    env_kwargs: dict = None,
+):
+    """Create `num_envs` copies of the environment stepped as one batch
+
+    Sub-environments are reset in the same step in which their episode ends,
+    the last observation of the finished episode is stored in `info["final_obs"]`.
+    The stacked observations are views into the ring buffer, valid until the second next step.
+
+    Args:
+        env_name (str): the name of environment
+        num_envs (int): number of sub-environments
+        frame_stack (int): number of stacked frames
+        asynchronous (bool): step sub-environments in parallel processes
+        env: already created environment re-used as the first sub-environment (synchronous mode only)
+        pixels (bool): the observations are the rendered `uint8` frames
+        action_repeat (int): number of environment steps per action
+        env_kwargs (dict): keyword arguments of the environment
+    """
+    # The frames are stacked in one ring buffer for all sub-environments
+    stacked = frame_stack > 1 and not _is_dm_control(env_name)
+    env_fn = partial(
+        make_env,
+        env_name,
+        False,
+        1 if stacked else frame_stack,
+        pixels,
+        action_repeat,
+        env_kwargs,
+    )
+
+    if asynchronous:
+        vec_env = gymnasium.vector.AsyncVectorEnv(
+            [env_fn] * num_envs,
+            autoreset_mode=gymnasium.vector.AutoresetMode.SAME_STEP,
+        )
+    else:
+        env_fns = [env_fn] * num_envs
+        if env is not None:
+            if isinstance(env, FrameStack):
+                env = env.env
+            env_fns[0] = lambda: env
+        vec_env = gymnasium.vector.SyncVectorEnv(
+            env_fns,
+            autoreset_mode=gymnasium.vector.AutoresetMode.SAME_STEP,
+        )
+
+    if stacked:
+        vec_env = VectorFrameStack(vec_env, frame_stack)
+    return vec_env
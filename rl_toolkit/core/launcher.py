@@ -0,0 +1,171 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import time
+
+import wandb
+
+
+def _run_agent(agent_module, agent_kwargs, worker_id, cores, stats_queue):
+    # Pin the worker before Tensorflow is imported, so it sizes its thread pools to the core
+    if cores is not None:
+        os.sched_setaffinity(0, cores)
+
+    Agent = importlib.import_module(agent_module).Agent
+    agent = Agent(**agent_kwargs, stats_queue=stats_queue, worker_id=worker_id)
+
+    try:
+        agent.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Save model
+        agent.save()
+        agent.close()
+
+
+class AgentLauncher:
+    """
+    Agent launcher
+    =================
+
+    Starts several agent processes pointed at the same database server,
+    restarts the crashed ones and merges their episode statistics into one stream.
+
+    Attributes:
+        env_name (str): the name of environment
+        agent_module (str): module with the `Agent` class (e.g. `rl_toolkit.agents.sac`)
+        agent_kwargs (dict): arguments of the `Agent` class
+        num_workers (int): number of agent processes
+        pin_cores (bool): pin each agent process to its own CPU core
+        max_restarts (int): maximum number of restarts of crashed agents (negative value means unlimited)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        agent_module: str,
+        agent_kwargs: dict,
+        # ---
+        num_workers: int,
+        pin_cores: bool = True,
+        max_restarts: int = -1,
+    ):
+        self._agent_module = agent_module
+        self._agent_kwargs = agent_kwargs
+        self._num_workers = num_workers
+        self._max_restarts = max_restarts
+        self._save_path = agent_kwargs.get("save_path")
+
+        # Tensorflow is not fork-safe
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stats_queue = self._ctx.Queue()
+
+        if pin_cores and hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+            self._cores = [{cores[i % len(cores)]} for i in range(num_workers)]
+        else:
+            self._cores = [None] * num_workers
+
+        self._workers = [None] * num_workers
+        self._restarts = 0
+
+        # Init Weights & Biases
+        wandb.init(
+            project="rl-toolkit",
+            group=f"{env_name}",
+        )
+        wandb.config.num_workers = num_workers
+
+    def _start_worker(self, worker_id):
+        agent_kwargs = dict(self._agent_kwargs)
+        if self._save_path:
+            agent_kwargs["save_path"] = os.path.join(
+                self._save_path, f"worker_{worker_id}"
+            )
+
+        # Agents with asynchronous environments start their own sub-processes
+        worker = self._ctx.Process(
+            target=_run_agent,
+            args=(
+                self._agent_module,
+                agent_kwargs,
+                worker_id,
+                self._cores[worker_id],
+                self._stats_queue,
+            ),
+            name=f"agent-{worker_id}",
+            daemon=False,
+        )
+        worker.start()
+        self._workers[worker_id] = worker
+
+    def _supervise(self):
+        running = 0
+        for worker_id, worker in enumerate(self._workers):
+            if worker.is_alive():
+                running += 1
+            elif worker.exitcode != 0 and self._restarts != self._max_restarts:
+                print(
+                    f"Agent {worker_id} crashed with exit code {worker.exitcode}, restarting ❗❗❗"
+                )
+                self._restarts += 1
+                wandb.log({"Restarts": self._restarts}, commit=False)
+                self._start_worker(worker_id)
+                running += 1
+        return running
+
+    def run(self):
+        self._total_episodes = 0
+        self._total_steps = [0] * self._num_workers
+        self._best_episode_reward = float("-inf")
+        self._train_step = 0
+
+        for worker_id in range(self._num_workers):
+            self._start_worker(worker_id)
+
+        # Main loop, ends when the learner stops all agents
+        while self._supervise() > 0:
+            deadline = time.monotonic() + 1.0
+            while time.monotonic() < deadline:
+                try:
+                    stats = self._stats_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                self._log(stats)
+
+    def _log(self, stats):
+        worker_id = stats.pop("Worker")
+        self._total_steps[worker_id] = stats.pop("TotalInteractions")
+        self._best_episode_reward = max(self._best_episode_reward, stats["Score"])
+
+        # W&B requires monotonically increasing steps
+        self._train_step = max(self._train_step, stats.pop("Train step"))
+
+        print(
+            f"Epoch: {self._total_episodes} | Agent: {worker_id} | Score: {stats['Score']} | "
+            f"Best score: {self._best_episode_reward} | Steps: {stats['Steps']} | "
+            f"TotalInteractions: {sum(self._total_steps)} | Train step: {self._train_step}"
+        )
+        wandb.log(
+            {
+                **stats,
+                "Epoch": self._total_episodes,
+                "TotalInteractions": sum(self._total_steps),
+            },
+            step=self._train_step,
+        )
+        self._total_episodes += 1
+
+    def close(self):
+        # Give the agents time to save their models
+        for worker in self._workers:
+            if worker is not None:
+                worker.join(timeout=30.0)
+        for worker in self._workers:
+            if worker is not None and worker.is_alive():
+                worker.terminate()
+                worker.join()
+        print("All agents are successfully closed! 🔥🔥🔥")
@@ -0,0 +1,213 @@
+import multiprocessing
+import queue
+import time
+from contextlib import ExitStack
+
+
+def _run_worker(
+    env_name,
+    frame_stack,
+    pixels,
+    action_repeat,
+    db_server,
+    num_steps,
+    num_envs,
+    batch_size,
+    n_step,
+    gamma,
+    chunk_length,
+    schema,
+    env_kwargs,
+    progress_queue,
+):
+    import reverb
+
+    from rl_toolkit.utils import ReplaySchema, make_trajectory_writer
+
+    from .env import make_vector_env
+    from .transitions import TransitionWriter
+    from .wrappers import VectorFrameStack
+
+    vec_env = make_vector_env(
+        env_name,
+        num_envs,
+        frame_stack,
+        pixels=pixels,
+        action_repeat=action_repeat,
+        env_kwargs=env_kwargs,
+    )
+    client = reverb.Client(db_server)
+    schema = ReplaySchema(**(schema or {}))
+    obs, _ = vec_env.reset()
+
+    # dm_control tasks are not stacked
+    if not isinstance(vec_env, VectorFrameStack):
+        frame_stack = 1
+
+    # The items are copied into the distiller's table, if the server has it
+    info = client.server_info()
+    tables = [table for table in ("experience", "distillation") if table in info]
+
+    # The layout of the agents, one trajectory stream per sub-environment
+    with ExitStack() as stack:
+        writers = [
+            stack.enter_context(
+                make_trajectory_writer(
+                    client,
+                    TransitionWriter.num_keep_alive_refs(frame_stack, n_step),
+                    chunk_length,
+                )
+            )
+            for _ in range(num_envs)
+        ]
+        transitions = [
+            TransitionWriter(writer, schema, frame_stack, n_step, gamma, tables)
+            for writer in writers
+        ]
+
+        # The items are confirmed once per batch, except those waiting for the incomplete chunks
+        pending = 0
+        for _ in range(0, num_steps, num_envs):
+            action = vec_env.action_space.sample()
+            new_obs, ext_reward, terminated, truncated, info = vec_env.step(action)
+
+            for i in range(num_envs):
+                transitions[i].append(obs[i], action[i], ext_reward[i])
+
+                # The finished sub-environments are already reset
+                if terminated[i] or truncated[i]:
+                    transitions[i].end_episode(info["final_obs"][i], terminated[i])
+            obs = new_obs
+
+            pending += num_envs
+            if pending >= batch_size:
+                for writer in writers:
+                    writer.flush(max((chunk_length or {}).values(), default=0))
+                progress_queue.put(pending)
+                pending = 0
+
+        for writer in writers:
+            writer.flush()
+        progress_queue.put(pending)
+
+    vec_env.close()
+
+
+class Prefill:
+    """
+    Prefill
+    =================
+
+    Fills the experience table with the uniform-random transitions before the agents start,
+    the environments are stepped by the pool of processes and the transitions are inserted in large batches.
+    The transitions are written in the layout of the agents (`TransitionWriter`), one stream per sub-environment.
+    The agents skip the warmup steps which are already in the table.
+
+    Attributes:
+        env_name (str): the name of environment
+        db_server (str): database server name (IP or domain name)
+        num_steps (int): number of inserted transitions
+        num_workers (int): number of worker processes
+        num_envs (int): number of sub-environments per worker
+        batch_size (int): number of transitions sent to the database at once
+        pixels (bool): the observations are the rendered `uint8` frames
+        action_repeat (int): number of environment steps per action
+        n_step (int): number of rewards summed into the return of the transition
+        gamma (float): the discount factor of the n-step return
+        chunk_length (dict): number of steps per chunk of the replay columns, the missing columns are auto-tuned
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        db_server: str,
+        frame_stack: int,
+        # ---
+        num_steps: int,
+        num_workers: int,
+        num_envs: int,
+        batch_size: int,
+        pixels: bool = False,
+        action_repeat: int = 1,
+        n_step: int = 1,
+        gamma: float = 0.99,
+        chunk_length: dict = None,
+        schema: dict = None,
+        env_kwargs: dict = None,
+    ):
+        if (schema or {}).get("sequence_length"):
+            raise ValueError("The prefill does not support the sequence layout")
+        self._num_steps = num_steps
+
+        # Tensorflow is not fork-safe
+        ctx = multiprocessing.get_context("spawn")
+        self._progress_queue = ctx.Queue()
+
+        # Split the steps between workers
+        steps = [num_steps // num_workers] * num_workers
+        for worker_id in range(num_steps % num_workers):
+            steps[worker_id] += 1
+
+        self._workers = [
+            ctx.Process(
+                target=_run_worker,
+                args=(
+                    env_name,
+                    frame_stack,
+                    pixels,
+                    action_repeat,
+                    db_server,
+                    worker_steps,
+                    num_envs,
+                    batch_size,
+                    n_step,
+                    gamma,
+                    chunk_length,
+                    schema,
+                    env_kwargs,
+                    self._progress_queue,
+                ),
+                name=f"prefill-{worker_id}",
+            )
+            for worker_id, worker_steps in enumerate(steps)
+            if worker_steps > 0
+        ]
+
+    def run(self):
+        start = time.monotonic()
+        total_steps = 0
+
+        for worker in self._workers:
+            worker.start()
+
+        while total_steps < self._num_steps and any(
+            worker.is_alive() for worker in self._workers
+        ):
+            try:
+                total_steps += self._progress_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            elapsed = time.monotonic() - start
+            print(
+                f"Prefill: {total_steps} / {self._num_steps} transitions "
+                f"({total_steps / elapsed:.0f} per second)"
+            )
+
+        for worker in self._workers:
+            worker.join()
+            if worker.exitcode != 0:
+                raise RuntimeError(
+                    f"Worker {worker.name} failed with exit code {worker.exitcode}"
+                )
+
+    def close(self):
+        for worker in self._workers:
+            if worker.pid is None:
+                continue
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        print("The replay buffer is successfully prefilled! 🔥🔥🔥")
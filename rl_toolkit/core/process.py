@@ -1,6 +1,6 @@
 import tensorflow as tf
 
-from .wrappers import FrameStack, dmControlGetTasks, dmControlGymWrapper
+from .env import make_env
 
 
 class Process:
@@ -11,6 +11,10 @@ class Process:
     Attributes:
         env_name (str): the name of environment
         render (bool): enable the rendering
+        frame_stack (int): number of stacked frames
+        pixels (bool): the observations are the rendered `uint8` frames
+        action_repeat (int): number of environment steps per action
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
     """
 
     def __init__(
@@ -19,25 +23,14 @@ class Process:
         env_name: str,
         render: bool,
         frame_stack: int,
+        pixels: bool = False,
+        action_repeat: int = 1,
+        env_kwargs: dict = None,
     ):
         # Init environment
-        if any(x[0] in env_name and x[1] in env_name for x in dmControlGetTasks()):
-            s = env_name.split("-")
-            self._env = dmControlGymWrapper(domain_name=s[0], task_name=s[1])
-        else:
-            # Import third-party environments
-            try:
-                import flappy_bird_gymnasium  # noqa
-            except ImportError as e:
-                print(f"The third-party environment {e} is not available!")
-
-            import gymnasium
-
-            self._env = gymnasium.make(
-                env_name, render_mode="human" if render else None
-            )
-            if frame_stack > 1:
-                self._env = FrameStack(self._env, frame_stack)
+        self._env = make_env(
+            env_name, render, frame_stack, pixels, action_repeat, env_kwargs
+        )
 
         gpus = tf.config.list_physical_devices("GPU")
         if gpus:
@@ -0,0 +1,190 @@
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from rl_toolkit.utils import ReplaySchema, make_trajectory_writer
+
+from .process import Process
+from .wrappers import FrameStack
+
+COLUMNS = ("observation", "action", "ext_reward", "terminal")
+
+
+class ReplayBenchmark(Process):
+    """
+    Replay benchmark
+    =================
+
+    Measures the stored bytes per item and the insert throughput of the chunking settings.
+    The episodes are collected by the random policy once, then every setting inserts the same episodes
+    into its own local database the way the agents do it (single frames, stacked by the items).
+    The stored bytes are the size of the database checkpoint divided by the number of items.
+
+    Attributes:
+        env_name (str): the name of environment
+        frame_stack (int): number of stacked frames
+        num_steps (int): number of inserted transitions
+        chunk_length (dict): the configured number of steps per chunk of the replay columns
+        chunk_lengths (list): numbers of steps per chunk compared on all columns
+        schema (dict): storage dtypes of the experiences (`ReplaySchema`)
+        pixels (bool): the observations are the rendered `uint8` frames
+        action_repeat (int): number of environment steps per action
+        env_kwargs (dict): keyword arguments of the environment (e.g. `dtype` of the dm_control observations)
+    """
+
+    def __init__(
+        self,
+        # ---
+        env_name: str,
+        frame_stack: int,
+        num_steps: int,
+        # ---
+        chunk_length: dict = None,
+        chunk_lengths: list = (1, 4, 16, 64),
+        schema: dict = None,
+        pixels: bool = False,
+        action_repeat: int = 1,
+        env_kwargs: dict = None,
+    ):
+        super(ReplayBenchmark, self).__init__(
+            env_name, False, frame_stack, pixels, action_repeat, env_kwargs
+        )
+
+        # dm_control tasks are not stacked
+        self._frame_stack = frame_stack if isinstance(self._env, FrameStack) else 1
+        self._num_steps = num_steps
+        self._schema = ReplaySchema(**(schema or {}))
+        if self._schema.sequence_length:
+            raise ValueError("The benchmark does not support the sequence layout")
+
+        # The auto-tuned chunks are the baseline
+        self._settings = {"auto": None}
+        if chunk_length:
+            self._settings["config"] = chunk_length
+        for length in chunk_lengths:
+            self._settings[f"all={length}"] = {column: length for column in COLUMNS}
+
+        self.results = {}
+
+    def _collect(self):
+        """Episodes of the random policy as the frames, actions, rewards and terminal flags"""
+        episodes = []
+        steps = 0
+        while steps < self._num_steps:
+            obs, _ = self._env.reset()
+            frames = [self._frame(obs)] * self._frame_stack
+            actions, rewards, terminals = [], [], []
+            done = False
+            while not done and steps < self._num_steps:
+                action = self._env.action_space.sample()
+                obs, reward, terminated, truncated, _ = self._env.step(action)
+                frames.append(np.copy(self._frame(obs)))
+                actions.append(np.asarray(action))
+                rewards.append(self._schema.encode_reward([reward]))
+                terminals.append(np.array([terminated]))
+                done = terminated or truncated
+                steps += 1
+            episodes.append((frames, actions, rewards, terminals))
+        return episodes
+
+    def _frame(self, observation):
+        return self._schema.encode_observation(
+            observation[-1] if self._frame_stack > 1 else observation
+        )
+
+    def _stack(self, writer, index):
+        observation = writer.history["observation"]
+        if self._frame_stack > 1:
+            return observation[index - self._frame_stack + 1 : (index + 1) or None]
+        return observation[index]
+
+    def _insert(self, client, episodes, chunk_length):
+        num_items = 0
+        with make_trajectory_writer(
+            client, self._frame_stack + 1, chunk_length
+        ) as writer:
+            for frames, actions, rewards, terminals in episodes:
+                for j, frame in enumerate(frames):
+                    step = {"observation": frame}
+                    t = j - self._frame_stack + 1
+                    if 0 <= t < len(actions):
+                        step["action"] = actions[t]
+                        step["ext_reward"] = rewards[t]
+                        step["terminal"] = terminals[t]
+                    writer.append(step)
+
+                    if t >= 1:
+                        writer.create_item(
+                            table="experience",
+                            priority=1.0,
+                            trajectory={
+                                "observation": self._stack(writer, -2),
+                                "action": writer.history["action"][-2],
+                                "ext_reward": writer.history["ext_reward"][-2],
+                                "next_observation": self._stack(writer, -1),
+                                "terminal": writer.history["terminal"][-2],
+                            },
+                        )
+                        num_items += 1
+                writer.end_episode()
+        return num_items
+
+    def _measure(self, episodes, chunk_length):
+        import reverb
+
+        signature = self._schema.signature(
+            self._env.observation_space, self._env.action_space
+        )
+        item_bytes = ReplaySchema.bytes_per_item(signature)
+
+        path = tempfile.mkdtemp(prefix="replay_benchmark_")
+        server = reverb.Server(
+            tables=[
+                reverb.Table(
+                    name="experience",
+                    sampler=reverb.selectors.Uniform(),
+                    remover=reverb.selectors.Fifo(),
+                    rate_limiter=reverb.rate_limiters.MinSize(1),
+                    max_size=self._num_steps,
+                    max_times_sampled=0,
+                    signature=signature,
+                )
+            ],
+            checkpointer=reverb.checkpointers.DefaultCheckpointer(path=path),
+        )
+        try:
+            client = reverb.Client(f"localhost:{server.port}")
+
+            start = time.perf_counter()
+            num_items = self._insert(client, episodes, chunk_length)
+            elapsed = time.perf_counter() - start
+
+            checkpoint = client.checkpoint()
+            stored_bytes = sum(
+                os.path.getsize(os.path.join(checkpoint, name))
+                for name in os.listdir(checkpoint)
+            )
+        finally:
+            server.stop()
+            shutil.rmtree(path, ignore_errors=True)
+
+        return {
+            "bytes_per_item": stored_bytes / num_items,
+            "compression_ratio": item_bytes * num_items / stored_bytes,
+            "items_per_sec": num_items / elapsed,
+        }
+
+    def run(self):
+        episodes = self._collect()
+
+        for name, chunk_length in self._settings.items():
+            result = self._measure(episodes, chunk_length)
+            self.results[name] = result
+            print(
+                f"Chunking {name}: {result['bytes_per_item']:.0f} bytes per item "
+                f"(compression {result['compression_ratio']:.1f}x), "
+                f"{result['items_per_sec']:.0f} items per second"
+            )
@@ -0,0 +1,43 @@
+from collections import deque
+
+import numpy as np
+
+
+class NStepReturn:
+    """Discounted return of the last `n` rewards of the episode.
+
+    The agent keeps one per sub-environment, the return of the step `t` is known
+    once the reward of the step `t + n - 1` is appended.
+
+    Attributes:
+        n (int): number of the summed rewards
+        gamma (float): the discount factor
+    """
+
+    def __init__(self, n: int, gamma: float):
+        if n < 1:
+            raise ValueError("The n-step return needs at least one step")
+
+        self.n = n
+        self._discounts = gamma ** np.arange(n, dtype=np.float64)
+        self._rewards = deque(maxlen=n)
+
+    def __len__(self):
+        return len(self._rewards)
+
+    @property
+    def full(self):
+        return len(self._rewards) == self.n
+
+    def append(self, reward):
+        self._rewards.append(reward)
+
+    def value(self, start: int = 0):
+        """Return of the rewards from `start`, the shorter tails end the episode"""
+        rewards = np.fromiter(self._rewards, dtype=np.float64)[start:]
+        return np.array(
+            [np.dot(self._discounts[: len(rewards)], rewards)], dtype=np.float64
+        )
+
+    def clear(self):
+        self._rewards.clear()
@@ -0,0 +1,121 @@
+import numpy as np
+
+from .returns import NStepReturn
+
+
+class TransitionWriter:
+    """
+    Transition writer
+    =================
+
+    Writes the episode of one sub-environment as the n-step transitions, one frame per step.
+    The step holds the last frame of its stacked observation and the action, the return and terminal flag
+    of the step n steps back. The first step is preceded by the older frames of its stack.
+    The items reference the stacked observations by the slices of history, so each frame is stored once.
+    The shorter returns of the terminated episode's last steps are not bootstrapped.
+
+    Attributes:
+        writer (reverb.TrajectoryWriter): the writer keeping at least `num_keep_alive_refs` steps
+        schema (ReplaySchema): storage dtypes of the experiences
+        frame_stack (int): number of stacked frames, 1 is the observation without the stack
+        n_step (int): number of rewards summed into the return of the transition
+        gamma (float): the discount factor of the n-step return
+        tables (list): the names of tables receiving the items
+    """
+
+    def __init__(
+        self,
+        writer,
+        schema,
+        frame_stack: int,
+        n_step: int = 1,
+        gamma: float = 0.99,
+        tables: list = ("experience",),
+    ):
+        self._writer = writer
+        self._schema = schema
+        self._frame_stack = frame_stack
+        self._n_step = n_step
+        self._tables = tables
+
+        self._return = NStepReturn(n_step, gamma)
+        self._episode_steps = 0
+
+    @staticmethod
+    def num_keep_alive_refs(frame_stack: int, n_step: int = 1):
+        return frame_stack + n_step
+
+    def append(self, observation, action, ext_reward):
+        """Append the step taken from the `observation`"""
+        if self._frame_stack > 1 and self._episode_steps == 0:
+            for frame in observation[:-1]:
+                self._writer.append(
+                    {"observation": self._schema.encode_observation(frame)}
+                )
+
+        step = {"observation": self._frame(observation), "action": action}
+        if self._return.full:
+            step["ext_reward"] = self._schema.encode_reward(self._return.value())
+            step["terminal"] = np.array([False])
+        self._writer.append(step)
+        self._return.append(ext_reward)
+        self._episode_steps += 1
+
+        # The transition of the step n steps back is bootstrapped from this step
+        if self._episode_steps > self._n_step:
+            self._create_item(-(self._n_step + 1), -1)
+
+    def end_episode(self, final_observation, terminated: bool):
+        """Write the final observation and the items of the remaining transitions"""
+        step = {"observation": self._frame(final_observation)}
+        if self._return.full:
+            step["ext_reward"] = self._schema.encode_reward(self._return.value())
+            step["terminal"] = np.array([terminated])
+        self._writer.append(step)
+        if self._return.full:
+            self._create_item(-(self._n_step + 1), -1)
+
+        # The shorter returns of the last steps, without bootstrapping
+        if terminated:
+            first = 1 if self._return.full else 0
+            for e, start in enumerate(range(first, len(self._return)), 1):
+                self._writer.append(
+                    {
+                        "ext_reward": self._schema.encode_reward(
+                            self._return.value(start)
+                        ),
+                        "terminal": np.array([True]),
+                    }
+                )
+                k = len(self._return) - start
+                self._create_item(-(k + 1 + e), -(1 + e))
+
+        self._return.clear()
+        self._episode_steps = 0
+
+    def _frame(self, observation):
+        """The stored frame of the observation"""
+        return self._schema.encode_observation(
+            observation[-1] if self._frame_stack > 1 else observation
+        )
+
+    def _stack(self, index):
+        """The stacked observation is rebuilt from the frames by the slice of history"""
+        observation = self._writer.history["observation"]
+        if self._frame_stack > 1:
+            return observation[index - self._frame_stack + 1 : (index + 1) or None]
+        return observation[index]
+
+    def _create_item(self, start, end):
+        """Transition from the step `start` bootstrapped from the observation `end`"""
+        history = self._writer.history
+        trajectory = {
+            "observation": self._stack(start),
+            "action": history["action"][start],
+            "ext_reward": history["ext_reward"][-1],
+            "next_observation": self._stack(end),
+            "terminal": history["terminal"][-1],
+        }
+        # The distiller's copy of the item references the same chunks
+        for table in self._tables:
+            self._writer.create_item(table=table, priority=1.0, trajectory=trajectory)
@@ -1,7 +1,9 @@
 from gymnasium.envs.registration import register
 
+from .action_repeat import ActionRepeat  # noqa
 from .dm_control import dmControlGetTasks, dmControlGymWrapper  # noqa
-from .frame_stack import FrameStack  # noqa
+from .frame_stack import FrameRing, FrameStack, VectorFrameStack  # noqa
+from .pixels import PixelObservation  # noqa
 
 register(
     id="HumanoidRobot-v0",
@@ -0,0 +1,24 @@
+import gymnasium
+
+
+class ActionRepeat(gymnasium.Wrapper):
+    def __init__(self, env, repeat):
+        """Repeat the action `repeat` times, the rewards of the repeated steps are summed.
+
+        The repetition stops on the end of episode, so the terminal step is never skipped.
+        The policy is called once per the macro-step.
+        """
+        super().__init__(env)
+
+        if repeat < 1:
+            raise ValueError("The action repeat must be at least 1")
+        self.repeat = repeat
+
+    def step(self, action):
+        total_reward = 0.0
+        for _ in range(self.repeat):
+            obs, reward, terminated, truncated, info = self.env.step(action)
+            total_reward += reward
+            if terminated or truncated:
+                break
+        return obs, total_reward, terminated, truncated, info
@@ -11,8 +11,35 @@ def dmControlGetTasks():
 
 
 class dmControlGymWrapper(gymnasium.Env):
-    def __init__(self, domain_name, task_name):
+    def __init__(
+        self,
+        domain_name,
+        task_name,
+        dtype=None,
+        pixels=False,
+        height=84,
+        width=84,
+        camera_id=0,
+        action_repeat=1,
+    ):
+        """Gymnasium interface of the dm_control task.
+
+        The observation layout is computed once, the observations are written into
+        two alternating preallocated buffers, so the observation is valid until the second next step
+        (copy it to keep it longer). The scaled action is written into one preallocated buffer too.
+
+        Args:
+            domain_name (str): the name of domain
+            task_name (str): the name of task
+            dtype: dtype of the observations (e.g. `float32`), `None` keeps the dtype of the physics (usually float64)
+            pixels (bool): the rendered `uint8` frames of the camera are the observations
+            height (int): height of the rendered frame
+            width (int): width of the rendered frame
+            camera_id (int): the camera used for the rendering
+            action_repeat (int): number of physics steps per action, only the last one is observed (rendered)
+        """
         self.env = suite.load(domain_name=domain_name, task_name=task_name)
+        self.action_repeat = action_repeat
 
         # action info
         action_spec = self.env.action_spec()
@@ -22,47 +49,85 @@ class dmControlGymWrapper(gymnasium.Env):
             dtype=action_spec.dtype,
         )
 
+        # map from [-1, 1] to [min, max]
+        self._action_scale = 0.5 * (self.action_space.high - self.action_space.low)
+        self._action_offset = self.action_space.low + self._action_scale
+        self._action = np.empty_like(self._action_scale)
+
+        # observation layout
         observation = self.env._task.get_observation(self.env._physics)
-        observation = self.flatten_observation(observation)
-        self.observation_space = spaces.Box(
-            np.full(observation.shape, -np.inf, dtype=observation.dtype),
-            np.full(observation.shape, np.inf, dtype=observation.dtype),
-            dtype=observation.dtype,
-        )
+        if isinstance(observation, collections.OrderedDict):
+            keys = observation.keys()
+        else:
+            # Keep a consistent ordering for other mappings.
+            keys = sorted(observation.keys())
+
+        self._layout = []
+        offset = 0
+        for key in keys:
+            size = np.size(observation[key])
+            # vectors and scalars are assigned without reshaping
+            flat = np.ndim(observation[key]) <= 1
+            self._layout.append((key, slice(offset, offset + size), flat))
+            offset += size
+
+        if dtype is None:
+            dtype = np.result_type(*observation.values())
+        dtype = np.dtype(dtype)
+        self._observations = np.empty((2, offset), dtype=dtype)
+        self._index = 0
 
-    def reset(self):
+        self.pixels = pixels
+        self._render_kwargs = {"height": height, "width": width, "camera_id": camera_id}
+
+        if pixels:
+            self.observation_space = spaces.Box(
+                low=0, high=255, shape=(height, width, 3), dtype=np.uint8
+            )
+        else:
+            self.observation_space = spaces.Box(
+                np.full(offset, -np.inf, dtype=dtype),
+                np.full(offset, np.inf, dtype=dtype),
+                dtype=dtype,
+            )
+
+    def reset(self, seed=None, options=None):
         time_step = self.env.reset()
-        obs = self.flatten_observation(time_step.observation)
+        obs = self.get_observation(time_step.observation)
         return obs, {}
 
     def step(self, action):
         action = self.scale_action(action)
-        time_step = self.env.step(action)
-        obs = self.flatten_observation(time_step.observation)
+        reward = 0.0
+        for _ in range(self.action_repeat):
+            time_step = self.env.step(action)
+            reward += time_step.reward
+            if time_step.last():
+                break
+        obs = self.get_observation(time_step.observation)
         return (
             obs,
-            time_step.reward,
+            reward,
             False,
             time_step.last(),
             {},
         )
 
+    def get_observation(self, observation):
+        if self.pixels:
+            return self.env.physics.render(**self._render_kwargs)
+        return self.flatten_observation(observation)
+
     def flatten_observation(self, observation):
-        if isinstance(observation, collections.OrderedDict):
-            keys = observation.keys()
-        else:
-            # Keep a consistent ordering for other mappings.
-            keys = sorted(observation.keys())
+        out = self._observations[self._index]
+        self._index ^= 1
 
-        observation_arrays = [observation[key].ravel() for key in keys]
-        return np.concatenate(observation_arrays)
+        for key, index, flat in self._layout:
+            out[index] = observation[key] if flat else observation[key].reshape(-1)
+        return out
 
     def scale_action(self, action):
-        # map to [0, 1]
-        action = 0.5 * (action + 1.0)
-
-        # map to [min, max]
-        action *= self.action_space.high - self.action_space.low
-        action += self.action_space.low
-
-        return action
+        """Map the action from [-1, 1] to [min, max], the returned buffer is overwritten by the next call"""
+        np.multiply(action, self._action_scale, out=self._action)
+        self._action += self._action_offset
+        return self._action
@@ -1,36 +1,75 @@
-from collections import deque
-
 import gymnasium
 import numpy as np
 
 
+def _stacked_space(space, k):
+    low = np.repeat(space.low[np.newaxis, ...], k, axis=0)
+    high = np.repeat(space.high[np.newaxis, ...], k, axis=0)
+    return gymnasium.spaces.Box(low=low, high=high, dtype=space.dtype)
+
+
+class FrameRing:
+    """Preallocated buffer of the k last frames for each of `num_stacks` streams.
+
+    The stacked frames are a view into the buffer, no frames are copied on the step.
+    The buffer holds `3 * k` frames, when the end is reached (or a stream is reset)
+    the k - 1 last frames are moved to a new region, which does not overlap the current view.
+    So the returned view stays valid until the second next `push`.
+    """
+
+    def __init__(self, num_stacks: int, k: int, shape: tuple, dtype):
+        self.k = k
+        self._buffer = np.zeros((num_stacks, 3 * k) + tuple(shape), dtype=dtype)
+        self._end = k
+
+    @property
+    def frames(self):
+        return self._buffer[:, self._end - self.k : self._end]
+
+    def push(self, frames, reset=None):
+        """Append the new frame to each stream, the `reset` streams are filled by the frame"""
+        if reset is None or not np.any(reset):
+            if self._end < self._buffer.shape[1]:
+                self._buffer[:, self._end] = frames
+                self._end += 1
+                return
+            start = 0
+        elif self._end + self.k <= self._buffer.shape[1]:
+            start = self._end
+        else:
+            start = 0
+
+        # Move the frames to the region, which does not overlap the current view
+        self._buffer[:, start : start + self.k - 1] = self._buffer[
+            :, self._end - self.k + 1 : self._end
+        ]
+        self._buffer[:, start + self.k - 1] = frames
+        if reset is not None:
+            self._buffer[reset, start : start + self.k] = frames[reset, np.newaxis]
+        self._end = start + self.k
+
+
 class FrameStack(gymnasium.Wrapper):
     def __init__(self, env, k):
         """Stack k last frames.
 
-        Returns lazy array, which is much more memory efficient.
+        Returns the view into the ring buffer, it is valid until the second next step.
 
         See Also
         --------
-        baselines.common.atari_wrappers.LazyFrames
+        FrameRing
         """
         super().__init__(env)
 
         self.k = k
-        self.frames = deque([], maxlen=k)
-
-        low = np.repeat(self.observation_space.low[np.newaxis, ...], k, axis=0)
-        high = np.repeat(self.observation_space.high[np.newaxis, ...], k, axis=0)
-        self.observation_space = gymnasium.spaces.Box(
-            low=low,
-            high=high,
-            dtype=self.observation_space.dtype,
+        self.frames = FrameRing(
+            1, k, self.observation_space.shape, self.observation_space.dtype
         )
+        self.observation_space = _stacked_space(self.observation_space, k)
 
     def reset(self, **kwargs):
         ob, info = self.env.reset(**kwargs)
-        for _ in range(self.k):
-            self._set_ob(ob)
+        self.frames.push(ob[np.newaxis], reset=np.ones(1, dtype=bool))
         return self._get_ob(), info
 
     def step(self, action):
@@ -39,8 +78,60 @@ class FrameStack(gymnasium.Wrapper):
         return self._get_ob(), reward, terminated, truncated, info
 
     def _set_ob(self, ob):
-        self.frames.append(ob)
+        self.frames.push(ob[np.newaxis])
 
     def _get_ob(self):
-        assert len(self.frames) == self.k
-        return np.stack(list(self.frames), axis=0)  # stack along time axis
+        return self.frames.frames[0]  # stack along time axis
+
+
+class VectorFrameStack(gymnasium.vector.VectorWrapper):
+    def __init__(self, env, k):
+        """Stack k last frames of each sub-environment.
+
+        The sub-environments are not stacked, so only the single frames are sent
+        from the asynchronous workers. Requires the `SAME_STEP` autoreset mode,
+        the stacked final observation replaces `info["final_obs"]`.
+
+        Returns the view into the ring buffer, it is valid until the second next step.
+        """
+        super().__init__(env)
+
+        self.k = k
+        self.frames = FrameRing(
+            self.num_envs,
+            k,
+            env.single_observation_space.shape,
+            env.single_observation_space.dtype,
+        )
+        self.single_observation_space = _stacked_space(env.single_observation_space, k)
+        self.observation_space = gymnasium.vector.utils.batch_space(
+            self.single_observation_space, self.num_envs
+        )
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self.frames.push(obs, reset=np.ones(self.num_envs, dtype=bool))
+        return self.frames.frames, info
+
+    def step(self, actions):
+        return self._stack(*self.env.step(actions))
+
+    def step_async(self, actions):
+        self.env.step_async(actions)
+
+    def step_wait(self, **kwargs):
+        return self._stack(*self.env.step_wait(**kwargs))
+
+    def _stack(self, obs, reward, terminated, truncated, info):
+        done = terminated | truncated
+
+        # The finished sub-environments are already reset
+        if np.any(done):
+            last_frames = self.frames.frames[:, 1:]
+            for i in np.flatnonzero(done):
+                info["final_obs"][i] = np.concatenate(
+                    [last_frames[i], info["final_obs"][i][np.newaxis]]
+                )
+
+        self.frames.push(obs, reset=done)
+        return self.frames.frames, reward, terminated, truncated, info
@@ -5,14 +5,41 @@ import numpy as np
 from dm_control.utils import rewards
 from gymnasium import spaces
 
+from .humanoid_protocol import SerialLink
+from .scheduler import ControlScheduler
+
 
 class HumanoidRobot(gymnasium.Env):
     metadata = {"tasks": ["stand", "walk"], "render_modes": ["human", "rgb_array"]}
 
-    def __init__(self, render_mode=None, port="/dev/ttyACM0"):
+    def __init__(
+        self,
+        render_mode=None,
+        port="/dev/ttyACM0",
+        baudrate=115200,
+        boot_time=3.0,
+        control_rate=10.0,
+        spin_time=0.0005,
+    ):
+        """Gymnasium interface of the humanoid robot connected by the serial port.
+
+        The keyword arguments are set by `gymnasium.make` (the `Environment` section of config).
+
+        Args:
+            render_mode (str): the rendering mode
+            port (str): the serial port of the robot
+            baudrate (int): the baud rate of the serial port
+            boot_time (float): seconds waited for the boot of the robot after connecting
+            control_rate (float): frequency of the control loop in Hz
+            spin_time (float): the last part of the control period is busy-waited for the lower jitter (in seconds)
+        """
         self.render_mode = render_mode
         self.task = "stand"
         self.port = port
+        self.baudrate = baudrate
+        self.boot_time = boot_time
+        self.link = None
+        self.scheduler = ControlScheduler(control_rate, spin_time)
 
         # action info
         action_shape = (6,)
@@ -34,26 +61,26 @@ class HumanoidRobot(gymnasium.Env):
         import serial
 
         # init serial port
-        self.comm = serial.Serial(self.port, baudrate=115200)
-        time.sleep(3)
+        comm = serial.Serial(self.port, baudrate=self.baudrate, timeout=0.1)
+        time.sleep(self.boot_time)
+
+        # skip booting stage
+        comm.reset_input_buffer()
 
-        # read booting stage
-        while self.comm.in_waiting:
-            print(self.comm.readline())
+        # the observations are streamed by arduino
+        self.link = SerialLink(
+            comm, self.action_space.shape[0], self.observation_space.shape[0]
+        )
 
-    def _get_obs(self):
-        # read observation from arduino
-        self.comm.write(b"S")
-        data = self.comm.readline()
-        obs = np.fromstring(data, dtype=np.float32, sep=";")
-        return obs
+    def _get_obs(self, ack=None):
+        # the latest observation from arduino
+        return self.link.observation(ack=ack)
 
     def _get_reward(self, obs):
         if self.task == "stand":
             roll, pitch = obs[12], obs[13]
             # Euclidean distance
             mag = np.sqrt(np.square(roll) + np.square(pitch))
-            print(mag)
 
             return rewards.tolerance(
                 mag,
@@ -65,35 +92,34 @@ class HumanoidRobot(gymnasium.Env):
 
     def _set_action(self, action):
         # send action to arduino
-        m_bytes = "M"
-        for i in range(action.shape[0]):
-            m_bytes += np.format_float_positional(action[i]) + ";"
-        self.comm.write(m_bytes.encode("ascii"))
+        return self.link.send_action(action)
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         obs = self._get_obs()
+
+        # start the control loop
+        self.scheduler.reset()
         return obs, {}
 
     def step(self, action):
         # send action to arduino
-        self._set_action(action)
-
-        # delay for servo stabilization
-        time.sleep(0.1)
+        seq = self._set_action(action)
 
-        # read observation from arduino
-        obs = self._get_obs()
+        # wait for the next control period (servo stabilization)
+        self.scheduler.wait()
 
-        print(obs)
+        # read observation from arduino after the action is applied
+        obs = self._get_obs(ack=seq)
 
         return (
             obs,
             self._get_reward(obs),
             False,
             False,
-            {},
+            {"real_time": {**self.link.metrics(), **self.scheduler.metrics()}},
         )
 
     def close(self):
-        self.comm.close()
+        if self.link is not None:
+            self.link.close()
@@ -0,0 +1,94 @@
+import os
+import select
+import threading
+import time
+import tty
+
+import numpy as np
+
+from .humanoid_protocol import ACTION, OBSERVATION, FrameParser, pack_frame
+
+
+class HumanoidEmulator:
+    """
+    Humanoid emulator
+    =================
+
+    Loopback emulator of the robot's controller on the pseudo-terminal, speaks the binary
+    protocol of `SerialLink`. The observation frames are streamed at the fixed rate and
+    right after each received action, the joints of the observation follow the last action.
+
+    Attributes:
+        action_size (int): number of values in the action frame
+        observation_size (int): number of values in the observation frame
+        rate (float): frequency of the observation frames in Hz
+        boot_message (bytes): text written before the first frame, like the Arduino's boot log
+    """
+
+    def __init__(
+        self,
+        action_size: int = 6,
+        observation_size: int = 16,
+        rate: float = 100.0,
+        boot_message: bytes = b"Booting...\r\n",
+    ):
+        self._action_size = action_size
+        self._parser = FrameParser(ACTION, action_size)
+        self._period = 1.0 / rate
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+
+        self.observation = np.zeros(observation_size, dtype=np.float32)
+        self.num_actions = 0
+        self._seq = 0
+        self._ack = 0
+        self._pending = bytearray(boot_message)
+        self._running = True
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _send_observation(self):
+        self._seq = (self._seq + 1) & 0xFFFF
+        self._pending += pack_frame(OBSERVATION, self._seq, self._ack, self.observation)
+
+        # The frames are dropped if nobody reads the port, like on the UART
+        try:
+            written = os.write(self._master, self._pending)
+        except BlockingIOError:
+            written = 0
+        if written:
+            del self._pending[:written]
+        else:
+            self._pending.clear()
+
+    def _run(self):
+        deadline = time.perf_counter()
+        while self._running:
+            timeout = max(deadline - time.perf_counter(), 0.0)
+            readable, _, _ = select.select([self._master], [], [], timeout)
+
+            if readable:
+                try:
+                    data = os.read(self._master, 4096)
+                except OSError:
+                    break
+                frames = self._parser.feed(data)
+                if frames:
+                    self._ack, _, action = frames[-1]
+                    self.observation[: self._action_size] = action
+                    self.num_actions += len(frames)
+                    self._send_observation()
+
+            if time.perf_counter() >= deadline:
+                self._send_observation()
+                deadline += self._period
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+        os.close(self._master)
+        os.close(self._slave)
@@ -0,0 +1,189 @@
+import binascii
+import struct
+import threading
+import time
+
+import numpy as np
+
+# Frame: sync | kind | seq | ack | float32 payload | CRC-16 (XMODEM) of kind..payload
+SYNC = b"\xaa\x55"
+ACTION = ord("M")
+OBSERVATION = ord("O")
+HEADER = struct.Struct("<BHH")
+CRC = struct.Struct("<H")
+
+
+def frame_size(num_values: int):
+    return len(SYNC) + HEADER.size + 4 * num_values + CRC.size
+
+
+def pack_frame(kind: int, seq: int, ack: int, values):
+    """Encode the frame, `seq` counts the frames of the sender and `ack` is the last received seq"""
+    body = HEADER.pack(kind, seq & 0xFFFF, ack & 0xFFFF)
+    body += np.asarray(values, dtype="<f4").tobytes()
+    return SYNC + body + CRC.pack(binascii.crc_hqx(body, 0))
+
+
+class FrameParser:
+    """Splits the byte stream into the frames of the given kind.
+
+    The bytes before the sync word (e.g. boot messages of the Arduino) and the frames
+    with the invalid checksum are skipped.
+    """
+
+    def __init__(self, kind: int, num_values: int):
+        self.kind = kind
+        self.num_values = num_values
+        self.size = frame_size(num_values)
+        self.crc_errors = 0
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes):
+        """Returns the list of decoded frames `(seq, ack, values)`"""
+        self._buffer += data
+        frames = []
+
+        while True:
+            start = self._buffer.find(SYNC)
+            if start < 0:
+                # Keep the last byte, it can be the first byte of the sync word
+                del self._buffer[: max(len(self._buffer) - 1, 0)]
+                return frames
+            if len(self._buffer) - start < self.size:
+                del self._buffer[:start]
+                return frames
+
+            frame = bytes(self._buffer[start : start + self.size])
+            body = frame[len(SYNC) : -CRC.size]
+            (crc,) = CRC.unpack(frame[-CRC.size :])
+            kind, seq, ack = HEADER.unpack_from(body)
+
+            if kind != self.kind or crc != binascii.crc_hqx(body, 0):
+                # Resynchronize on the next sync word
+                self.crc_errors += kind == self.kind
+                del self._buffer[: start + 1]
+                continue
+
+            values = np.frombuffer(body, dtype="<f4", offset=HEADER.size)
+            frames.append((seq, ack, values.astype(np.float32)))
+            del self._buffer[: start + self.size]
+
+
+class SerialLink:
+    """
+    Serial link
+    =================
+
+    Binary protocol of the robot's controller, the actions are sent without waiting
+    and the background thread keeps the latest observation streamed by the controller.
+
+    Attributes:
+        comm (serial.Serial): the opened serial port
+        action_size (int): number of values in the action frame
+        observation_size (int): number of values in the observation frame
+    """
+
+    def __init__(self, comm, action_size: int, observation_size: int):
+        self.comm = comm
+        self._action_size = action_size
+        self._parser = FrameParser(OBSERVATION, observation_size)
+
+        self._condition = threading.Condition()
+        self._observation = None
+        self._observation_seq = None
+        self._observation_ack = 0
+        self._observation_time = None
+        self._action_seq = 0
+        self._sent_time = {}
+        self._round_trip_time = float("nan")
+        self._lost_frames = 0
+        self._num_frames = 0
+        self._running = True
+
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while self._running:
+            try:
+                data = self.comm.read(max(1, self.comm.in_waiting))
+            except Exception:
+                # The port is closed
+                break
+            if not data:
+                continue
+
+            now = time.perf_counter()
+            frames = self._parser.feed(data)
+            if not frames:
+                continue
+
+            with self._condition:
+                for seq, ack, values in frames:
+                    if self._observation_seq is not None:
+                        self._lost_frames += (seq - self._observation_seq - 1) & 0xFFFF
+                    self._num_frames += 1
+                    self._observation_seq = seq
+                    if ack != self._observation_ack and ack in self._sent_time:
+                        self._round_trip_time = now - self._sent_time.pop(ack)
+                    self._observation_ack = ack
+
+                self._observation = values
+                self._observation_time = now
+                self._condition.notify_all()
+
+    def send_action(self, action):
+        """Returns the sequence number of the action"""
+        if np.size(action) != self._action_size:
+            raise ValueError(f"Expected {self._action_size} action values")
+
+        with self._condition:
+            self._action_seq = (self._action_seq + 1) & 0xFFFF
+            seq = self._action_seq
+            ack = 0 if self._observation_seq is None else self._observation_seq
+
+            # Keep only the recent actions for the round-trip time
+            if len(self._sent_time) > 64:
+                self._sent_time.clear()
+            self._sent_time[seq] = time.perf_counter()
+
+        self.comm.write(pack_frame(ACTION, seq, ack, action))
+        return seq
+
+    def observation(self, after: float = None, ack: int = None, timeout: float = 1.0):
+        """Latest observation
+
+        Args:
+            after (float): wait for the observation received after this `time.perf_counter()` time
+            ack (int): wait for the observation acknowledging this action's sequence number
+            timeout (float): maximum waiting time in seconds
+        """
+
+        def ready():
+            if self._observation is None:
+                return False
+            if after is not None and self._observation_time <= after:
+                return False
+            # The sequence numbers wrap around
+            if ack is not None and (self._observation_ack - ack) & 0xFFFF >= 0x8000:
+                return False
+            return True
+
+        with self._condition:
+            if not self._condition.wait_for(ready, timeout=timeout):
+                raise TimeoutError("No observation from the robot")
+            return self._observation
+
+    def metrics(self):
+        with self._condition:
+            return {
+                "round_trip_time_ms": 1000.0 * self._round_trip_time,
+                "observation_frames": self._num_frames,
+                "lost_frames": self._lost_frames,
+                "crc_errors": self._parser.crc_errors,
+            }
+
+    def close(self):
+        self._running = False
+        self.comm.close()
+        self._reader.join(timeout=1.0)
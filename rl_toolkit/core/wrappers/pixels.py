@@ -0,0 +1,28 @@
+import gymnasium
+import numpy as np
+
+
+class PixelObservation(gymnasium.ObservationWrapper):
+    def __init__(self, env, height=84, width=84):
+        """Rendered `uint8` frames as observations.
+
+        The frame is resized to `height` x `width` by the nearest neighbour with the precomputed indices.
+        The environment must be created with `render_mode="rgb_array"`.
+        """
+        super().__init__(env)
+
+        if env.render_mode != "rgb_array":
+            raise ValueError("The pixel observations require render_mode='rgb_array'")
+
+        env.reset()
+        frame = env.render()
+        self._rows = np.linspace(0, frame.shape[0] - 1, height).round().astype(np.intp)
+        self._cols = np.linspace(0, frame.shape[1] - 1, width).round().astype(np.intp)
+
+        self.observation_space = gymnasium.spaces.Box(
+            low=0, high=255, shape=(height, width, frame.shape[2]), dtype=np.uint8
+        )
+
+    def observation(self, observation):
+        frame = self.env.render()
+        return frame[self._rows[:, np.newaxis], self._cols]
@@ -0,0 +1,78 @@
+import time
+
+
+class ControlScheduler:
+    """
+    Control scheduler
+    =================
+
+    Deadline-driven scheduler of the real-time control loop. `wait` sleeps until the next
+    period's deadline, so the time spent by the policy inference and I/O since the last tick
+    is subtracted from the period. When the deadline is already missed the overrun is counted
+    and the schedule starts again from now, the missed periods are not caught up.
+
+    Attributes:
+        rate (float): control frequency in Hz
+        spin_time (float): the last part of the period is busy-waited for the lower jitter (in seconds)
+    """
+
+    def __init__(self, rate: float, spin_time: float = 0.0005):
+        self.period = 1.0 / rate
+        self.spin_time = spin_time
+        self.reset()
+
+    def reset(self):
+        self._tick = time.perf_counter()
+        self._deadline = self._tick + self.period
+        self._steps = 0
+        self._overruns = 0
+        self._compute_time = 0.0
+        self._compute_time_sum = 0.0
+        self._compute_time_max = 0.0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+        self._period_sum = 0.0
+
+    def wait(self):
+        now = time.perf_counter()
+        self._compute_time = now - self._tick
+
+        if now > self._deadline:
+            # Overrun, the policy inference and I/O blew the budget
+            self._overruns += 1
+            self._deadline = now
+            wake = now
+        else:
+            remaining = self._deadline - now - self.spin_time
+            if remaining > 0.0:
+                time.sleep(remaining)
+            while True:
+                wake = time.perf_counter()
+                if wake >= self._deadline:
+                    break
+
+        # Statistics
+        jitter = wake - self._deadline
+        self._steps += 1
+        self._compute_time_sum += self._compute_time
+        self._compute_time_max = max(self._compute_time_max, self._compute_time)
+        self._jitter_sum += jitter
+        self._jitter_max = max(self._jitter_max, jitter)
+        self._period_sum += wake - self._tick
+
+        self._tick = wake
+        self._deadline += self.period
+
+    def metrics(self):
+        steps = max(self._steps, 1)
+        return {
+            "compute_time_ms": 1000.0 * self._compute_time,
+            "compute_time_mean_ms": 1000.0 * self._compute_time_sum / steps,
+            "compute_time_max_ms": 1000.0 * self._compute_time_max,
+            "budget_ms": 1000.0 * self.period,
+            "jitter_mean_ms": 1000.0 * self._jitter_sum / steps,
+            "jitter_max_ms": 1000.0 * self._jitter_max,
+            "period_mean_ms": 1000.0 * self._period_sum / steps,
+            "overruns": self._overruns,
+            "overrun_rate": self._overruns / steps,
+        }
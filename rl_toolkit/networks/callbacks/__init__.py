@@ -1,3 +1,5 @@
 from .dqn_agent import DQNAgentCallback  # noqa
+from .evaluation import EvaluationCallback  # noqa
 from .lr import PrintLR, cosine_schedule  # noqa
+from .priority import PriorityCallback  # noqa
 from .sac_agent import SACAgentCallback  # noqa
@@ -0,0 +1,56 @@
+import numpy as np
+from tensorflow.keras.callbacks import Callback
+
+import wandb
+
+
+class EvaluationCallback(Callback):
+    """
+    Evaluation
+    =================
+
+    Plays episodes with the deterministic policies and logs their mean scores.
+
+    Attributes:
+        env: the environment
+        policies (dict): policies to evaluate by their names
+        eval_interval (int): number of training steps between evaluations
+        num_episodes (int): number of episodes per evaluation
+    """
+
+    def __init__(self, env, policies: dict, eval_interval: int, num_episodes: int = 1):
+        super(EvaluationCallback, self).__init__()
+        self._env = env
+        self._policies = policies
+        self._eval_interval = eval_interval
+        self._num_episodes = num_episodes
+
+    def _play(self, policy):
+        score = 0.0
+        for _ in range(self._num_episodes):
+            obs, _ = self._env.reset()
+            terminated, truncated = False, False
+            while not (terminated or truncated):
+                action = np.array(
+                    policy(obs, deterministic=True),
+                    copy=False,
+                    dtype=self._env.action_space.dtype,
+                )
+                obs, reward, terminated, truncated, _ = self._env.step(action)
+                score += reward
+        return score / self._num_episodes
+
+    def _evaluate(self):
+        scores = {
+            f"{name} score": self._play(policy)
+            for name, policy in self._policies.items()
+        }
+        print(" | ".join(f"{name}: {score}" for name, score in scores.items()))
+        wandb.log(scores, commit=False)
+
+    def on_train_begin(self, logs=None):
+        self._evaluate()
+
+    def on_epoch_end(self, epoch, logs=None):
+        if (epoch + 1) % self._eval_interval == 0:
+            self._evaluate()
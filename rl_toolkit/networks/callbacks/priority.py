@@ -0,0 +1,28 @@
+from tensorflow.keras.callbacks import Callback
+
+from rl_toolkit.networks.models.priority import SampledPriorities
+from rl_toolkit.utils import PriorityUpdater
+
+
+class PriorityCallback(Callback):
+    """Sends the priorities of the train step by the `PriorityUpdater`, its telemetry is added to the batch logs"""
+
+    def __init__(self, db_server: str, batch_size: int):
+        super(PriorityCallback, self).__init__()
+        self._db_server = db_server
+        self._batch_size = batch_size
+
+    def on_train_begin(self, logs=None):
+        self._updater = PriorityUpdater(self._db_server, batch_size=self._batch_size)
+        self._sampled = SampledPriorities()
+        self.model.sampled_priorities = self._sampled
+
+    def on_train_batch_end(self, batch, logs=None):
+        # The push is outside the compiled train step
+        self._updater.push(self._sampled.key.numpy(), self._sampled.priority.numpy())
+        if logs is not None:
+            logs.update(self._updater.metrics())
+
+    def on_train_end(self, logs=None):
+        self.model.sampled_priorities = None
+        self._updater.close()
@@ -1 +1,2 @@
+from .encoder import ConvEncoder  # noqa
 from .noise import MultivariateGaussianNoise  # noqa
@@ -0,0 +1,88 @@
+import tensorflow as tf
+from tensorflow.keras.layers import Conv2D, Dense, Flatten, Layer, LayerNormalization
+
+
+class ConvEncoder(Layer):
+    """
+    Convolutional encoder
+    ===============
+
+    Encodes `uint8` pixel observations `(..., height, width, channels)`, the frames are
+    converted to float inside the model, so they stay `uint8` in the replay buffer.
+
+    Attributes:
+        filters (list): list of the numbers of filters in each convolutional layer
+        kernel_sizes (list): list of the kernel sizes
+        strides (list): list of the strides
+        units (int): number of output features
+        merge_frames (bool): the stacked frames `(batch, frames, height, width, channels)` are merged
+            into channels, otherwise each frame is encoded separately `(batch, frames, units)`
+
+    References:
+        - [Human-level control through deep reinforcement learning](https://www.nature.com/articles/nature14236)
+        - [Improving Sample Efficiency in Model-Free Reinforcement Learning from Images](https://arxiv.org/abs/1910.01741)
+    """
+
+    def __init__(
+        self,
+        filters: list,
+        kernel_sizes: list,
+        strides: list,
+        units: int,
+        merge_frames: bool = True,
+        **kwargs
+    ):
+        super(ConvEncoder, self).__init__(**kwargs)
+
+        self.filters = filters
+        self.kernel_sizes = kernel_sizes
+        self.strides = strides
+        self.units = units
+        self.merge_frames = merge_frames
+
+        self.conv_layers = [
+            Conv2D(f, k, strides=s, activation="elu")
+            for f, k, s in zip(filters, kernel_sizes, strides)
+        ]
+        self.flatten = Flatten()
+        self.projection = Dense(units)
+        self.norm = LayerNormalization(epsilon=1e-6)
+
+    def call(self, inputs, training=None):
+        x = tf.cast(inputs, self.compute_dtype) / 255.0
+
+        if x.shape.rank == 5:
+            if self.merge_frames:
+                # (batch, height, width, frames * channels)
+                x = tf.transpose(x, [0, 2, 3, 1, 4])
+                x = tf.reshape(x, tf.concat([tf.shape(x)[:3], [-1]], axis=0))
+                x.set_shape([None, None, None, inputs.shape[1] * inputs.shape[4]])
+            else:
+                frames = inputs.shape[1]
+                x = tf.reshape(x, tf.concat([[-1], tf.shape(x)[2:]], axis=0))
+                x.set_shape([None, *inputs.shape[2:]])
+
+        for layer in self.conv_layers:
+            x = layer(x, training=training)
+
+        x = self.flatten(x)
+        x = self.projection(x, training=training)
+        x = tf.tanh(self.norm(x, training=training))
+
+        if inputs.shape.rank == 5 and not self.merge_frames:
+            x = tf.reshape(x, [-1, frames, self.units])
+
+        return x
+
+    def get_config(self):
+        config = super(ConvEncoder, self).get_config()
+        config.update(
+            {
+                "filters": self.filters,
+                "kernel_sizes": self.kernel_sizes,
+                "strides": self.strides,
+                "units": self.units,
+                "merge_frames": self.merge_frames,
+            }
+        )
+        return config
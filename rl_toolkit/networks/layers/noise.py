@@ -54,8 +54,12 @@ class MultivariateGaussianNoise(Layer):
         # Re-new noise matrix
         self.sample_weights()
 
-    def call(self, inputs):
-        return tf.matmul(inputs, self.epsilon)
+    def call(self, inputs, epsilon=None):
+        if epsilon is None:
+            return tf.matmul(inputs, self.epsilon)
+
+        # separate noise matrix for each sample, e.g. one per sub-environment
+        return tf.linalg.matvec(epsilon, inputs, transpose_a=True)
 
     def get_config(self):
         config = super(MultivariateGaussianNoise, self).get_config()
@@ -74,8 +78,11 @@ class MultivariateGaussianNoise(Layer):
     def scale(self):
         return tf.math.softplus(self.kernel)
 
-    def sample_weights(self):
+    def sample_epsilon(self, sample_shape=()):
         w_dist = tfp.distributions.MultivariateNormalDiag(
             loc=tf.zeros_like(self.kernel), scale_diag=(self.scale + backend.epsilon())
         )
-        self.epsilon.assign(w_dist.sample())
+        return w_dist.sample(sample_shape)
+
+    def sample_weights(self):
+        self.epsilon.assign(self.sample_epsilon())
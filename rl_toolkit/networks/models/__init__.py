@@ -1,4 +1,6 @@
 from .actor import Actor  # noqa
 from .actor_critic import ActorCritic  # noqa
 from .critic import MultiCritic  # noqa
+from .distillation import ActorDistillation, DuelingDQNDistillation  # noqa
 from .dueling import DuelingDQN  # noqa
+from .policy import ActorPolicy, DuelingDQNPolicy, Policy  # noqa
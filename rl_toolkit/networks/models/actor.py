@@ -4,7 +4,7 @@ from tensorflow.keras import Model, backend
 from tensorflow.keras.initializers import Constant
 from tensorflow.keras.layers import Dense, Lambda
 
-from rl_toolkit.networks.layers import MultivariateGaussianNoise
+from rl_toolkit.networks.layers import ConvEncoder, MultivariateGaussianNoise
 
 
 class Actor(Model):
@@ -18,6 +18,7 @@ class Actor(Model):
         clip_mean_min (float): the minimum value of mean
         clip_mean_max (float): the maximum value of mean
         init_noise (float): initialization of the Actor's noise
+        encoder (dict): arguments of the convolutional encoder of pixel observations (`ConvEncoder`)
 
     References:
         - [Soft Actor-Critic Algorithms and Applications](https://arxiv.org/abs/1812.05905)
@@ -30,6 +31,7 @@ class Actor(Model):
         clip_mean_min: float,
         clip_mean_max: float,
         init_noise: float,
+        encoder: dict = None,
         **kwargs
     ):
         super(Actor, self).__init__(**kwargs)
@@ -39,6 +41,13 @@ class Actor(Model):
         self.clip_mean_min = clip_mean_min
         self.clip_mean_max = clip_mean_max
         self.init_noise = init_noise
+        self.encoder_config = encoder
+
+        # pixel observations
+        if encoder is not None:
+            self.encoder = ConvEncoder(**encoder, merge_frames=True)
+        else:
+            self.encoder = None
 
         # list of hidden layers
         self.fc_layers = []
@@ -70,8 +79,38 @@ class Actor(Model):
     def reset_noise(self):
         self.noise.sample_weights()
 
-    def call(self, inputs, training=None, with_log_prob=True, deterministic=None):
-        x = inputs
+    def sample_noise(self, batch_size):
+        return self.noise.sample_epsilon((batch_size,))
+
+    def _encode(self, inputs, training):
+        if self.encoder is None:
+            return inputs
+        return self.encoder(inputs, training=training)
+
+    def distribution(self, inputs, training=None):
+        """Mean and standard deviation of the Gaussian before the `tanh`"""
+        x = self._encode(inputs, training)
+
+        # hidden layers
+        for layer in self.fc_layers:
+            x = layer(x, training=training)
+
+        # output layer
+        mean = self.mean(x, training=training)
+        mean = self.clip_mean(mean, training=training)
+
+        variance = tf.matmul(tf.square(x), tf.square(self.noise.scale))
+        return mean, tf.sqrt(variance + backend.epsilon())
+
+    def call(
+        self,
+        inputs,
+        training=None,
+        with_log_prob=True,
+        deterministic=None,
+        epsilon=None,
+    ):
+        x = self._encode(inputs, training)
 
         # hidden layers
         for layer in self.fc_layers:
@@ -84,7 +123,7 @@ class Actor(Model):
         if deterministic:
             action = self.bijector.forward(mean)
         else:
-            noise = self.noise(x, training=training)
+            noise = self.noise(x, epsilon=epsilon, training=training)
             action = self.bijector.forward(mean + noise)
 
             if with_log_prob:
@@ -110,6 +149,7 @@ class Actor(Model):
                 "clip_mean_min": self.clip_mean_min,
                 "clip_mean_max": self.clip_mean_max,
                 "init_noise": self.init_noise,
+                "encoder": self.encoder_config,
             }
         )
 
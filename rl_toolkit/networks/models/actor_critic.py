@@ -5,6 +5,7 @@ from tensorflow.keras import Model
 
 from .actor import Actor
 from .critic import MultiCritic
+from .priority import importance_weights
 
 
 class ActorCritic(Model):
@@ -25,10 +26,14 @@ class ActorCritic(Model):
         tau (float): the soft update coefficient for target networks
         init_alpha (float): initialization of log_alpha param
         init_noise (float): initialization of Actor's noise
+        encoder (dict): arguments of the convolutional encoders of pixel observations (`ConvEncoder`)
+        n_step (int): number of rewards summed into the return, the bootstrap is discounted by `gamma**n_step`
+        importance_exponent (float): exponent of the importance-sampling weights of the prioritized replay (`0.0` for uniform sampling)
 
     References:
         - [Soft Actor-Critic Algorithms and Applications](https://arxiv.org/abs/1812.05905)
         - [Controlling Overestimation Bias with Truncated Mixture of Continuous Distributional Quantile Critics](https://arxiv.org/abs/2005.04269)
+        - [Prioritized Experience Replay](https://arxiv.org/abs/1511.05952)
     """
 
     def __init__(
@@ -46,12 +51,19 @@ class ActorCritic(Model):
         init_alpha: float,
         init_noise: float,
         merge_index: int,
+        encoder: dict = None,
+        n_step: int = 1,
+        importance_exponent: float = 0.0,
         **kwargs,
     ):
         super(ActorCritic, self).__init__(**kwargs)
 
-        self.gamma = tf.constant(gamma)
+        self.gamma = tf.constant(gamma**n_step)
         self.tau = tf.constant(tau)
+        self.importance_exponent = importance_exponent
+
+        # Keeps the priorities of the sampled items (set by `PriorityCallback`)
+        self.sampled_priorities = None
         self.cum_prob = ((tf.range(n_quantiles, dtype=self.dtype) + 0.5) / n_quantiles)[
             tf.newaxis, tf.newaxis, :, tf.newaxis
         ]
@@ -67,6 +79,7 @@ class ActorCritic(Model):
             clip_mean_min=clip_mean_min,
             clip_mean_max=clip_mean_max,
             init_noise=init_noise,
+            encoder=encoder,
         )
 
         # Critic
@@ -76,6 +89,7 @@ class ActorCritic(Model):
             top_quantiles_to_drop=top_quantiles_to_drop,
             n_critics=n_critics,
             merge_index=merge_index,
+            encoder=encoder,
         )
 
     def _update_target(self, net, net_targ, tau):
@@ -100,21 +114,23 @@ class ActorCritic(Model):
             target_quantiles[:, tf.newaxis, tf.newaxis, :]
             - quantiles[:, :, :, tf.newaxis]
         )  # batch_size, n_critics, n_quantiles, n_target_quantiles
-        loss = tf.nn.compute_average_loss(
-            tf.reduce_mean(
-                tf.math.abs(
-                    self.cum_prob - tf.cast(pairwise_delta < 0.0, dtype=self.dtype)
-                )
-                * (
-                    pairwise_delta
-                    + tf.math.softplus(-2.0 * pairwise_delta)
-                    - tf.cast(tf.math.log(2.0), pairwise_delta.dtype)
-                ),
-                axis=[1, 2, 3],
-            )
+        loss = tf.reduce_mean(
+            tf.math.abs(self.cum_prob - tf.cast(pairwise_delta < 0.0, dtype=self.dtype))
+            * (
+                pairwise_delta
+                + tf.math.softplus(-2.0 * pairwise_delta)
+                - tf.cast(tf.math.log(2.0), pairwise_delta.dtype)
+            ),
+            axis=[1, 2, 3],
         )
 
-        return loss
+        # The absolute TD error of the mean values
+        priority = tf.math.abs(
+            tf.reduce_mean(target_quantiles, axis=-1)
+            - tf.reduce_mean(quantiles, axis=[1, 2])
+        )
+
+        return loss, priority
 
     def train_step(self, sample):
         # Re-new noise matrix
@@ -152,7 +168,7 @@ class ActorCritic(Model):
                 ],
                 training=True,
             )
-            critic_loss = self._td_error(
+            critic_loss, priority = self._td_error(
                 next_quantiles,
                 next_log_pi,
                 quantiles,
@@ -161,6 +177,9 @@ class ActorCritic(Model):
                 self.gamma,
                 alpha,
             )
+            critic_loss = tf.nn.compute_average_loss(
+                critic_loss * importance_weights(sample.info, self.importance_exponent)
+            )
 
         # Compute gradients
         critic_gradients = tape.gradient(critic_loss, critic_variables)
@@ -168,6 +187,10 @@ class ActorCritic(Model):
         # Apply gradients
         self.critic_optimizer.apply_gradients(zip(critic_gradients, critic_variables))
 
+        # The new priorities are sent after the step
+        if self.sampled_priorities is not None:
+            self.sampled_priorities.assign(sample.info.key, priority)
+
         # -------------------- Update 'Actor' & 'Alpha' -------------------- #
         with tf.GradientTape(persistent=True) as tape:
             quantiles, log_pi = self(sample.data["observation"], training=True)
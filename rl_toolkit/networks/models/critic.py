@@ -2,6 +2,8 @@ import tensorflow as tf
 from tensorflow.keras import Model
 from tensorflow.keras.layers import Activation, Add, Dense
 
+from rl_toolkit.networks.layers import ConvEncoder
+
 
 class Critic(Model):
     """
@@ -82,6 +84,7 @@ class MultiCritic(Model):
         n_quantiles (int): number of predicted quantiles
         top_quantiles_to_drop (int): number of quantiles to drop
         n_critics (int): number of critic networks
+        encoder (dict): arguments of the convolutional encoder of pixel observations shared by critics (`ConvEncoder`)
     """
 
     def __init__(
@@ -91,6 +94,7 @@ class MultiCritic(Model):
         top_quantiles_to_drop: int,
         n_critics: int,
         merge_index: int = -1,
+        encoder: dict = None,
         **kwargs
     ):
         super(MultiCritic, self).__init__(**kwargs)
@@ -98,12 +102,21 @@ class MultiCritic(Model):
         self.n_quantiles = n_quantiles
         self.top_quantiles_to_drop = top_quantiles_to_drop
 
+        # pixel observations
+        if encoder is not None:
+            self.encoder = ConvEncoder(**encoder, merge_frames=True)
+        else:
+            self.encoder = None
+
         # init critics
         self.models = [
             Critic(units, n_quantiles, merge_index) for _ in range(n_critics)
         ]
 
     def call(self, inputs, training=None):
+        if self.encoder is not None:
+            inputs = [self.encoder(inputs[0], training=training), inputs[1]]
+
         quantiles = tf.stack(
             [model(inputs, training=training) for model in self.models], axis=1
         )
@@ -0,0 +1,123 @@
+import tensorflow as tf
+from tensorflow.keras import Model
+
+
+class ActorDistillation(Model):
+    """
+    Actor's distillation
+    ===========
+
+    Trains the student Actor to match the action distribution of the teacher Actor,
+    the KL divergence is computed between the Gaussians before the `tanh`.
+
+    Attributes:
+        teacher (Actor): the trained Actor
+        student (Actor): the smaller Actor
+        tolerance (float): maximum action difference counted as the agreement
+
+    References:
+        - [Policy Distillation](https://arxiv.org/abs/1511.06295)
+    """
+
+    def __init__(self, teacher, student, tolerance: float = 0.1, **kwargs):
+        super(ActorDistillation, self).__init__(**kwargs)
+        self.teacher = teacher
+        self.student = student
+        self.tolerance = tolerance
+
+        self.teacher.trainable = False
+
+    def call(self, inputs, training=None):
+        return self.student(
+            inputs, training=training, with_log_prob=False, deterministic=True
+        )
+
+    def train_step(self, sample):
+        teacher_mean, teacher_std = self.teacher.distribution(
+            sample.data["observation"], training=False
+        )
+
+        with tf.GradientTape() as tape:
+            student_mean, student_std = self.student.distribution(
+                sample.data["observation"], training=True
+            )
+            kl = tf.reduce_sum(
+                tf.math.log(student_std / teacher_std)
+                + (tf.square(teacher_std) + tf.square(teacher_mean - student_mean))
+                / (2.0 * tf.square(student_std))
+                - 0.5,
+                axis=-1,
+            )
+            loss = tf.nn.compute_average_loss(kl)
+
+        # compute gradients
+        trainable_vars = self.student.trainable_variables
+        gradients = tape.gradient(loss, trainable_vars)
+
+        # Update weights
+        self.optimizer.apply_gradients(zip(gradients, trainable_vars))
+
+        # Deterministic actions
+        action_error = tf.reduce_max(
+            tf.abs(tf.tanh(teacher_mean) - tf.tanh(student_mean)), axis=-1
+        )
+
+        return {
+            "distillation_loss": loss,
+            "action_error": tf.reduce_mean(action_error),
+            "agreement": tf.reduce_mean(
+                tf.cast(action_error < self.tolerance, self.dtype)
+            ),
+        }
+
+
+class DuelingDQNDistillation(Model):
+    """
+    Dueling DQN's distillation
+    ===========
+
+    Trains the student Dueling DQN to match the Q-values of the teacher.
+
+    Attributes:
+        teacher (DuelingDQN): the trained Dueling DQN
+        student (DuelingDQN): the smaller Dueling DQN
+
+    References:
+        - [Policy Distillation](https://arxiv.org/abs/1511.06295)
+    """
+
+    def __init__(self, teacher, student, **kwargs):
+        super(DuelingDQNDistillation, self).__init__(**kwargs)
+        self.teacher = teacher
+        self.student = student
+
+        self.teacher.trainable = False
+
+    def call(self, inputs, training=None):
+        return self.student(inputs, training=training)
+
+    def train_step(self, sample):
+        teacher_Q = self.teacher(sample.data["observation"], training=False)
+
+        with tf.GradientTape() as tape:
+            student_Q = self.student(sample.data["observation"], training=True)
+            loss = tf.nn.compute_average_loss(
+                tf.keras.losses.log_cosh(teacher_Q, student_Q)
+            )
+
+        # compute gradients
+        trainable_vars = self.student.trainable_variables
+        gradients = tape.gradient(loss, trainable_vars)
+
+        # Update weights
+        self.optimizer.apply_gradients(zip(gradients, trainable_vars))
+
+        # Greedy actions
+        agreement = tf.equal(
+            tf.argmax(teacher_Q, axis=-1), tf.argmax(student_Q, axis=-1)
+        )
+
+        return {
+            "distillation_loss": loss,
+            "agreement": tf.reduce_mean(tf.cast(agreement, self.dtype)),
+        }
@@ -11,6 +11,10 @@ from tensorflow.keras.layers import (  # GlobalMaxPooling1D,; Lambda,
     MultiHeadAttention,
 )
 
+from rl_toolkit.networks.layers import ConvEncoder
+
+from .priority import importance_weights
+
 
 class PositionalEmbedding(Layer):
     def __init__(self, units, dropout_rate, **kwargs):
@@ -120,6 +124,9 @@ class DuelingDQN(Model):
         gamma,
         tau,
         target_dqn_model=None,
+        encoder=None,
+        n_step=1,
+        importance_exponent=0.0,
         **kwargs
     ):
         super(DuelingDQN, self).__init__(**kwargs)
@@ -128,9 +135,20 @@ class DuelingDQN(Model):
             if target_dqn_model is not None
             else None
         )
-        self.gamma = gamma
+        # The n-step return is bootstrapped n steps ahead
+        self.gamma = gamma**n_step
         self.tau = tau
 
+        # Prioritized replay
+        self.importance_exponent = importance_exponent
+        self.sampled_priorities = None
+
+        # Pixel observations, each frame is encoded separately
+        if encoder is not None:
+            self.encoder = ConvEncoder(**encoder, merge_frames=False)
+        else:
+            self.encoder = None
+
         # Input
         self.pos_embs = PositionalEmbedding(embed_dim, dropout_rate)
 
@@ -158,6 +176,9 @@ class DuelingDQN(Model):
         )
 
     def call(self, inputs, training=None):
+        if self.encoder is not None:
+            inputs = self.encoder(inputs, training=training)
+
         x = self.pos_embs(inputs, training=training)
 
         for layer in self.e_layers:
@@ -177,7 +198,7 @@ class DuelingDQN(Model):
         return V + A  # [B, A]
 
     def get_action(self, state, temperature):
-        return tf.random.categorical(self(state, training=False) / temperature, 1)[0, 0]
+        return tf.random.categorical(self(state, training=False) / temperature, 1)[:, 0]
 
     def _update_target(self):
         for source_weight, target_weight in zip(
@@ -203,6 +224,7 @@ class DuelingDQN(Model):
         indices = tf.range(tf.shape(targets)[0], dtype=sample.data["action"].dtype)
         indices = tf.transpose([indices, sample.data["action"]])
         updates = ext_reward[:, -1] + (1.0 - terminal[:, -1]) * self.gamma * next_Q
+        priority = tf.math.abs(updates - tf.gather_nd(targets, indices))
         targets = tf.stop_gradient(
             tf.tensor_scatter_nd_update(targets, indices, updates)
         )
@@ -212,6 +234,7 @@ class DuelingDQN(Model):
             y_pred = self(sample.data["observation"], training=True)
             dqn_loss = tf.nn.compute_average_loss(
                 tf.keras.losses.log_cosh(targets, y_pred)
+                * importance_weights(sample.info, self.importance_exponent)
             )
 
         # check exploiding loss
@@ -226,6 +249,10 @@ class DuelingDQN(Model):
         # Update weights
         self.optimizer.apply_gradients(zip(gradients, trainable_vars))
 
+        # The new priorities are sent after the step
+        if self.sampled_priorities is not None:
+            self.sampled_priorities.assign(sample.info.key, priority)
+
         # -------------------- Soft update target networks -------------------- #
         self._update_target()
 
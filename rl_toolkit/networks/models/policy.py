@@ -0,0 +1,133 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import tensorflow as tf
+
+
+class Policy(ABC):
+    """
+    Policy
+    ===============
+
+    Compiled inference of the model. The graph is traced once for the fixed input signature
+    with the dynamic batch dimension, so single and batched observations are served without retracing.
+    The subclasses implement the policy function (`_policy_fn`) and its extra inputs.
+
+    Attributes:
+        model: the built model
+        observation_shape (tuple): shape of the single observation
+        observation_dtype: dtype of the observations
+        jit_compile (bool): compile the graph with XLA (re-compiled for each new batch size)
+        warmup_batch_sizes (list): batch sizes compiled at startup
+    """
+
+    def __init__(
+        self,
+        model,
+        observation_shape: tuple,
+        observation_dtype,
+        jit_compile: bool = True,
+        warmup_batch_sizes: list = (1,),
+    ):
+        self.model = model
+        self._observation_shape = tuple(observation_shape)
+        self._observation_dtype = np.dtype(observation_dtype)
+
+        self._policy = tf.function(
+            self._policy_fn,
+            input_signature=[
+                tf.TensorSpec(
+                    (None,) + self._observation_shape, self._observation_dtype
+                ),
+                *self._extra_signature(),
+                tf.TensorSpec((), tf.bool),
+            ],
+            jit_compile=jit_compile,
+        )
+
+        # Compile the graph before the first interaction
+        for batch_size in warmup_batch_sizes:
+            self(
+                np.zeros(
+                    (batch_size,) + self._observation_shape, self._observation_dtype
+                )
+            )
+
+    def _extra_signature(self):
+        return []
+
+    def _extra_inputs(self, batch_size, **kwargs):
+        return []
+
+    @abstractmethod
+    def _policy_fn(self, inputs, *args):
+        """Actions of the batched inputs, the extra inputs and the `deterministic` flag follow"""
+
+    def __call__(self, inputs, deterministic: bool = False, **kwargs):
+        inputs = np.asarray(inputs, dtype=self._observation_dtype)
+
+        # Single observation
+        if inputs.ndim == len(self._observation_shape):
+            return self(inputs[np.newaxis], deterministic, **kwargs)[0]
+
+        action = self._policy(
+            inputs,
+            *self._extra_inputs(len(inputs), **kwargs),
+            tf.constant(deterministic),
+        )
+        return action.numpy()
+
+
+class ActorPolicy(Policy):
+    """
+    Actor's policy
+    ===============
+
+    Each sample has its own gSDE noise matrix `epsilon`, the actions are deterministic without it.
+    """
+
+    def _extra_signature(self):
+        return [
+            tf.TensorSpec((None,) + tuple(self.model.noise.kernel.shape), tf.float32)
+        ]
+
+    def _extra_inputs(self, batch_size, epsilon=None):
+        if epsilon is None:
+            epsilon = np.zeros(
+                (batch_size,) + tuple(self.model.noise.kernel.shape), np.float32
+            )
+        return [epsilon]
+
+    def _policy_fn(self, inputs, epsilon, deterministic):
+        # Zero noise gives the mean action
+        epsilon = tf.where(deterministic, tf.zeros_like(epsilon), epsilon)
+        return self.model(
+            inputs,
+            with_log_prob=False,
+            deterministic=False,
+            training=False,
+            epsilon=epsilon,
+        )
+
+
+class DuelingDQNPolicy(Policy):
+    """
+    Dueling DQN's policy
+    ===============
+
+    Boltzmann exploration with the per-sample `temperature`, greedy actions in the deterministic mode.
+    """
+
+    def _extra_signature(self):
+        return [tf.TensorSpec((None,), tf.float32)]
+
+    def _extra_inputs(self, batch_size, temperature=1.0):
+        return [np.broadcast_to(np.float32(temperature), (batch_size,))]
+
+    def _policy_fn(self, inputs, temperature, deterministic):
+        logits = self.model(inputs, training=False)  # Q values
+        return tf.where(
+            deterministic,
+            tf.argmax(logits, axis=-1),
+            tf.random.categorical(logits / temperature[:, tf.newaxis], 1)[:, 0],
+        )
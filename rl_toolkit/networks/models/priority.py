@@ -0,0 +1,36 @@
+import tensorflow as tf
+
+
+def importance_weights(info, exponent: float):
+    """Importance-sampling weights `(N * P(i)) ** -exponent` normalized by the maximum weight
+
+    The weights correct the bias of the prioritized sampling, they are ones for the uniform sampling.
+    """
+    weights = tf.math.pow(
+        tf.cast(info.table_size, tf.float64) * info.probability, -exponent
+    )
+    weights /= tf.reduce_max(weights)
+    return tf.cast(weights, tf.float32)
+
+
+class SampledPriorities:
+    """The keys and the new priorities of the last sampled batch
+
+    The train step assigns them to the variables, `PriorityCallback` sends them after the step,
+    so the compiled step (e.g. by XLA) does not call Python.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.priority = None
+
+    def assign(self, key, priority):
+        # The variables are created by the first trace, with the static batch size
+        if self.key is None:
+            with tf.init_scope():
+                self.key = tf.Variable(tf.zeros(key.shape, key.dtype), trainable=False)
+                self.priority = tf.Variable(
+                    tf.zeros(priority.shape, tf.float32), trainable=False
+                )
+        self.key.assign(key)
+        self.priority.assign(tf.cast(priority, tf.float32))
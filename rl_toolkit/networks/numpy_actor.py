@@ -0,0 +1,107 @@
+import numpy as np
+
+# Keras `backend.epsilon()`
+EPSILON = 1e-7
+
+
+def _elu(x):
+    return np.where(x > 0.0, x, np.expm1(np.minimum(x, 0.0)))
+
+
+class NumpyActor:
+    """
+    NumPy Actor
+    ===============
+
+    Inference of the SAC `Actor` without Tensorflow, e.g. on the robot's host.
+    The weights are exported from the Keras model by `from_actor` and stored as `.npz` file.
+
+    Attributes:
+        weights (dict): the exported weights of the Actor
+        seed (int): seed of the noise generator
+    """
+
+    def __init__(self, weights: dict, seed: int = None):
+        self._rng = np.random.default_rng(seed)
+        self.set_weights(weights)
+
+    @classmethod
+    def from_actor(cls, actor, seed: int = None):
+        return cls(cls.export_weights(actor), seed=seed)
+
+    @staticmethod
+    def export_weights(actor):
+        """Copy the weights of the Keras `Actor`"""
+        if actor.encoder is not None:
+            raise ValueError("The convolutional encoder is not supported in NumPy")
+
+        weights = {
+            "clip_mean": np.array(
+                [actor.clip_mean_min, actor.clip_mean_max], dtype=np.float32
+            ),
+            "mean/kernel": actor.mean.kernel.numpy(),
+            "mean/bias": actor.mean.bias.numpy(),
+            "noise/scale": actor.noise.scale.numpy(),
+            "noise/epsilon": actor.noise.epsilon.numpy(),
+        }
+        for i, layer in enumerate(actor.fc_layers):
+            weights[f"fc_{i}/kernel"] = layer.kernel.numpy()
+            weights[f"fc_{i}/bias"] = layer.bias.numpy()
+
+        return weights
+
+    @classmethod
+    def load(cls, path: str, seed: int = None):
+        with np.load(path) as data:
+            return cls(dict(data), seed=seed)
+
+    def save(self, path: str):
+        np.savez(path, **self._weights)
+
+    def set_weights(self, weights: dict):
+        self._weights = {
+            key: np.asarray(value, dtype=np.float32) for key, value in weights.items()
+        }
+        self._fc_layers = [
+            (self._weights[f"fc_{i}/kernel"], self._weights[f"fc_{i}/bias"])
+            for i in range(sum(key.endswith("/kernel") for key in weights) - 1)
+        ]
+        self._clip_mean_min, self._clip_mean_max = self._weights["clip_mean"]
+
+    @property
+    def scale(self):
+        return self._weights["noise/scale"]
+
+    @property
+    def epsilon(self):
+        return self._weights["noise/epsilon"]
+
+    def sample_noise(self, batch_size: int):
+        """Noise matrix for each sample, e.g. one per sub-environment"""
+        return self._rng.standard_normal(
+            (batch_size,) + self.scale.shape, np.float32
+        ) * (self.scale + EPSILON)
+
+    def reset_noise(self):
+        self._weights["noise/epsilon"] = self.sample_noise(1)[0]
+
+    def __call__(self, inputs, deterministic: bool = False, epsilon=None):
+        x = np.asarray(inputs, dtype=np.float32)
+
+        # hidden layers
+        for kernel, bias in self._fc_layers:
+            x = _elu(x @ kernel + bias)
+
+        # output layer
+        mean = x @ self._weights["mean/kernel"] + self._weights["mean/bias"]
+        mean = np.clip(mean, self._clip_mean_min, self._clip_mean_max)
+
+        if deterministic:
+            return np.tanh(mean)
+
+        if epsilon is None:
+            noise = x @ self.epsilon
+        else:
+            noise = np.einsum("...i,...io->...o", x, np.asarray(epsilon, np.float32))
+
+        return np.tanh(mean + noise)
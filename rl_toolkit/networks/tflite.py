@@ -0,0 +1,90 @@
+import numpy as np
+
+QUANTIZATIONS = ("none", "float16", "int8")
+
+
+def export_tflite(
+    policy_fn,
+    model,
+    observation_shape: tuple,
+    path: str,
+    quantization: str = "none",
+    calibration_data=None,
+    observation_dtype=np.float32,
+):
+    """Write the deterministic policy as TFLite model
+
+    Args:
+        policy_fn (callable): maps the batch of observations to the actions
+        model: the Keras model used by `policy_fn`
+        observation_shape (tuple): shape of the single observation
+        path (str): path to the `.tflite` file
+        quantization (str): post-training quantization (`none`, `float16` or `int8`)
+        calibration_data (np.ndarray): observations for calibration of the `int8` quantization, e.g. replay samples
+        observation_dtype: dtype of the observations (`uint8` for the pixel observations)
+    """
+    import tensorflow as tf
+
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    concrete_fn = tf.function(
+        policy_fn,
+        input_signature=[
+            tf.TensorSpec((1,) + tuple(observation_shape), observation_dtype)
+        ],
+    ).get_concrete_function()
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete_fn], model)
+
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if calibration_data is None:
+            raise ValueError("The int8 quantization requires the calibration data")
+
+        def representative_dataset():
+            for x in calibration_data:
+                yield [np.asarray(x, dtype=observation_dtype)[np.newaxis]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+
+
+class TFLitePolicy:
+    """
+    TFLite policy
+    ===============
+
+    Runs the policy exported by `export_tflite`, uses `tflite_runtime` if it is installed.
+
+    Attributes:
+        path (str): path to the `.tflite` file
+    """
+
+    def __init__(self, path: str):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self._interpreter = Interpreter(model_path=path)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+
+    def __call__(self, inputs, deterministic: bool = True):
+        inputs = np.asarray(inputs, dtype=self._input["dtype"])
+
+        # The model is exported for the single observation
+        if inputs.ndim == len(self._input["shape"]):
+            return np.stack([self(x) for x in inputs])
+
+        self._interpreter.set_tensor(self._input["index"], inputs[np.newaxis])
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output["index"])[0]
@@ -1,2 +1,12 @@
-from .replay_buffer import make_reverb_dataset  # noqa
+from .replay_buffer import (  # noqa
+    autotune_reverb_dataset,
+    make_reverb_dataset,
+    make_trajectory_writer,
+    sample_observations,
+)
+from .schema import ReplaySchema  # noqa
 from .variable_container import VariableContainer  # noqa
+from .inference import InferenceClient, InferenceService  # noqa
+from .priority import PriorityUpdater  # noqa
+from .sequence import SequenceTransitions, SequenceWriter  # noqa
+from .insert_queue import InsertQueue, QueuedWriter  # noqa
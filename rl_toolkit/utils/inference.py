@@ -0,0 +1,185 @@
+import os
+import queue
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+AUTHKEY_ENV = "RL_TOOLKIT_AUTHKEY"
+
+
+def get_authkey(authkey: bytes = None):
+    """The shared secret of the connections, from the `RL_TOOLKIT_AUTHKEY` environment variable by default
+
+    The messages are pickled, so the secret must not be known to anyone who can reach the port.
+    """
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV)
+        if not authkey:
+            raise ValueError(
+                f"The shared secret of the connections is required, set the {AUTHKEY_ENV} environment variable"
+            )
+        authkey = authkey.encode()
+    return authkey
+
+
+def _parse_address(address: str):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+class InferenceClient:
+    """
+    Client of the inference service
+    =================
+
+    Sends batches of observations to the `InferenceService` and waits for the actions.
+
+    Attributes:
+        address (str): address of the inference service (e.g. localhost:8001)
+        authkey (bytes): shared secret of the service, the `RL_TOOLKIT_AUTHKEY` environment variable by default
+    """
+
+    def __init__(self, address: str, authkey: bytes = None):
+        self._conn = Client(_parse_address(address), authkey=get_authkey(authkey))
+
+    def act(self, request: dict):
+        self._conn.send(request)
+        return self._conn.recv()
+
+    def close(self):
+        self._conn.close()
+
+
+class InferenceService:
+    """
+    Batched inference service
+    =================
+
+    Collects requests of all connected agents and runs the policy once per batch.
+    A batch is closed when it holds `max_batch_size` observations or when the oldest
+    request waits for `max_wait_ms` milliseconds.
+
+    Attributes:
+        port (int): the port number of the service
+        infer_fn (callable): maps the list of requests to the list of responses
+        max_batch_size (int): maximum number of observations in one batch
+        max_wait_ms (float): maximum waiting time of the request for the batch
+        host (str): the bind address, `0.0.0.0` serves the agents of the other machines
+        authkey (bytes): shared secret of the service, the `RL_TOOLKIT_AUTHKEY` environment variable by default
+
+    References:
+        - [SEED RL: Scalable and Efficient Deep-RL with Accelerated Central Inference](https://arxiv.org/abs/1910.06591)
+    """
+
+    def __init__(
+        self,
+        port: int,
+        infer_fn,
+        max_batch_size: int,
+        max_wait_ms: float,
+        host: str = "127.0.0.1",
+        authkey: bytes = None,
+    ):
+        self._infer_fn = infer_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000.0
+
+        self._requests = queue.Queue()
+        self._listener = Listener((host, port), authkey=get_authkey(authkey))
+        self._running = True
+        self.num_connections = 0
+
+        # Metrics
+        self._batch_sizes = []
+        self._latencies = []
+        self._num_requests = 0
+
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+    def _accept(self):
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                continue
+            self.num_connections += 1
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        while self._running:
+            try:
+                request = conn.recv()
+            except (OSError, EOFError):
+                # Agent disconnected
+                self._requests.put((conn, None, time.monotonic()))
+                break
+            self._requests.put((conn, request, time.monotonic()))
+
+    def _next_batch(self, timeout):
+        try:
+            batch = [self._requests.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        batch_size = len(batch[0][1]["observation"]) if batch[0][1] is not None else 0
+        deadline = batch[0][2] + self._max_wait
+        while batch_size < self._max_batch_size:
+            try:
+                item = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item[1] is not None:
+                batch_size += len(item[1]["observation"])
+        return batch
+
+    def serve(self, timeout: float = 1.0):
+        """Serve one batch of requests, waits at most `timeout` seconds for the first request"""
+        batch = self._next_batch(timeout)
+
+        closed = [conn for conn, request, _ in batch if request is None]
+        self.num_connections -= len(closed)
+        batch = [item for item in batch if item[1] is not None]
+        if batch:
+            responses = self._infer_fn([(conn, request) for conn, request, _ in batch])
+            for (conn, _, arrival), response in zip(batch, responses):
+                try:
+                    conn.send(response)
+                except (OSError, EOFError):
+                    continue
+                self._latencies.append(time.monotonic() - arrival)
+
+            self._batch_sizes.append(
+                sum(len(request["observation"]) for _, request, _ in batch)
+            )
+            self._num_requests += len(batch)
+
+        return closed
+
+    def metrics(self):
+        """Returns the metrics since the last call"""
+        if not self._batch_sizes:
+            return {}
+
+        latencies = np.array(self._latencies) * 1000.0
+        metrics = {
+            "inference/batch_size": np.mean(self._batch_sizes),
+            "inference/max_batch_size": np.max(self._batch_sizes),
+            "inference/latency_ms": np.mean(latencies),
+            "inference/latency_p99_ms": np.percentile(latencies, 99),
+            "inference/requests": self._num_requests,
+            "inference/batches": len(self._batch_sizes),
+        }
+        self._batch_sizes = []
+        self._latencies = []
+        self._num_requests = 0
+
+        return metrics
+
+    def close(self):
+        self._running = False
+        self._listener.close()
@@ -0,0 +1,625 @@
+import os
+import pickle
+import queue
+import tempfile
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client
+
+import numpy as np
+import reverb
+
+from .inference import _parse_address, get_authkey
+from .replay_buffer import make_trajectory_writer
+
+
+class _Column:
+    def __init__(self, name):
+        self._name = name
+
+    def __getitem__(self, key):
+        return (self._name, key)
+
+
+class _History:
+    def __getitem__(self, name):
+        return _Column(name)
+
+
+class QueuedWriter:
+    """Stand-in of the trajectory writer, the calls are recorded into the `InsertQueue`
+
+    The history slices are resolved by the background thread, so the items reference the same steps.
+    """
+
+    def __init__(self, insert_queue, stream: int):
+        self._insert_queue = insert_queue
+        self._stream = stream
+        self.history = _History()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def append(self, data):
+        # The stacked observations may be views into the frame buffers
+        self._insert_queue.put(
+            self._stream,
+            "append",
+            {key: np.array(value) for key, value in data.items()},
+        )
+
+    def create_item(self, table, priority, trajectory):
+        self._insert_queue.put(
+            self._stream, "create_item", (table, priority, trajectory)
+        )
+
+    def flush(self, block_until_num_items=0, timeout_ms=None):
+        self._insert_queue.put(self._stream, "flush", block_until_num_items)
+
+    def end_episode(self, clear_buffers=True, timeout_ms=None):
+        self._insert_queue.put(self._stream, "end_episode", None)
+
+
+class _SharedWriter:
+    """Trajectory writer of the merged streams, the steps are addressed by their position in the writer"""
+
+    def __init__(self, client, num_keep_alive_refs: int, chunk_length: dict = None):
+        self._writer = make_trajectory_writer(client, num_keep_alive_refs, chunk_length)
+        self._num_keep_alive_refs = num_keep_alive_refs
+        self.num_steps = 0
+        self.num_reappended = 0
+
+    def append(self, data):
+        self._writer.append(data)
+        self.num_steps += 1
+        return self.num_steps - 1
+
+    def expired(self, position: int):
+        return position < self.num_steps - self._num_keep_alive_refs
+
+    def column(self, name: str, positions):
+        return self._writer.history[name][positions]
+
+    def create_item(self, table, priority, trajectory):
+        self._writer.create_item(table, priority, trajectory)
+
+    def flush(self, block_until_num_items=0, timeout_ms=None):
+        self._writer.flush(block_until_num_items, timeout_ms=timeout_ms)
+
+    def close(self):
+        self._writer.close()
+
+
+class _StreamWriter:
+    """Stream of the steps in the shared writer, its history is indexed by the steps of the stream
+
+    The steps left behind the keep-alive of the shared writer by the other streams are appended again.
+    """
+
+    def __init__(self, shared: _SharedWriter, num_keep_alive_refs: int):
+        self._shared = shared
+        self._steps = deque(maxlen=num_keep_alive_refs)  # [position, data]
+        self.history = _History()
+
+    def append(self, data):
+        self._steps.append([self._shared.append(data), data])
+
+    def create_item(self, table, priority, trajectory):
+        while self._steps and self._shared.expired(min(s[0] for s in self._steps)):
+            for step in self._steps:
+                if self._shared.expired(step[0]):
+                    step[0] = self._shared.append(step[1])
+                    self._shared.num_reappended += 1
+
+        positions = [step[0] for step in self._steps]
+        self._shared.create_item(
+            table,
+            priority,
+            {
+                key: self._shared.column(column, positions[index])
+                for key, (column, index) in trajectory.items()
+            },
+        )
+
+    def end_episode(self, timeout_ms=None):
+        self._steps.clear()
+
+    def close(self):
+        pass
+
+
+class InsertQueue:
+    """
+    Insert queue
+    =================
+
+    Decouples the agent's environment loop from the replay server. The writers (`QueuedWriter`) only put
+    the appended steps and created items into the bounded in-memory queue, the background thread replays them
+    on the trajectory writers. When the queue is full (the rate limiter throttles the inserts or the server
+    is unreachable), the calls are spilled to the local append-only file and replayed in order after the queue.
+
+    The blocking flushes are retried until the server answers, the full flushes and the episode ends confirm the items.
+    Only the timeouts and the broken connections are retried, the other errors (e.g. the trajectory
+    inconsistent with the table signature) stop the sender and are raised by the next `put` or `close`.
+    After the restart of the server (it was unreachable or its insert counter is below the one read after
+    the last confirmation) the writers are recreated and the calls since the last confirmation are replayed,
+    so the unconfirmed items may be inserted twice.
+
+    With the `shared_keep_alive_refs`, the streams are merged into one trajectory writer instead of the writer
+    per stream, so the chunks hold the steps of all streams and one flush every `flush_interval` seconds
+    confirms the items of all streams, the streams' own flushes are not sent.
+
+    With the `aggregator`, the calls are sent in batches to the node-local aggregator (`Aggregator`) instead,
+    which replays them on its own writers of the database server. After the lost connection the calls since
+    the last full flush are sent again as the new streams of the aggregator.
+
+    Attributes:
+        db_server (str): database server address (e.g. localhost:8000)
+        num_keep_alive_refs (int): number of the last steps referenced by the items
+        chunk_length (dict): number of steps per chunk of the replay columns, the missing columns are auto-tuned
+        max_queue_size (int): maximum number of calls waiting in memory
+        spill_dir (str): directory of the spill files (the system's temporary directory by default)
+        flush_timeout (float): seconds of the blocking flush before the server is checked
+        retry_interval (float): seconds between the checks of the unreachable server
+        table (str): the name of experience table
+        aggregator (str): the aggregator's insert address (e.g. localhost:8003), the database server is not used
+        max_batch_size (int): maximum number of calls sent to the aggregator at once
+        shared_keep_alive_refs (int): number of the last steps kept by the shared writer of the merged streams
+        flush_interval (float): seconds between the flushes of the shared writer
+    """
+
+    def __init__(
+        self,
+        db_server: str,
+        num_keep_alive_refs: int,
+        chunk_length: dict = None,
+        max_queue_size: int = 65536,
+        spill_dir: str = None,
+        flush_timeout: float = 5.0,
+        retry_interval: float = 1.0,
+        table: str = "experience",
+        aggregator: str = None,
+        max_batch_size: int = 256,
+        shared_keep_alive_refs: int = None,
+        flush_interval: float = 0.05,
+    ):
+        self._db_server = db_server
+        self._num_keep_alive_refs = num_keep_alive_refs
+        self._chunk_length = chunk_length
+        self._spill_dir = spill_dir
+        self._flush_timeout = flush_timeout
+        self._retry_interval = retry_interval
+        self._table = table
+        self._aggregator = aggregator
+        self._max_batch_size = max_batch_size
+        self._shared_keep_alive_refs = shared_keep_alive_refs
+        self._flush_interval = flush_interval
+        self._num_streams = 0
+        self._stream_refs = {}
+
+        # Agent's side
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._spilling = False
+        self._spill_file = None
+        self._spill_path = None
+
+        # Sender's side
+        self._reader = None
+        self._reader_path = None
+        self._client = None if aggregator else reverb.Client(db_server)
+        self._authkey = get_authkey() if aggregator else None
+        self._connection = None
+        self._writers = {}
+        self._shared = None
+        self._unflushed = False
+        self._released = set()
+        self._logs = {}
+        self._last_inserts = 0
+        self._last_check = float("-inf")
+
+        # Statistics
+        self._spill_bytes = 0
+        self._spilled_calls = 0
+        self._reconnects = 0
+        self._flushes = 0
+
+        self._error = None
+        self._thread = threading.Thread(target=self._main, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def writer(self):
+        """New stream of the steps, e.g. one per sub-environment"""
+        return QueuedWriter(self, self.open_stream())
+
+    def open_stream(self, num_keep_alive_refs: int = None):
+        """Id of the new stream, its items reference the last `num_keep_alive_refs` steps"""
+        if (
+            self._shared_keep_alive_refs is not None
+            and (num_keep_alive_refs or 0) > self._shared_keep_alive_refs
+        ):
+            raise ValueError(
+                f"The stream keeps {num_keep_alive_refs} steps, "
+                f"the shared writer only {self._shared_keep_alive_refs}"
+            )
+        with self._lock:
+            stream = self._num_streams
+            self._num_streams += 1
+            self._stream_refs[stream] = num_keep_alive_refs or self._num_keep_alive_refs
+        return stream
+
+    def put(self, stream, method, args):
+        self._raise_error()
+        call = (stream, method, args)
+        with self._lock:
+            if not self._spilling:
+                try:
+                    self._queue.put_nowait(call)
+                    return
+                except queue.Full:
+                    self._spilling = True
+
+            # The following calls are spilled until the sender drains the file
+            if self._spill_file is None:
+                fd, self._spill_path = tempfile.mkstemp(
+                    prefix="insert_queue_", suffix=".pkl", dir=self._spill_dir
+                )
+                self._spill_file = os.fdopen(fd, "wb")
+            start = self._spill_file.tell()
+            pickle.dump(call, self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spill_bytes += self._spill_file.tell() - start
+            self._spilled_calls += 1
+
+    def _next(self, timeout=None):
+        """The next call, `None` if it is not waiting after `timeout` seconds (waits without the timeout)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._reader is not None:
+                try:
+                    return pickle.load(self._reader)
+                except EOFError:
+                    size = self._reader.tell()
+                    self._reader.close()
+                    os.remove(self._reader_path)
+                    self._reader = None
+                    with self._lock:
+                        self._spill_bytes -= size
+
+            wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            try:
+                if wait > 0:
+                    return self._queue.get(timeout=wait)
+                return self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._spill_file is not None:
+                    # The spilled calls follow the queued ones
+                    self._spill_file.close()
+                    self._reader_path = self._spill_path
+                    self._reader = open(self._reader_path, "rb")
+                    self._spill_file = None
+                else:
+                    self._spilling = False
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return None
+
+    def _raise_error(self):
+        """The error of the stopped sender is raised to the agent"""
+        if self._error is not None:
+            raise self._error
+
+    def _main(self):
+        try:
+            if self._aggregator:
+                self._send()
+            else:
+                self._run()
+        except Exception as error:
+            print(f"Insert queue: the sender is stopped by {error!r}")
+            self._error = error
+
+    def _close_reader(self):
+        # The close call is the last one, also when spilled
+        if self._reader is not None:
+            self._reader.close()
+            os.remove(self._reader_path)
+            self._reader = None
+            with self._lock:
+                self._spill_bytes = 0
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            if self._shared_keep_alive_refs is None:
+                call = self._next()
+            else:
+                # The merged streams are flushed together
+                call = self._next(
+                    max(0.0, last_flush + self._flush_interval - time.monotonic())
+                )
+                if time.monotonic() - last_flush >= self._flush_interval:
+                    self._flush_shared()
+                    last_flush = time.monotonic()
+                if call is None:
+                    continue
+
+            stream, method, args = call
+            if method == "close":
+                self._close_reader()
+                break
+            if stream not in self._writers:
+                self._writers[stream] = self._make_writer(stream)
+                self._logs.setdefault(stream, deque())
+
+            # The calls since the last confirmation are replayed after the restart
+            log = self._logs[stream]
+            if method in ("append", "create_item"):
+                # The failed call is applied after the replay of the log
+                self._retry(lambda: self._apply(self._writers[stream], method, args))
+                log.append((method, args))
+                self._unflushed = True
+            elif self._shared_keep_alive_refs is not None:
+                # The items of the merged streams are confirmed by the shared flushes
+                if method == "end_episode":
+                    self._writers[stream].end_episode()
+                    log.append((method, args))
+                elif method == "release":
+                    self._writers.pop(stream)
+                    self._released.add(stream)
+            elif method == "flush":
+                self._retry(lambda: self._flush(self._writers[stream], args))
+                if not args:
+                    self._confirm(stream)
+                    self._check_server()
+            elif method == "end_episode":
+                self._retry(lambda: self._end_episode(self._writers[stream]))
+                log.clear()
+            elif method == "release":
+                # The stream of the disconnected agent
+                self._retry(lambda: self._end_episode(self._writers[stream]))
+                self._writers.pop(stream).close()
+                del self._logs[stream]
+
+        if self._shared_keep_alive_refs is not None:
+            self._flush_shared()
+            if self._shared is not None:
+                self._shared.close()
+        else:
+            for stream in self._writers:
+                self._retry(lambda: self._flush(self._writers[stream], 0))
+                self._writers[stream].close()
+
+    def _flush_shared(self):
+        """The items of all merged streams are confirmed by one flush"""
+        if self._shared is None or not self._unflushed:
+            return
+        self._retry(lambda: self._flush(self._shared, 0))
+        self._unflushed = False
+        for stream in list(self._logs):
+            if stream in self._released:
+                self._released.discard(stream)
+                self._writers.pop(stream, None)
+                del self._logs[stream]
+            else:
+                self._confirm(stream)
+        self._check_server()
+
+    def _send(self):
+        """Sender to the aggregator, the calls are sent in batches"""
+        while True:
+            calls = [self._next()]
+            while calls[-1][1] != "close" and len(calls) < self._max_batch_size:
+                call = self._next(0)
+                if call is None:
+                    break
+                calls.append(call)
+            closing = calls[-1][1] == "close"
+            if closing:
+                calls.pop()
+                self._close_reader()
+
+            # The new streams are opened by the aggregator with their keep-alive
+            opened = []
+            messages = []
+            for stream, method, args in calls:
+                if stream not in self._logs and stream not in opened:
+                    opened.append(stream)
+                    messages.append((stream, "open", self._stream_refs[stream]))
+                messages.append((stream, method, args))
+            if messages:
+                self._send_retry(messages)
+
+            # The calls since the last full flush are sent again after the lost connection
+            for stream in opened:
+                self._logs[stream] = deque()
+            for stream, method, args in calls:
+                log = self._logs[stream]
+                if method in ("append", "create_item"):
+                    log.append((method, args))
+                elif method == "flush" and not args:
+                    self._confirm(stream)
+                elif method == "end_episode":
+                    log.clear()
+
+            if closing:
+                break
+
+        if self._connection is not None:
+            self._connection.close()
+
+    def _send_retry(self, messages):
+        lost = False
+        while True:
+            try:
+                if self._connection is None:
+                    self._connection = Client(
+                        _parse_address(self._aggregator), authkey=self._authkey
+                    )
+                    if lost:
+                        self._resend()
+                elif self._connection.poll():
+                    # The aggregator only closes the connection
+                    raise EOFError
+                self._connection.send(messages)
+                return
+            except (OSError, EOFError) as error:
+                print(
+                    f"Insert queue: the aggregator {self._aggregator} is unreachable ({error!r}), "
+                    f"retrying in {self._retry_interval} s"
+                )
+                lost = True
+                if self._connection is not None:
+                    self._connection.close()
+                    self._connection = None
+                time.sleep(self._retry_interval)
+
+    def _resend(self):
+        print(f"Insert queue: reconnecting to the aggregator {self._aggregator}")
+        self._reconnects += 1
+        messages = []
+        for stream, log in self._logs.items():
+            messages.append((stream, "open", self._stream_refs[stream]))
+            messages.extend((stream, method, args) for method, args in log)
+        self._connection.send(messages)
+
+    def _make_writer(self, stream):
+        if self._shared_keep_alive_refs is None:
+            return make_trajectory_writer(
+                self._client, self._stream_refs[stream], self._chunk_length
+            )
+        if self._shared is None:
+            self._shared = _SharedWriter(
+                self._client, self._shared_keep_alive_refs, self._chunk_length
+            )
+        return _StreamWriter(self._shared, self._stream_refs[stream])
+
+    def _apply(self, writer, method, args):
+        if method == "append":
+            writer.append(args)
+        elif method == "end_episode":
+            writer.end_episode()
+        else:
+            table, priority, trajectory = args
+            writer.create_item(
+                table,
+                priority,
+                {
+                    key: writer.history[column][index]
+                    for key, (column, index) in trajectory.items()
+                },
+            )
+
+    def _flush(self, writer, block_until_num_items):
+        self._flushes += 1
+        writer.flush(block_until_num_items, timeout_ms=int(1000 * self._flush_timeout))
+
+    def _end_episode(self, writer):
+        writer.end_episode(timeout_ms=int(1000 * self._flush_timeout))
+
+    def _confirm(self, stream):
+        """The confirmed items are dropped, the steps of the episode referenced by the next items are kept"""
+        log = self._logs[stream]
+        steps = []
+        for call in log:
+            if call[0] == "append":
+                steps.append(call)
+            elif call[0] == "end_episode":
+                steps.clear()
+        log.clear()
+        log.extend(steps[-self._stream_refs[stream] :])
+
+    def _retry(self, func):
+        """Retries the timeouts and the broken connections, the other errors are raised"""
+        restarted = False
+        reconnected = False
+        while True:
+            try:
+                if restarted:
+                    self._reconnect()
+                    restarted = False
+                return func()
+            except reverb.errors.DeadlineExceededError as error:
+                # Throttled by the rate limiter or the unreachable server
+                print(f"Insert queue: {error}, retrying")
+                restarted = self._wait_for_server() or restarted
+            except RuntimeError as error:
+                # The broken connection is recreated, the error repeated on the reachable server is raised
+                if not self._wait_for_server() and reconnected:
+                    raise
+                print(
+                    f"Insert queue: {error}, reconnecting in {self._retry_interval} s"
+                )
+                time.sleep(self._retry_interval)
+                restarted = reconnected = True
+
+    def _check_server(self):
+        """The insert counter of the reachable server, compared after the failed calls"""
+        now = time.monotonic()
+        if now - self._last_check < self._retry_interval:
+            return
+        self._last_check = now
+        try:
+            info = self._client.server_info(timeout=max(1, int(self._retry_interval)))
+        except (reverb.errors.ReverbError, RuntimeError):
+            return
+        self._last_inserts = info[self._table].rate_limiter_info.insert_stats.completed
+
+    def _wait_for_server(self):
+        """Whether the server was restarted, the throttled server is waited for"""
+        unreachable = False
+        while True:
+            try:
+                info = self._client.server_info(
+                    timeout=max(1, int(self._retry_interval))
+                )
+                break
+            except (reverb.errors.ReverbError, RuntimeError):
+                print(
+                    f"Insert queue: the server {self._db_server} is unreachable, "
+                    f"retrying in {self._retry_interval} s"
+                )
+                unreachable = True
+                time.sleep(self._retry_interval)
+
+        inserts = info[self._table].rate_limiter_info.insert_stats.completed
+        restarted = unreachable or inserts < self._last_inserts
+        self._last_inserts = inserts
+        return restarted
+
+    def _reconnect(self):
+        print(f"Insert queue: reconnecting to the server {self._db_server}")
+        self._reconnects += 1
+        self._client = reverb.Client(self._db_server)
+        self._shared = None
+        for stream, log in self._logs.items():
+            self._writers[stream] = self._make_writer(stream)
+            for method, args in log:
+                self._apply(self._writers[stream], method, args)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "Insert/queue_depth": self._queue.qsize(),
+                "Insert/spill_bytes": self._spill_bytes,
+                "Insert/spilled_calls": self._spilled_calls,
+                "Insert/reconnects": self._reconnects,
+                "Insert/flushes": self._flushes,
+            }
+
+    def close(self, timeout: float = None):
+        """Send the queued and spilled calls"""
+        self.put(None, "close", None)
+        self._thread.join(timeout)
+        self._raise_error()
@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+
+import numpy as np
+import reverb
+
+
+class PriorityUpdater:
+    """
+    Priority updater
+    =================
+
+    Writes the priorities computed by the learner back to the prioritized table. The learner
+    only appends the priorities to the local buffer, the full buffer is sent by the background
+    thread as one `mutate_priorities` request, so the updates are off the training critical path.
+    When the server is slower than the learner, the oldest pending batches are dropped.
+    The error of the request stops the thread and is raised by the next `push` or `close`.
+
+    Attributes:
+        db_server (str): database server address (e.g. localhost:8000)
+        table (str): the name of prioritized table
+        batch_size (int): number of priorities sent at once
+        max_pending (int): maximum number of batches waiting for the sending
+        epsilon (float): added to the priorities, so every item can be sampled
+
+    References:
+        - [Prioritized Experience Replay](https://arxiv.org/abs/1511.05952)
+        - [Distributed Prioritized Experience Replay](https://arxiv.org/abs/1803.00933)
+    """
+
+    def __init__(
+        self,
+        db_server: str,
+        table: str = "experience",
+        batch_size: int = 65536,
+        max_pending: int = 4,
+        epsilon: float = 1e-6,
+    ):
+        self._client = reverb.Client(db_server)
+        self._table = table
+        self._batch_size = batch_size
+        self._epsilon = epsilon
+
+        self._keys = []
+        self._priorities = []
+        self._buffered = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+
+        # Statistics
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._sent_updates = 0
+        self._sent_batches = 0
+        self._dropped_batches = 0
+        self._send_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, keys, priorities):
+        """Buffer the priorities of the sampled items (called after the learner's step)"""
+        self._raise_error()
+        self._keys.append(np.asarray(keys))
+        self._priorities.append(np.asarray(priorities, dtype=np.float64))
+        self._buffered += len(self._keys[-1])
+
+        if self._buffered >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffered:
+            return
+
+        batch = (np.concatenate(self._keys), np.concatenate(self._priorities))
+        self._keys, self._priorities, self._buffered = [], [], 0
+
+        while True:
+            try:
+                self._queue.put_nowait(batch)
+                return
+            except queue.Full:
+                # Keep the newest priorities
+                try:
+                    self._queue.get_nowait()
+                    with self._lock:
+                        self._dropped_batches += 1
+                except queue.Empty:
+                    pass
+
+    def _raise_error(self):
+        """The error of the stopped thread is raised to the learner"""
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        try:
+            self._send()
+        except Exception as error:
+            print(f"Priority updater: the thread is stopped by {error!r}")
+            self._error = error
+
+    def _send(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            keys, priorities = batch
+
+            # The latest priority of the item sampled more times wins
+            updates = dict(zip(keys.tolist(), (priorities + self._epsilon).tolist()))
+
+            start = time.perf_counter()
+            self._client.mutate_priorities(self._table, updates=updates)
+            send_time = time.perf_counter() - start
+
+            with self._lock:
+                self._sent_updates += len(updates)
+                self._sent_batches += 1
+                self._send_time += send_time
+
+    def metrics(self):
+        with self._lock:
+            elapsed = time.perf_counter() - self._start
+            return {
+                "priority_updates_per_sec": self._sent_updates / elapsed,
+                "priority_batches": self._sent_batches,
+                "priority_batch_time_ms": 1000.0
+                * self._send_time
+                / max(self._sent_batches, 1),
+                "priority_pending_batches": self._queue.qsize(),
+                "priority_dropped_batches": self._dropped_batches,
+            }
+
+    def close(self):
+        self.flush()
+
+        # The stopped thread does not take the sentinel
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=1.0)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        self._raise_error()
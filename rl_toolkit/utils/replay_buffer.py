@@ -1,14 +1,45 @@
+import time
+
 import reverb
 import tensorflow as tf
 
+from .schema import ReplaySchema
+
+
+def make_reverb_dataset(
+    server_address: str,
+    table: str,
+    batch_size: int,
+    num_workers: int = tf.data.AUTOTUNE,
+    num_workers_per_iterator: int = -1,
+    max_in_flight_samples_per_worker: int = None,
+    worker_batch_size: int = None,
+    prefetch: int = 0,
+    schema: ReplaySchema = None,
+    map_func=None,
+):
+    """Batches of the replay samples for the train step
+
+    `num_workers` datasets sample in parallel (`-1` is one per CPU core), each with `num_workers_per_iterator`
+    reverb workers (`-1` is auto-selected). With `worker_batch_size` each dataset batches its own samples and
+    the batches are rebatched to `batch_size`, so the batching runs in parallel too.
+    `prefetch` batches are prepared ahead of the train step (`-1` is autotuned by tf.data).
+    The batches stored by the `schema` are decoded to float32 observations and rewards,
+    then mapped by `map_func` (e.g. the windows of the sequence layout to transitions by `SequenceTransitions`).
+    """
+    if max_in_flight_samples_per_worker is None:
+        max_in_flight_samples_per_worker = 2 * (worker_batch_size or batch_size)
 
-def make_reverb_dataset(server_address: str, table: str, batch_size: int):
     def _make_dataset(unused_idx):
-        return reverb.TrajectoryDataset.from_table_signature(
+        dataset = reverb.TrajectoryDataset.from_table_signature(
             server_address=server_address,
             table=table,
-            max_in_flight_samples_per_worker=(2 * batch_size),
+            max_in_flight_samples_per_worker=max_in_flight_samples_per_worker,
+            num_workers_per_iterator=num_workers_per_iterator,
         )
+        if worker_batch_size:
+            dataset = dataset.batch(worker_batch_size, drop_remainder=True)
+        return dataset
 
     # Create the dataset
     dataset = (
@@ -16,11 +47,161 @@ def make_reverb_dataset(server_address: str, table: str, batch_size: int):
         .repeat()
         .interleave(
             map_func=_make_dataset,
-            cycle_length=tf.data.AUTOTUNE,
-            num_parallel_calls=tf.data.AUTOTUNE,
+            cycle_length=num_workers,
+            num_parallel_calls=num_workers,
             deterministic=False,
         )
     )
-    dataset = dataset.batch(batch_size, drop_remainder=True)
+    if worker_batch_size:
+        dataset = dataset.rebatch(batch_size, drop_remainder=True)
+    else:
+        dataset = dataset.batch(batch_size, drop_remainder=True)
+
+    if schema is not None:
+        dataset = dataset.map(schema.decode, num_parallel_calls=tf.data.AUTOTUNE)
+    if map_func is not None:
+        dataset = dataset.map(map_func, num_parallel_calls=tf.data.AUTOTUNE)
+
+    if prefetch:
+        dataset = dataset.prefetch(prefetch)
 
     return dataset
+
+
+def _make_probe(server_address: str, table: str, num_items: int):
+    """Local table holding the copy of `num_items` items, sampled without the rate limiter of the training"""
+    client = reverb.Client(server_address)
+    probe = reverb.Server(
+        tables=[
+            reverb.Table(
+                name=table,
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=num_items,
+                signature=client.server_info()[table].signature,
+            )
+        ]
+    )
+
+    # Each item is one step of the probe's trajectory
+    with make_trajectory_writer(probe.localhost_client(), 1) as writer:
+        for sample in client.sample(
+            table, num_items, emit_timesteps=False, unpack_as_table_signature=True
+        ):
+            writer.append(sample.data)
+            writer.create_item(
+                table,
+                1.0,
+                {column: writer.history[column][-1] for column in sample.data},
+            )
+    return probe
+
+
+def autotune_reverb_dataset(
+    model: tf.keras.Model,
+    server_address: str,
+    table: str,
+    batch_size: int,
+    candidates: list = (1, 2, 4, 8),
+    num_batches: int = 10,
+    **kwargs,
+):
+    """The dataset with the fewest sampling workers keeping the train step of `model` fed
+
+    One batch of the table is copied to the local probe without the rate limiter, so the tuning
+    takes only one batch of the sampling budget. The train step is timed on the batch, then all variables
+    it uses (the model, its target networks and optimizers) are restored, so the model is not trained.
+    The sampled items per second of the candidate `num_workers` are measured on the probe in the increasing order.
+    Without the sufficient candidate the fastest one is used. The other arguments are passed to `make_reverb_dataset`.
+
+    Returns:
+        the dataset and the selected number of workers
+    """
+    probe = _make_probe(server_address, table, batch_size)
+    probe_address = f"localhost:{probe.port}"
+    try:
+        dataset = make_reverb_dataset(probe_address, table, batch_size, 1, **kwargs)
+        sample = next(iter(dataset))
+
+        # The tracing creates the optimizer slots, the variables of the step are restored after the timing
+        train_step = tf.function(model.train_step)
+        variables = train_step.get_concrete_function(sample).variables
+        state = [variable.numpy() for variable in variables]
+
+        # Demand of the train step
+        tf.nest.map_structure(lambda x: x.numpy(), train_step(sample))
+        start = time.perf_counter()
+        for _ in range(num_batches):
+            logs = train_step(sample)
+        tf.nest.map_structure(lambda x: x.numpy(), logs)
+        demand = num_batches * batch_size / (time.perf_counter() - start)
+
+        for variable, value in zip(variables, state):
+            variable.assign(value)
+        print(
+            f"Sampler autotune: the train step consumes {demand:.0f} items per second"
+        )
+
+        best_rate, selected = 0.0, None
+        for num_workers in candidates:
+            iterator = iter(
+                make_reverb_dataset(
+                    probe_address, table, batch_size, num_workers, **kwargs
+                )
+            )
+            next(iterator)
+            start = time.perf_counter()
+            for _ in range(num_batches):
+                next(iterator)
+            rate = num_batches * batch_size / (time.perf_counter() - start)
+            print(
+                f"Sampler autotune: {num_workers} workers sample {rate:.0f} items per second"
+            )
+
+            if rate > best_rate:
+                best_rate, selected = rate, num_workers
+            if rate >= demand:
+                break
+    finally:
+        probe.stop()
+
+    dataset = make_reverb_dataset(server_address, table, batch_size, selected, **kwargs)
+    return dataset, selected
+
+
+def make_trajectory_writer(
+    client: reverb.Client, num_keep_alive_refs: int, chunk_length: dict = None
+):
+    """Trajectory writer with the constant chunk length of the configured columns
+
+    `chunk_length` maps the column to the number of steps per chunk, the other columns are auto-tuned.
+    Each chunk is compressed as a whole, so the longer chunks of redundant columns (e.g. frames) compress better,
+    but the items wait in the writer until their chunks are complete.
+    """
+    writer = client.trajectory_writer(num_keep_alive_refs=num_keep_alive_refs)
+    for column, length in (chunk_length or {}).items():
+        writer.configure(
+            (column,),
+            num_keep_alive_refs=max(num_keep_alive_refs, length),
+            max_chunk_length=length,
+        )
+    return writer
+
+
+def sample_observations(
+    server_address: str,
+    table: str,
+    num_samples: int,
+    schema: ReplaySchema = None,
+    map_func=None,
+):
+    """Sample the observations stored in the table, e.g. for calibration of quantized models"""
+    sample = next(
+        iter(
+            make_reverb_dataset(
+                server_address, table, num_samples, schema=schema, map_func=map_func
+            )
+        )
+    )
+    return sample.data["observation"].numpy()
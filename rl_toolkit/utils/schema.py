@@ -0,0 +1,120 @@
+import numpy as np
+import tensorflow as tf
+
+
+class ReplaySchema:
+    """
+    Replay schema
+    =================
+
+    Storage dtypes of the experience table. The agents encode the observations and rewards by NumPy
+    before the insertion, the learners decode the sampled batches inside the tf.data pipeline.
+    The `bfloat16` rewards are stored as the upper halves of their float32 bits (`uint16`),
+    only the float observations are quantized (the `uint8` frames are kept).
+
+    With `sequence_length` the frame-stacked episodes are stored as the contiguous rows and each item is
+    the window of `sequence_length` transitions, the learner picks one transition of the window
+    (`SequenceTransitions`). The table keeps `sequence_length` times fewer items.
+
+    Attributes:
+        reward_dtype (str): dtype of the stored rewards (`float64`, `float32` or `bfloat16`)
+        observation_dtype (str): dtype of the stored float observations (`float16` or `int8`), `None` keeps the env dtype
+        observation_scale (float): quantization step of the `int8` observations, `observation = observation_scale * stored`
+        sequence_length (int): number of transitions per item, `0` stores each transition as the item
+    """
+
+    def __init__(
+        self,
+        reward_dtype: str = "float64",
+        observation_dtype: str = None,
+        observation_scale: float = 1.0,
+        sequence_length: int = 0,
+    ):
+        if reward_dtype not in ("float64", "float32", "bfloat16"):
+            raise ValueError(f"Unsupported reward dtype: {reward_dtype}")
+        if observation_dtype not in (None, "float16", "int8"):
+            raise ValueError(f"Unsupported observation dtype: {observation_dtype}")
+        if sequence_length < 0:
+            raise ValueError("The sequence length must be non-negative")
+
+        self.reward_dtype = reward_dtype
+        self.observation_dtype = observation_dtype
+        self.observation_scale = observation_scale
+        self.sequence_length = sequence_length
+
+    def _stored_observation_dtype(self, dtype):
+        if self.observation_dtype is None or not np.issubdtype(dtype, np.floating):
+            return np.dtype(dtype)
+        return np.dtype(self.observation_dtype)
+
+    def signature(self, observation_space, action_space, n_step: int = 1):
+        observation = tf.TensorSpec(
+            [*observation_space.shape],
+            self._stored_observation_dtype(observation_space.dtype),
+        )
+        reward_dtype = (
+            tf.uint16 if self.reward_dtype == "bfloat16" else self.reward_dtype
+        )
+        if self.sequence_length:
+            # The frames of the window and the raw rewards of its n-step returns
+            frames = self.sequence_length + n_step + observation.shape[0] - 1
+            steps = self.sequence_length + n_step - 1
+            return {
+                "observation": tf.TensorSpec(
+                    [frames, *observation.shape[1:]], observation.dtype
+                ),
+                "action": tf.TensorSpec(
+                    [self.sequence_length, *action_space.shape], action_space.dtype
+                ),
+                "ext_reward": tf.TensorSpec([steps, 1], reward_dtype),
+                "terminal": tf.TensorSpec([steps, 1], tf.bool),
+                "valid": tf.TensorSpec([steps, 1], tf.bool),
+            }
+        return {
+            "observation": observation,
+            "action": tf.TensorSpec([*action_space.shape], action_space.dtype),
+            "ext_reward": tf.TensorSpec([1], reward_dtype),
+            "next_observation": observation,
+            "terminal": tf.TensorSpec([1], tf.bool),
+        }
+
+    @staticmethod
+    def bytes_per_item(signature):
+        """Size of the item's tensors, the frames shared by the items are stored once"""
+        return sum(
+            spec.shape.num_elements() * spec.dtype.size for spec in signature.values()
+        )
+
+    def encode_observation(self, observation):
+        dtype = self._stored_observation_dtype(observation.dtype)
+        if dtype == observation.dtype:
+            return observation
+        if dtype == np.int8:
+            return np.clip(
+                np.rint(observation / self.observation_scale), -127, 127
+            ).astype(np.int8)
+        return observation.astype(dtype)
+
+    def encode_reward(self, reward):
+        if self.reward_dtype == "bfloat16":
+            # Rounded to the nearest even
+            bits = np.asarray(reward, dtype=np.float32).view(np.uint32)
+            bits = bits + 0x7FFF + ((bits >> 16) & 1)
+            return (bits >> 16).astype(np.uint16)
+        return np.asarray(reward, dtype=self.reward_dtype)
+
+    def decode(self, sample):
+        """The float32 observations and rewards of the sampled batch"""
+        data = dict(sample.data)
+        for key in ("observation", "next_observation"):
+            if key not in data:
+                continue
+            if data[key].dtype == tf.int8:
+                data[key] = tf.cast(data[key], tf.float32) * self.observation_scale
+            elif data[key].dtype == tf.float16:
+                data[key] = tf.cast(data[key], tf.float32)
+
+        if data["ext_reward"].dtype == tf.uint16:
+            data["ext_reward"] = tf.bitcast(data["ext_reward"], tf.bfloat16)
+        data["ext_reward"] = tf.cast(data["ext_reward"], tf.float32)
+        return sample._replace(data=data)
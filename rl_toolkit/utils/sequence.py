@@ -0,0 +1,176 @@
+import numpy as np
+import tensorflow as tf
+
+from .schema import ReplaySchema
+
+
+class SequenceWriter:
+    """
+    Sequence writer
+    =================
+
+    Writes the frame-stacked episode of one sub-environment as the contiguous rows, one frame per row.
+    The row of the step holds its last frame, action, raw reward and terminal flag, the first step is preceded
+    by the older frames of its stack. Every `sequence_length` transitions are inserted as one item,
+    which references the frames and rewards the transitions need (`ReplaySchema.signature`).
+    The last item of the episode is filled by the invalid rows holding the final frame.
+
+    Attributes:
+        writer (reverb.TrajectoryWriter): the writer keeping at least `num_keep_alive_refs` rows
+        schema (ReplaySchema): storage dtypes and the sequence length
+        frame_stack (int): number of stacked frames
+        n_step (int): number of rewards summed into the return of the transition
+        tables (list): the names of tables receiving the items
+    """
+
+    def __init__(
+        self,
+        writer,
+        schema: ReplaySchema,
+        frame_stack: int,
+        n_step: int = 1,
+        tables: list = ("experience",),
+    ):
+        self._writer = writer
+        self._schema = schema
+        self._frame_stack = frame_stack
+        self._n_step = n_step
+        self._tables = tables
+
+        self._sequence_length = schema.sequence_length
+        self._num_frames = self._sequence_length + n_step + frame_stack - 1
+        self._num_steps = self._sequence_length + n_step - 1
+
+        self._episode_steps = 0
+        self._item_start = 0
+        self._padding = None
+
+    @staticmethod
+    def num_keep_alive_refs(sequence_length: int, frame_stack: int, n_step: int = 1):
+        return sequence_length + n_step + frame_stack - 1
+
+    def append(self, observation, action, ext_reward, terminal):
+        """Append the step taken from the stacked `observation`"""
+        if self._episode_steps == 0:
+            for frame in observation[:-1]:
+                self._writer.append(
+                    {"observation": self._schema.encode_observation(frame)}
+                )
+
+        self._writer.append(
+            {
+                "observation": self._schema.encode_observation(observation[-1]),
+                "action": action,
+                "ext_reward": self._schema.encode_reward([ext_reward]),
+                "terminal": np.array([terminal]),
+                "valid": np.array([True]),
+            }
+        )
+        self._episode_steps += 1
+
+        # The last transition of the item is bootstrapped from the frames ending by this step
+        last_step = self._item_start + self._sequence_length + self._n_step - 1
+        if self._episode_steps - 1 == last_step:
+            self._create_item()
+
+        if self._padding is None:
+            self._padding = {
+                "action": np.zeros_like(action),
+                "ext_reward": self._schema.encode_reward([0.0]),
+                "terminal": np.array([False]),
+                "valid": np.array([False]),
+            }
+
+    def end_episode(self, final_observation, terminated: bool):
+        """Write the final frame and the items of the remaining transitions"""
+        padding = {
+            **self._padding,
+            "observation": self._schema.encode_observation(final_observation[-1]),
+        }
+        self._writer.append(padding)
+        num_steps = self._episode_steps + 1
+
+        # The n-step returns of the truncated episode's last steps are incomplete
+        last_valid = self._episode_steps - (1 if terminated else self._n_step)
+        while self._item_start <= last_valid:
+            last_step = self._item_start + self._sequence_length + self._n_step - 1
+            while num_steps <= last_step:
+                self._writer.append(padding)
+                num_steps += 1
+            self._create_item()
+
+        self._episode_steps = 0
+        self._item_start = 0
+
+    def _create_item(self):
+        """The window ends by the frame of the last transition's bootstrap step"""
+        history = self._writer.history
+        start, end = -(self._num_steps + 1), -1
+        trajectory = {
+            "observation": history["observation"][-self._num_frames :],
+            "action": history["action"][start : -self._n_step],
+            "ext_reward": history["ext_reward"][start:end],
+            "terminal": history["terminal"][start:end],
+            "valid": history["valid"][start:end],
+        }
+        for table in self._tables:
+            self._writer.create_item(table=table, priority=1.0, trajectory=trajectory)
+        self._item_start += self._sequence_length
+
+
+class SequenceTransitions:
+    """
+    Sequence transitions
+    =================
+
+    Maps the batch of sampled windows (`SequenceWriter`) to the batch of transitions of the per-step layout,
+    one uniformly chosen transition per window. The n-step return ends at the terminal step,
+    the transitions of the truncated episode's last steps are never chosen.
+
+    Attributes:
+        frame_stack (int): number of stacked frames
+        n_step (int): number of rewards summed into the return of the transition
+        gamma (float): the discount factor
+    """
+
+    def __init__(self, frame_stack: int, n_step: int = 1, gamma: float = 0.99):
+        self._frame_stack = frame_stack
+        self._n_step = n_step
+        self._discounts = tf.constant(gamma ** np.arange(n_step), dtype=tf.float32)
+
+    def __call__(self, sample):
+        data = sample.data
+        sequence_length = data["action"].shape[1]
+
+        # Rows of the n-step return of each transition [sequence_length, n_step]
+        rows = np.arange(sequence_length)[:, None] + np.arange(self._n_step)[None, :]
+        valid = tf.gather(data["valid"][..., 0], rows, axis=1)
+        terminal = tf.gather(data["terminal"][..., 0], rows, axis=1)
+        ext_reward = tf.gather(data["ext_reward"][..., 0], rows, axis=1)
+
+        # The steps before the end of episode
+        alive = tf.math.cumprod(tf.cast(valid, tf.float32), axis=-1, exclusive=False)
+        after_terminal = tf.math.cumsum(
+            tf.cast(terminal, tf.float32), axis=-1, exclusive=True
+        )
+        alive *= tf.cast(after_terminal == 0.0, tf.float32)
+
+        returns = tf.reduce_sum(ext_reward * alive * self._discounts, axis=-1)
+        terminated = tf.reduce_any(terminal & (alive > 0.0), axis=-1)
+        complete = tf.reduce_all(valid, axis=-1) | terminated
+
+        # Uniform choice of the valid transition
+        logits = tf.where(valid[..., 0] & complete, 0.0, -np.inf)
+        index = tf.random.categorical(logits, 1, dtype=tf.int32)
+
+        stack = index + tf.range(self._frame_stack)[None, :]
+        transition = {
+            "observation": tf.gather(data["observation"], stack, batch_dims=1),
+            "action": tf.gather(data["action"], index[:, 0], batch_dims=1),
+            "ext_reward": tf.gather(returns, index, batch_dims=1),
+            "next_observation": tf.gather(
+                data["observation"], stack + self._n_step, batch_dims=1
+            ),
+            "terminal": tf.gather(terminated, index, batch_dims=1),
+        }
+        return sample._replace(data=transition)
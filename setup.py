@@ -9,8 +9,9 @@ with open("README.md", "r", encoding="utf-8") as fh:
     long_description += fh.read()
 
 extras = {
-    "all": ["dm-reverb", "flappy-bird-gymnasium"],
+    "all": ["dm-reverb", "flappy-bird-gymnasium", "pyserial"],
     "reverb": ["dm-reverb"],
+    "robot": ["pyserial"],
     "tf": ["tensorflow==2.14.0"],
 }
 
@@ -46,7 +47,7 @@ setup(
         "wandb",
     ],
     install_requires=[
-        "gymnasium",
+        "gymnasium>=1.1",
         "box2d-py",
         "pygame",
         "swig",
@@ -0,0 +1,44 @@
+import gymnasium
+
+from rl_toolkit.core.env import make_vector_env
+from rl_toolkit.core.wrappers import ActionRepeat
+
+
+def test_action_repeat():
+    repeat = 4
+    env = ActionRepeat(gymnasium.make("CartPole-v1"), repeat)
+    reference = gymnasium.make("CartPole-v1")
+
+    env.reset(seed=0)
+    reference.reset(seed=0)
+
+    total_reward, total_steps = 0.0, 0
+    terminated = truncated = False
+    while not (terminated or truncated):
+        ob, reward, terminated, truncated, _ = env.step(1)
+        total_reward += reward
+
+        # The same action is repeated, the repetition stops on the end of episode
+        for _ in range(repeat):
+            ref_ob, _, ref_terminated, ref_truncated, _ = reference.step(1)
+            total_steps += 1
+            if ref_terminated or ref_truncated:
+                break
+        assert (ob == ref_ob).all()
+        assert terminated == ref_terminated
+
+    # The reward of each step is summed
+    assert total_reward == total_steps
+
+
+def test_vector_action_repeat():
+    repeat = 4
+    vec_env = make_vector_env("CartPole-v1", 2, 1, action_repeat=repeat)
+    vec_env.reset(seed=0)
+
+    # Every sub-environment repeats the action
+    _, reward, terminated, truncated, _ = vec_env.step(vec_env.action_space.sample())
+    assert not (terminated | truncated).any()
+    assert list(reward) == [repeat, repeat]
+    assert all(isinstance(env, ActionRepeat) for env in vec_env.envs)
+    vec_env.close()
@@ -1,4 +1,17 @@
+import queue
+
+import portpicker
+import numpy as np
+import pytest
+import reverb
+import tensorflow as tf
+
+import rl_toolkit.agents.sac.agent as agent_module
+from rl_toolkit.agents.sac import Agent as AgentProcess
+from rl_toolkit.agents.sac import Server
 from rl_toolkit.agents.sac import Tester as Agent
+from rl_toolkit.core.prefill import Prefill
+from rl_toolkit.utils import ReplaySchema, make_reverb_dataset, make_trajectory_writer
 
 
 def test_pre_trained():
@@ -39,3 +52,170 @@ def test_random():
         agent.run()
     finally:
         agent.close()
+
+
+def _make_server(frame_stack=1):
+    # Without the learner the inserts are not rate-limited
+    return Server(
+        env_name="Pendulum-v1",
+        port=portpicker.pick_unused_port(),
+        actor_units=[8],
+        critic_units=[8],
+        clip_mean_min=-2.0,
+        clip_mean_max=2.0,
+        n_quantiles=5,
+        top_quantiles_to_drop=1,
+        n_critics=2,
+        gamma=0.99,
+        tau=0.01,
+        init_alpha=1.0,
+        init_noise=-1.0,
+        merge_index=0,
+        frame_stack=frame_stack,
+        min_replay_size=1,
+        max_replay_size=1000,
+        samples_per_insert=0,
+        actor_critic_path=None,
+        db_path=None,
+    )
+
+
+def _make_agent(env_name, port, frame_stack=1, **kwargs):
+    return AgentProcess(
+        env_name=env_name,
+        db_server=f"localhost:{port}",
+        actor_units=[8],
+        clip_mean_min=-2.0,
+        clip_mean_max=2.0,
+        init_noise=-1.0,
+        warmup_steps=64,
+        env_steps=8,
+        frame_stack=frame_stack,
+        save_path=None,
+        stats_queue=queue.Queue(),
+        **kwargs,
+    )
+
+
+def test_pipelined():
+    server = _make_server()
+    agent = _make_agent("Pendulum-v1", server.server.port, num_envs=2, pipelined=True)
+    agent._stop_agents.assign(True)
+    try:
+        agent.run()
+    finally:
+        agent.close()
+
+    # Each step of the rollouts is recorded, the last step of each sub-environment waits for its item
+    assert agent._total_steps == 64
+    info = server.server.localhost_client().server_info()
+    assert info["experience"].current_size == 64 - 2 * 2
+    server.server.stop()
+
+
+def test_real_time_env():
+    # The robot is connected and stepped by the agent's process only
+    with pytest.raises(ValueError):
+        _make_agent("HumanoidRobot-v0", 0, pipelined=True)
+    with pytest.raises(ValueError):
+        _make_agent("HumanoidRobot-v0", 0, num_envs=2)
+
+
+def test_prefill():
+    server = _make_server(frame_stack=2)
+    port = server.server.port
+    prefill = Prefill(
+        env_name="Pendulum-v1",
+        db_server=f"localhost:{port}",
+        frame_stack=2,
+        num_steps=64,
+        num_workers=1,
+        num_envs=2,
+        batch_size=16,
+    )
+    try:
+        prefill.run()
+    finally:
+        prefill.close()
+
+    # The last step of each sub-environment waits for its item
+    client = reverb.Client(f"localhost:{port}")
+    assert client.server_info()["experience"].current_size == 64 - 2
+
+    # The stacked observations are rebuilt from the single frames
+    signature = client.server_info()["experience"].signature
+    for sample in client.sample("experience", num_samples=16, emit_timesteps=False):
+        data = tf.nest.pack_sequence_as(signature, sample.data)
+        assert data["observation"].shape == (2, 3)
+        assert data["next_observation"].shape == (2, 3)
+        np.testing.assert_array_equal(
+            data["observation"][1], data["next_observation"][0]
+        )
+
+    # The prefilled transitions replace the warmup steps
+    agent = _make_agent("Pendulum-v1", port, frame_stack=2, num_envs=2)
+    agent._stop_agents.assign(True)
+    try:
+        agent.run()
+    finally:
+        agent.close()
+    assert agent._total_steps == 16
+    server.server.stop()
+
+
+class _RecordingWriter:
+    """Records the shapes of the appended observations"""
+
+    def __init__(self, writer, shapes):
+        self._writer = writer
+        self._shapes = shapes
+
+    def __getattr__(self, name):
+        return getattr(self._writer, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return self._writer.__exit__(*args)
+
+    def append(self, data):
+        if "observation" in data:
+            self._shapes.append(data["observation"].shape)
+        self._writer.append(data)
+
+
+def test_frame_stack_storage(monkeypatch):
+    shapes = []
+    monkeypatch.setattr(
+        agent_module,
+        "make_trajectory_writer",
+        lambda *args: _RecordingWriter(make_trajectory_writer(*args), shapes),
+    )
+    server = _make_server(frame_stack=3)
+    port = server.server.port
+    agent = _make_agent("Pendulum-v1", port, frame_stack=3)
+    agent._stop_agents.assign(True)
+    try:
+        agent.run()
+    finally:
+        agent.close()
+
+    # Each frame is stored once, the first stack is preceded by its older frames
+    assert shapes == [(3,)] * (64 + 3 - 1)
+
+    # The learner's samples are the stacks rebuilt from the single frames
+    dataset = make_reverb_dataset(
+        f"localhost:{port}",
+        "experience",
+        batch_size=16,
+        num_workers=1,
+        schema=ReplaySchema(),
+    )
+    data = next(iter(dataset)).data
+    assert data["observation"].shape == (16, 3, 3)
+    assert data["next_observation"].shape == (16, 3, 3)
+    np.testing.assert_array_equal(
+        data["observation"][:, 1:], data["next_observation"][:, :-1]
+    )
+    server.server.stop()
@@ -0,0 +1,186 @@
+import threading
+import time
+
+import numpy as np
+import portpicker
+import reverb
+import tensorflow as tf
+
+from rl_toolkit.core.aggregator import Aggregator
+from rl_toolkit.utils import InsertQueue, VariableContainer
+
+
+def _make_server():
+    signature = {
+        "observation": tf.TensorSpec([2, 3], tf.float32),
+        "ext_reward": tf.TensorSpec([1], tf.float32),
+    }
+    variables = {
+        "policy_variables": [tf.Variable(np.arange(4, dtype=np.float32))],
+        "stop_agents": tf.Variable(False),
+    }
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=1000,
+                signature=signature,
+            ),
+            reverb.Table(
+                name="variables",
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=1,
+                signature=tf.nest.map_structure(
+                    lambda variable: tf.TensorSpec(variable.shape, variable.dtype),
+                    variables,
+                ),
+            ),
+        ]
+    )
+    VariableContainer(
+        f"localhost:{server.port}", "variables", variables
+    ).push_variables()
+    return server, variables
+
+
+def _write(writer, agent, first, num_steps):
+    for step in range(first, first + num_steps):
+        writer.append(
+            {
+                "observation": np.full([3], 100 * agent + step, np.float32),
+                "ext_reward": np.array([step], np.float32),
+            }
+        )
+        if step > 0:
+            writer.create_item(
+                "experience",
+                1.0,
+                {
+                    "observation": writer.history["observation"][-2:],
+                    "ext_reward": writer.history["ext_reward"][-1],
+                },
+            )
+        writer.flush()
+
+
+def test_aggregator(monkeypatch):
+    monkeypatch.setenv("RL_TOOLKIT_AUTHKEY", "test-secret")
+    server, variables = _make_server()
+
+    # Two agents with the per-step items, the aggregator is not running yet
+    port, insert_port = portpicker.pick_unused_port(), portpicker.pick_unused_port()
+    insert_queues = [
+        InsertQueue(
+            None,
+            num_keep_alive_refs=2,
+            retry_interval=0.1,
+            aggregator=f"localhost:{insert_port}",
+        )
+        for _ in range(2)
+    ]
+    writers = [insert_queue.writer() for insert_queue in insert_queues]
+    start = time.perf_counter()
+    for agent, writer in enumerate(writers):
+        _write(writer, agent, 0, 50)
+    assert time.perf_counter() - start < 1.0
+
+    aggregator = Aggregator(
+        f"localhost:{server.port}", port, insert_port, update_interval=0.1
+    )
+    thread = threading.Thread(target=aggregator.run)
+    thread.start()
+    for insert_queue in insert_queues:
+        insert_queue.close()
+
+    # The agents read the cached variables, refreshed from the server
+    cache = {
+        "policy_variables": [tf.Variable(np.zeros(4, np.float32))],
+        "stop_agents": tf.Variable(False),
+    }
+    container = VariableContainer(f"localhost:{port}", "variables", cache)
+    container.update_variables()
+    np.testing.assert_array_equal(cache["policy_variables"][0].numpy(), np.arange(4))
+
+    variables["stop_agents"].assign(True)
+    VariableContainer(
+        f"localhost:{server.port}", "variables", variables
+    ).push_variables()
+    time.sleep(0.5)
+    container.update_variables()
+    assert bool(cache["stop_agents"].numpy())
+
+    aggregator.close()
+    thread.join()
+
+    # The steps and item slices of both agents are forwarded, not the materialized items
+    assert server.localhost_client().server_info()["experience"].current_size == 98
+    assert aggregator.num_calls == 2 * (1 + 50 + 49 + 50)
+    assert aggregator.num_streams == 2
+
+    # The agents' flushes after every step are merged into the few flushes of the merged writer
+    assert aggregator.metrics()["Insert/flushes"] < 10
+    samples = server.localhost_client().sample(
+        "experience", emit_timesteps=False, unpack_as_table_signature=True
+    )
+    for _, sample in zip(range(20), samples):
+        observation = sample.data["observation"]
+        assert observation[1, 0] - observation[0, 0] == 1.0
+        assert observation[1, 0] % 100 == sample.data["ext_reward"][0]
+    server.stop()
+
+
+def test_aggregator_restart(monkeypatch):
+    monkeypatch.setenv("RL_TOOLKIT_AUTHKEY", "test-secret")
+    server, _ = _make_server()
+    insert_port = portpicker.pick_unused_port()
+
+    def start_aggregator():
+        aggregator = Aggregator(
+            f"localhost:{server.port}",
+            portpicker.pick_unused_port(),
+            insert_port,
+            update_interval=0.1,
+        )
+        thread = threading.Thread(target=aggregator.run)
+        thread.start()
+        return aggregator, thread
+
+    aggregator, thread = start_aggregator()
+    insert_queue = InsertQueue(
+        None,
+        num_keep_alive_refs=2,
+        retry_interval=0.1,
+        aggregator=f"localhost:{insert_port}",
+    )
+    writer = insert_queue.writer()
+    _write(writer, 0, 0, 10)
+    time.sleep(0.5)
+    aggregator.close()
+    thread.join()
+
+    # The steps since the last flush continue the episode on the restarted aggregator
+    _write(writer, 0, 10, 10)
+    time.sleep(0.5)
+    aggregator, thread = start_aggregator()
+    time.sleep(0.5)
+    insert_queue.close()
+    time.sleep(0.5)
+    aggregator.close()
+    thread.join()
+
+    assert insert_queue.metrics()["Insert/reconnects"] == 1
+    client = server.localhost_client()
+    assert client.server_info()["experience"].current_size == 19
+    samples = client.sample(
+        "experience", 200, emit_timesteps=False, unpack_as_table_signature=True
+    )
+    observations = sorted(
+        {tuple(sample.data["observation"][:, 0].tolist()) for sample in samples}
+    )
+    assert observations == [(step - 1, step) for step in range(1, 20)]
+    server.stop()
@@ -0,0 +1,102 @@
+import numpy as np
+import reverb
+from tensorflow.keras.optimizers import Adam
+
+from rl_toolkit.networks.models import (
+    Actor,
+    ActorDistillation,
+    DuelingDQN,
+    DuelingDQNDistillation,
+)
+
+
+def _actor(units):
+    actor = Actor(
+        units=units,
+        n_outputs=2,
+        clip_mean_min=-2.0,
+        clip_mean_max=2.0,
+        init_noise=-1.0,
+    )
+    actor.build((None, 6))
+    return actor
+
+
+def _dqn(embed_dim):
+    dqn = DuelingDQN(
+        3,
+        num_layers=1,
+        embed_dim=embed_dim,
+        ff_mult=2,
+        num_heads=2,
+        dropout_rate=0.0,
+        attention_dropout_rate=0.0,
+        gamma=0.99,
+        tau=0.01,
+    )
+    dqn.build((None, 2, 6))
+    return dqn
+
+
+def _sample(shape):
+    observation = np.random.randn(64, *shape).astype(np.float32)
+    return reverb.ReplaySample(info=None, data={"observation": observation})
+
+
+def test_actor_distillation():
+    teacher = _actor([32, 32])
+    sample = _sample([6])
+
+    # The identical student has nothing to learn
+    student = _actor([32, 32])
+    student.set_weights(teacher.get_weights())
+    model = ActorDistillation(teacher, student)
+    model.compile(optimizer=Adam(learning_rate=1e-3))
+    metrics = model.train_step(sample)
+    assert abs(float(metrics["distillation_loss"])) < 1e-5
+    assert float(metrics["action_error"]) < 1e-5
+    assert float(metrics["agreement"]) == 1.0
+
+    # The agreement counts the deterministic actions within the tolerance, before the update
+    student = _actor([8])
+    model = ActorDistillation(teacher, student, tolerance=0.1)
+    model.compile(optimizer=Adam(learning_rate=1e-3))
+    teacher_mean, _ = teacher.distribution(sample.data["observation"])
+    student_mean, _ = student.distribution(sample.data["observation"])
+    action_error = np.max(np.abs(np.tanh(teacher_mean) - np.tanh(student_mean)), -1)
+    metrics = model.train_step(sample)
+    assert float(metrics["distillation_loss"]) > 0.0
+    np.testing.assert_allclose(
+        float(metrics["agreement"]), np.mean(action_error < 0.1), atol=1e-6
+    )
+
+    # The teacher is frozen
+    weights = [w.numpy() for w in teacher.weights]
+    model.train_step(sample)
+    for before, after in zip(weights, teacher.weights):
+        np.testing.assert_array_equal(before, after.numpy())
+
+
+def test_dueling_dqn_distillation():
+    teacher = _dqn(16)
+    sample = _sample([2, 6])
+
+    student = _dqn(16)
+    student.set_weights(teacher.get_weights())
+    model = DuelingDQNDistillation(teacher, student)
+    model.compile(optimizer=Adam(learning_rate=1e-3))
+    metrics = model.train_step(sample)
+    assert abs(float(metrics["distillation_loss"])) < 1e-6
+    assert float(metrics["agreement"]) == 1.0
+
+    # The agreement is the fraction of the same greedy actions, before the update
+    student = _dqn(8)
+    model = DuelingDQNDistillation(teacher, student)
+    model.compile(optimizer=Adam(learning_rate=1e-3))
+    agreement = np.mean(
+        np.argmax(teacher(sample.data["observation"]), axis=-1)
+        == np.argmax(student(sample.data["observation"]), axis=-1)
+    )
+    metrics = model.train_step(sample)
+    assert float(metrics["distillation_loss"]) > 0.0
+    np.testing.assert_allclose(float(metrics["agreement"]), agreement, atol=1e-6)
@@ -0,0 +1,56 @@
+import collections
+
+import numpy as np
+
+from rl_toolkit.core.env import make_env
+
+
+def _concatenate(observation):
+    """The flattening of the observation before the precomputed layout"""
+    if isinstance(observation, collections.OrderedDict):
+        keys = observation.keys()
+    else:
+        keys = sorted(observation.keys())
+    return np.concatenate([observation[key].ravel() for key in keys])
+
+
+def _scale(env, action):
+    """The action scaling before the preallocated buffer"""
+    action = 0.5 * (action + 1.0)
+    action *= env.action_space.high - env.action_space.low
+    action += env.action_space.low
+    return action
+
+
+def _check(env_name, env_kwargs, dtype):
+    env = make_env(env_name, env_kwargs=env_kwargs)
+    assert env.observation_space.dtype == dtype
+
+    obs, _ = env.reset()
+    expected = _concatenate(env.env._task.get_observation(env.env.physics))
+    np.testing.assert_array_equal(obs, expected.astype(dtype))
+    assert obs.dtype == dtype
+
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        action = rng.uniform(-1.0, 1.0, env.action_space.shape)
+        action_copy = action.copy()
+        np.testing.assert_allclose(env.scale_action(action), _scale(env, action))
+        np.testing.assert_array_equal(action, action_copy)
+
+        # The previous observation is valid until the second next step
+        prev_obs, prev_expected = obs, expected
+        obs, *_ = env.step(action)
+        expected = _concatenate(env.env._task.get_observation(env.env.physics))
+        np.testing.assert_array_equal(obs, expected.astype(dtype))
+        np.testing.assert_array_equal(prev_obs, prev_expected.astype(dtype))
+    env.close()
+
+
+def test_flatten_observation():
+    # The physics dtype is kept by default, the scalars (e.g. the height) are assigned too
+    _check("cartpole-swingup", None, np.float64)
+    _check("walker-walk", None, np.float64)
+
+    # The matrices (e.g. the arm positions) are flattened
+    _check("manipulator-bring_ball", {"dtype": "float32"}, np.float32)
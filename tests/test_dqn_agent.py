@@ -0,0 +1,137 @@
+import queue
+
+import portpicker
+import pytest
+
+import rl_toolkit.agents.dueling_dqn.agent as agent_module
+from rl_toolkit.agents.dueling_dqn import Agent, Server
+from rl_toolkit.utils import make_trajectory_writer
+
+_MODEL = dict(
+    num_layers=1,
+    embed_dim=8,
+    ff_mult=2,
+    num_heads=2,
+    dropout_rate=0.0,
+    attention_dropout_rate=0.0,
+    gamma=0.99,
+    tau=0.01,
+    frame_stack=2,
+)
+
+
+def _make_server(**kwargs):
+    # Without the learner the inserts are not rate-limited
+    return Server(
+        env_name="CartPole-v1",
+        port=portpicker.pick_unused_port(),
+        min_replay_size=1,
+        max_replay_size=1000,
+        samples_per_insert=0,
+        model_path=None,
+        db_path=None,
+        **_MODEL,
+        **kwargs,
+    )
+
+
+def _make_agent(port, warmup_steps=64, **kwargs):
+    return Agent(
+        env_name="CartPole-v1",
+        db_server=f"localhost:{port}",
+        temp_init=1.0,
+        temp_min=0.1,
+        temp_decay=0.999,
+        warmup_steps=warmup_steps,
+        save_path=None,
+        num_envs=2,
+        env_steps=8,
+        stats_queue=queue.Queue(),
+        **_MODEL,
+        **kwargs,
+    )
+
+
+def _run(agent):
+    # The finished episodes load the variables, the agents are stopped by the server
+    agent._stop_agents.assign(True)
+    agent._variable_container.push_variables()
+    try:
+        agent.run()
+    finally:
+        agent.close()
+
+
+def test_sequence_warmup():
+    schema = {"sequence_length": 4}
+    server = _make_server(schema=schema)
+    client = server.server.localhost_client()
+    _run(_make_agent(server.server.port, schema=schema))
+    current_size = client.server_info()["experience"].current_size
+    assert current_size > 0
+
+    # The item of the sequence layout holds `sequence_length` transitions
+    agent = _make_agent(server.server.port, current_size * 4, schema=schema)
+    _run(agent)
+    assert agent._total_steps == 0
+    server.server.stop()
+
+
+class _CountingWriter:
+    """Counts the flushes of the writer"""
+
+    def __init__(self, writer, calls):
+        self._writer = writer
+        self._calls = calls
+
+    def __getattr__(self, name):
+        return getattr(self._writer, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return self._writer.__exit__(*args)
+
+    def flush(self, *args, **kwargs):
+        self._calls.append("flush")
+        self._writer.flush(*args, **kwargs)
+
+    def end_episode(self, *args, **kwargs):
+        self._calls.append("end_episode")
+        self._writer.end_episode(*args, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "flush, num_flushes",
+    [
+        # Every rollout of 8 steps, the 4 rollouts of the warmup
+        (None, 4),
+        ({"steps": 16}, 2),
+        ({"ms": 1e-3}, 4),
+        # The items are confirmed at the episode ends only
+        ({}, 0),
+    ],
+)
+def test_flush_policy(monkeypatch, flush, num_flushes):
+    calls = []
+    monkeypatch.setattr(
+        agent_module,
+        "make_trajectory_writer",
+        lambda *args: _CountingWriter(make_trajectory_writer(*args), calls),
+    )
+    server = _make_server()
+    agent = _make_agent(server.server.port, flush=flush)
+    _run(agent)
+
+    # The flushes of both sub-environments' writers
+    assert calls.count("flush") == 2 * num_flushes
+    assert calls.count("end_episode") > 0
+
+    # The time blocked by the flushes and the episode ends is logged with the episode
+    stats = agent._stats_queue.get_nowait()
+    assert stats["Flush/blocked_ms"] >= 0.0
+    assert 0.0 <= stats["Flush/blocked_fraction"] <= 1.0
+    assert stats["Flush/flushes"] >= 1
+    assert server.server.localhost_client().server_info()["experience"].current_size
+    server.server.stop()
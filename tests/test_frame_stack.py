@@ -0,0 +1,65 @@
+from collections import deque
+
+import gymnasium
+import numpy as np
+
+from rl_toolkit.core.wrappers import FrameStack, VectorFrameStack
+
+
+def test_frame_stack():
+    k = 4
+    env = FrameStack(gymnasium.make("CartPole-v1"), k)
+
+    ob, _ = env.reset(seed=0)
+    frames = deque([ob[-1]] * k, maxlen=k)
+    last_ob, last_copy = ob, ob.copy()
+
+    for t in range(200):
+        ob, _, terminated, truncated, _ = env.step(t % 2)
+        frames.append(ob[-1])
+        np.testing.assert_array_equal(ob, np.stack(frames))
+
+        # The previous observation is still valid
+        np.testing.assert_array_equal(last_ob, last_copy)
+        last_ob, last_copy = ob, ob.copy()
+
+        if terminated or truncated:
+            ob, _ = env.reset()
+            frames = deque([ob[-1]] * k, maxlen=k)
+            last_ob, last_copy = ob, ob.copy()
+
+
+def test_vector_frame_stack():
+    k, num_envs = 4, 3
+    make_env = lambda: gymnasium.make("CartPole-v1")  # noqa: E731
+    envs = VectorFrameStack(
+        gymnasium.vector.SyncVectorEnv(
+            [make_env] * num_envs,
+            autoreset_mode=gymnasium.vector.AutoresetMode.SAME_STEP,
+        ),
+        k,
+    )
+    expected = gymnasium.vector.SyncVectorEnv(
+        [lambda: FrameStack(make_env(), k)] * num_envs,
+        autoreset_mode=gymnasium.vector.AutoresetMode.SAME_STEP,
+    )
+
+    obs, _ = envs.reset(seed=0)
+    expected_obs, _ = expected.reset(seed=0)
+    last_obs, last_copy = obs, obs.copy()
+
+    for t in range(200):
+        np.testing.assert_array_equal(obs, expected_obs)
+
+        actions = np.array([(t + i) % 2 for i in range(num_envs)])
+        obs, _, terminated, truncated, info = envs.step(actions)
+        expected_obs, _, _, _, expected_info = expected.step(actions)
+
+        for i in np.flatnonzero(terminated | truncated):
+            np.testing.assert_array_equal(
+                info["final_obs"][i], expected_info["final_obs"][i]
+            )
+
+        # The previous observations are still valid
+        np.testing.assert_array_equal(last_obs, last_copy)
+        last_obs, last_copy = obs, obs.copy()
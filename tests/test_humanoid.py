@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pytest
+
+from rl_toolkit.core.env import make_env
+from rl_toolkit.core.wrappers.humanoid import HumanoidRobot
+from rl_toolkit.core.wrappers.humanoid_emulator import HumanoidEmulator
+from rl_toolkit.core.wrappers.humanoid_protocol import (
+    OBSERVATION,
+    FrameParser,
+    pack_frame,
+)
+from rl_toolkit.core.wrappers.scheduler import ControlScheduler
+
+
+def test_control_scheduler():
+    scheduler = ControlScheduler(rate=100.0)
+
+    start = time.perf_counter()
+    for _ in range(10):
+        scheduler.wait()
+    assert time.perf_counter() - start >= 0.09
+    assert scheduler.metrics()["overruns"] == 0
+
+    # The inference takes longer than the period
+    time.sleep(0.02)
+    scheduler.wait()
+    assert scheduler.metrics()["overruns"] == 1
+
+
+def test_frame_parser():
+    parser = FrameParser(OBSERVATION, 3)
+    frame = pack_frame(OBSERVATION, 7, 3, [1.0, 2.0, 3.0])
+    corrupted = bytearray(frame)
+    corrupted[-4] ^= 0xFF
+
+    # Boot log, corrupted frame and the valid frame split into two reads
+    data = b"Booting...\r\n" + bytes(corrupted) + frame
+    frames = parser.feed(data[:20]) + parser.feed(data[20:])
+
+    assert len(frames) == 1
+    seq, ack, values = frames[0]
+    assert (seq, ack) == (7, 3)
+    np.testing.assert_array_equal(values, [1.0, 2.0, 3.0])
+    assert parser.crc_errors == 1
+
+
+def test_humanoid_emulator():
+    pytest.importorskip("serial")
+
+    emulator = HumanoidEmulator(rate=200.0)
+    env = HumanoidRobot(port=emulator.port, boot_time=0.1)
+    try:
+        env.connect()
+        obs, _ = env.reset()
+        assert obs.shape == (16,)
+
+        for _ in range(5):
+            action = np.random.uniform(-1.0, 1.0, 6).astype(np.float32)
+            seq = env._set_action(action)
+            obs = env._get_obs(ack=seq)
+            np.testing.assert_array_equal(obs[:6], action)
+
+        metrics = env.link.metrics()
+        assert metrics["crc_errors"] == 0
+        assert metrics["round_trip_time_ms"] > 0.0
+    finally:
+        env.close()
+        emulator.close()
+
+
+def test_humanoid_env_kwargs():
+    # The scheduler settings are passed by `make_env` (the `Environment` section of config)
+    env = make_env(
+        "HumanoidRobot-v0",
+        env_kwargs={"port": "/dev/null", "control_rate": 50.0, "spin_time": 0.001},
+    )
+    assert env.unwrapped.port == "/dev/null"
+    assert env.unwrapped.scheduler.period == pytest.approx(0.02)
+    assert env.unwrapped.scheduler.spin_time == 0.001
+    env.close()
@@ -0,0 +1,65 @@
+import threading
+from multiprocessing import AuthenticationError
+
+import numpy as np
+import pytest
+
+from rl_toolkit.utils import InferenceClient, InferenceService
+
+
+def test_batching(monkeypatch):
+    monkeypatch.setenv("RL_TOOLKIT_AUTHKEY", "test-secret")
+    batch_sizes = []
+
+    def infer_fn(requests):
+        batch_sizes.append(len(requests))
+        return [{"action": request["observation"] * 2} for _, request in requests]
+
+    service = InferenceService(
+        port=8131, infer_fn=infer_fn, max_batch_size=4, max_wait_ms=200.0
+    )
+    responses = [None] * 4
+
+    def worker(i):
+        client = InferenceClient("localhost:8131")
+        try:
+            responses[i] = client.act({"observation": np.full((1, 3), i)})
+        finally:
+            client.close()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for w in workers:
+        w.start()
+
+    try:
+        while sum(batch_sizes) < 4:
+            service.serve()
+    finally:
+        for w in workers:
+            w.join()
+        service.close()
+
+    for i, response in enumerate(responses):
+        np.testing.assert_array_equal(response["action"], np.full((1, 3), 2 * i))
+    assert max(batch_sizes) > 1
+
+
+def test_authkey(monkeypatch):
+    # There is no default secret, the pickled messages would run the code of anyone
+    monkeypatch.delenv("RL_TOOLKIT_AUTHKEY", raising=False)
+    with pytest.raises(ValueError):
+        InferenceService(port=8132, infer_fn=None, max_batch_size=4, max_wait_ms=200.0)
+
+    # The client with the other secret is rejected
+    service = InferenceService(
+        port=8132,
+        infer_fn=None,
+        max_batch_size=4,
+        max_wait_ms=200.0,
+        authkey=b"test-secret",
+    )
+    try:
+        with pytest.raises(AuthenticationError):
+            InferenceClient("localhost:8132", authkey=b"other-secret")
+    finally:
+        service.close()
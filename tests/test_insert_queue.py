@@ -0,0 +1,149 @@
+import time
+
+import numpy as np
+import pytest
+import portpicker
+import reverb
+import tensorflow as tf
+
+from rl_toolkit.utils import InsertQueue
+
+
+def _make_server(port):
+    return reverb.Server(
+        tables=[
+            reverb.Table.queue(
+                name="experience",
+                max_size=100,
+                signature={"observation": tf.TensorSpec([2], tf.float32)},
+            )
+        ],
+        port=port,
+    )
+
+
+def _write(writer, first, num_steps, start=0):
+    for i in range(first, first + num_steps):
+        writer.append({"observation": np.float32(i)})
+        if i > start:
+            writer.create_item(
+                "experience", 1.0, {"observation": writer.history["observation"][-2:]}
+            )
+    writer.flush()
+
+
+def _items(port):
+    """The observations of the items in the order of insertion"""
+    client = reverb.Client(f"localhost:{port}")
+    num_items = client.server_info()["experience"].current_size
+    samples = client.sample("experience", num_items, emit_timesteps=False)
+    return [sample.data[0].tolist() for sample in samples]
+
+
+def test_insert_queue_restart():
+    port = portpicker.pick_unused_port()
+    server = _make_server(port)
+    insert_queue = InsertQueue(
+        f"localhost:{port}",
+        num_keep_alive_refs=2,
+        max_queue_size=4,
+        flush_timeout=0.5,
+        retry_interval=0.2,
+    )
+    writer = insert_queue.writer()
+    _write(writer, 0, 10)
+
+    # The unreachable server does not block the agent, the calls are spilled
+    time.sleep(1.0)
+    server.stop()
+    start = time.perf_counter()
+    _write(writer, 10, 10)
+    assert time.perf_counter() - start < 1.0
+    assert insert_queue.metrics()["Insert/spilled_calls"] > 0
+
+    # The items since the last flush continue the episode on the restarted server
+    time.sleep(1.0)
+    server = _make_server(port)
+    insert_queue.close()
+    metrics = insert_queue.metrics()
+    assert metrics["Insert/reconnects"] == 1
+    assert metrics["Insert/spill_bytes"] == 0
+    assert _items(port) == [[i - 1, i] for i in range(10, 20)]
+    server.stop()
+
+
+def test_insert_queue_fast_restart():
+    port = portpicker.pick_unused_port()
+    server = _make_server(port)
+    insert_queue = InsertQueue(
+        f"localhost:{port}",
+        num_keep_alive_refs=2,
+        flush_timeout=0.5,
+        retry_interval=0.2,
+    )
+    writer = insert_queue.writer()
+    _write(writer, 0, 10)
+    time.sleep(0.5)
+
+    # The restarted server answers at once, its insert counter is reset
+    server.stop()
+    server = _make_server(port)
+    _write(writer, 10, 10)
+    insert_queue.close()
+
+    assert insert_queue.metrics()["Insert/reconnects"] == 1
+    assert _items(port) == [[i - 1, i] for i in range(10, 20)]
+    server.stop()
+
+
+def test_insert_queue_error():
+    port = portpicker.pick_unused_port()
+    server = _make_server(port)
+    insert_queue = InsertQueue(
+        f"localhost:{port}", num_keep_alive_refs=2, retry_interval=0.1
+    )
+    writer = insert_queue.writer()
+
+    # The trajectory inconsistent with the table signature stops the sender
+    writer.append({"observation": np.int64(0)})
+    writer.append({"observation": np.int64(1)})
+    writer.create_item(
+        "experience", 1.0, {"observation": writer.history["observation"][-2:]}
+    )
+    writer.flush()
+    insert_queue._thread.join(5.0)
+    assert not insert_queue._thread.is_alive()
+
+    # The error is raised to the agent instead of queueing the next calls
+    with pytest.raises(ValueError):
+        writer.append({"observation": np.float32(2)})
+    with pytest.raises(ValueError):
+        insert_queue.close()
+    assert insert_queue.metrics()["Insert/spilled_calls"] == 0
+    server.stop()
+
+
+def test_insert_queue_shared():
+    port = portpicker.pick_unused_port()
+    server = _make_server(port)
+    insert_queue = InsertQueue(
+        f"localhost:{port}",
+        num_keep_alive_refs=2,
+        shared_keep_alive_refs=4,
+        flush_interval=10.0,
+    )
+    slow, fast = insert_queue.writer(), insert_queue.writer()
+
+    # The steps of the slow stream are left behind the shared keep-alive by the fast one
+    _write(slow, 0, 2)
+    _write(fast, 100, 10, start=100)
+    _write(slow, 2, 2)
+    time.sleep(0.2)
+    insert_queue.close()
+
+    # The items of both streams reference their own steps, the streams' flushes are not sent
+    assert sorted(_items(port)) == [[i - 1, i] for i in range(1, 4)] + [
+        [i - 1, i] for i in range(101, 110)
+    ]
+    assert insert_queue.metrics()["Insert/flushes"] == 1
+    server.stop()
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from rl_toolkit.networks.models import Actor
+from rl_toolkit.networks.numpy_actor import NumpyActor
+
+
+def test_numpy_actor(tmp_path):
+    actor = Actor(
+        units=[64, 32],
+        n_outputs=4,
+        clip_mean_min=-2.0,
+        clip_mean_max=2.0,
+        init_noise=-1.0,
+    )
+    actor.build((None, 24))
+
+    path = str(tmp_path / "actor.npz")
+    NumpyActor.from_actor(actor).save(path)
+    numpy_actor = NumpyActor.load(path)
+
+    inputs = np.random.randn(8, 24).astype(np.float32)
+    epsilon = actor.sample_noise(8)
+
+    np.testing.assert_allclose(
+        numpy_actor(inputs, deterministic=True),
+        actor(inputs, with_log_prob=False, deterministic=True),
+        atol=1e-5,
+    )
+    np.testing.assert_allclose(
+        numpy_actor(inputs),
+        actor(inputs, with_log_prob=False, deterministic=False),
+        atol=1e-5,
+    )
+    np.testing.assert_allclose(
+        numpy_actor(inputs, epsilon=epsilon),
+        actor(inputs, with_log_prob=False, deterministic=False, epsilon=epsilon),
+        atol=1e-5,
+    )
+
+    # Tensorflow is not needed for the inference
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, numpy as np\n"
+            "from rl_toolkit.networks.numpy_actor import NumpyActor\n"
+            f"NumpyActor.load({path!r})(np.zeros(24))\n"
+            "assert 'tensorflow' not in sys.modules",
+        ],
+        check=True,
+    )
@@ -0,0 +1,57 @@
+import gymnasium
+import numpy as np
+
+from rl_toolkit.core.wrappers import FrameStack, PixelObservation
+from rl_toolkit.networks.models import ActorCritic, DuelingDQN
+
+ENCODER = {"filters": [8, 16], "kernel_sizes": [8, 4], "strides": [4, 2], "units": 32}
+
+
+def test_pixel_observation():
+    env = FrameStack(
+        PixelObservation(gymnasium.make("CartPole-v1", render_mode="rgb_array")), 3
+    )
+    assert env.observation_space.shape == (3, 84, 84, 3)
+    assert env.observation_space.dtype == np.uint8
+
+    ob, _ = env.reset(seed=0)
+    ob, *_ = env.step(0)
+    assert ob.shape == (3, 84, 84, 3) and ob.dtype == np.uint8
+
+
+def test_conv_encoder_models():
+    frames = np.random.randint(0, 256, (4, 3, 84, 84, 3), dtype=np.uint8)
+
+    actor_critic = ActorCritic(
+        actor_units=[64, 64],
+        critic_units=[64, 64],
+        n_quantiles=5,
+        top_quantiles_to_drop=1,
+        n_critics=2,
+        n_outputs=2,
+        clip_mean_min=-2.0,
+        clip_mean_max=2.0,
+        gamma=0.99,
+        tau=0.01,
+        init_alpha=1.0,
+        init_noise=-3.0,
+        merge_index=1,
+        encoder=ENCODER,
+    )
+    actor_critic.build((None, 3, 84, 84, 3))
+    action = actor_critic.actor(frames, with_log_prob=False, deterministic=True)
+    assert action.shape == (4, 2)
+
+    dqn = DuelingDQN(
+        2,
+        num_layers=1,
+        embed_dim=16,
+        ff_mult=2,
+        num_heads=2,
+        dropout_rate=0.0,
+        attention_dropout_rate=0.0,
+        gamma=0.99,
+        tau=0.01,
+        encoder=ENCODER,
+    )
+    assert dqn(frames).shape == (4, 2)
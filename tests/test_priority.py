@@ -0,0 +1,161 @@
+import time
+
+import gymnasium
+import numpy as np
+import pytest
+import reverb
+import tensorflow as tf
+from tensorflow.keras.optimizers import Adam
+
+from rl_toolkit.networks.callbacks import PriorityCallback
+from rl_toolkit.networks.models import DuelingDQN
+from rl_toolkit.networks.models.priority import importance_weights
+from rl_toolkit.utils import PriorityUpdater, ReplaySchema, make_reverb_dataset
+
+
+def _dqn(target=None):
+    dqn = DuelingDQN(
+        3,
+        num_layers=1,
+        embed_dim=8,
+        ff_mult=2,
+        num_heads=2,
+        dropout_rate=0.0,
+        attention_dropout_rate=0.0,
+        target_dqn_model=target,
+        gamma=0.99,
+        tau=0.01,
+    )
+    dqn.build((None, 2, 6))
+    return dqn
+
+
+def test_importance_weights():
+    info = reverb.SampleInfo(
+        key=tf.constant([1, 2], tf.uint64),
+        probability=tf.constant([0.5, 0.125], tf.float64),
+        table_size=tf.constant([4, 4], tf.int64),
+        priority=tf.constant([4.0, 1.0], tf.float64),
+        times_sampled=tf.constant([1, 1], tf.int32),
+    )
+
+    # The rare items have the larger weights
+    np.testing.assert_allclose(importance_weights(info, 1.0), [0.25, 1.0])
+    np.testing.assert_allclose(importance_weights(info, 0.0), [1.0, 1.0])
+
+
+def test_priority_updater():
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Prioritized(1.0),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=10,
+            )
+        ]
+    )
+    client = server.localhost_client()
+    for i in range(4):
+        client.insert(np.float32(i), priorities={"experience": 1.0})
+    key = int(next(client.sample("experience"))[0].info.key)
+
+    updater = PriorityUpdater(f"localhost:{server.port}", batch_size=2, epsilon=0.0)
+    updater.push([key], [5.0])
+    assert updater.metrics()["priority_batches"] == 0
+
+    # The buffer is sent on the close
+    updater.close()
+    assert updater.metrics()["priority_batches"] == 1
+
+    priorities = {
+        int(sample[0].info.key): float(sample[0].info.priority)
+        for sample in client.sample("experience", num_samples=50)
+    }
+    assert priorities[key] == 5.0
+    server.stop()
+
+
+def test_priority_updater_error():
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Prioritized(1.0),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=10,
+            )
+        ]
+    )
+
+    # The failed request is raised by the learner's thread
+    updater = PriorityUpdater(f"localhost:{server.port}", table="missing", batch_size=1)
+    updater.push([1], [5.0])
+    with pytest.raises(RuntimeError):
+        for _ in range(100):
+            time.sleep(0.05)
+            updater.push([1], [5.0])
+    with pytest.raises(RuntimeError):
+        updater.close()
+    server.stop()
+
+
+def test_priority_callback():
+    schema = ReplaySchema(reward_dtype="float32")
+    signature = schema.signature(
+        gymnasium.spaces.Box(-1.0, 1.0, (2, 6), np.float32),
+        gymnasium.spaces.Discrete(3),
+    )
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Prioritized(1.0),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=100,
+                signature=signature,
+            )
+        ]
+    )
+    client = server.localhost_client()
+    rng = np.random.default_rng(0)
+    with client.trajectory_writer(1) as writer:
+        for _ in range(32):
+            writer.append(
+                {
+                    "observation": rng.standard_normal((2, 6), np.float32),
+                    "action": rng.integers(3),
+                    "ext_reward": rng.standard_normal(1, np.float32),
+                    "next_observation": rng.standard_normal((2, 6), np.float32),
+                    "terminal": np.array([False]),
+                }
+            )
+            writer.create_item(
+                "experience",
+                priority=1.0,
+                trajectory={key: column[-1] for key, column in writer.history.items()},
+            )
+
+    target = _dqn()
+    model = _dqn(target)
+    target.set_weights(model.get_weights())
+
+    # The Python calls are not allowed in the XLA-compiled step
+    model.compile(optimizer=Adam(learning_rate=1e-3), jit_compile=True)
+    dataset = make_reverb_dataset(
+        f"localhost:{server.port}", "experience", batch_size=16, schema=schema
+    )
+    callback = PriorityCallback(f"localhost:{server.port}", batch_size=32)
+    model.fit(dataset, epochs=4, steps_per_epoch=1, verbose=0, callbacks=[callback])
+    assert model.sampled_priorities is None
+
+    # The new priorities are the absolute TD errors of the sampled items
+    priorities = {
+        int(sample.info.key): float(sample.info.priority)
+        for sample in client.sample("experience", num_samples=200, emit_timesteps=False)
+    }
+    assert any(priority != 1.0 for priority in priorities.values())
+    server.stop()
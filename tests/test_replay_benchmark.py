@@ -0,0 +1,22 @@
+from rl_toolkit.core.replay_benchmark import ReplayBenchmark
+
+
+def test_replay_benchmark():
+    benchmark = ReplayBenchmark(
+        "CartPole-v1",
+        frame_stack=4,
+        num_steps=500,
+        chunk_length={"observation": 8},
+        chunk_lengths=[1, 32],
+    )
+    benchmark.run()
+    benchmark.close()
+
+    assert list(benchmark.results) == ["auto", "config", "all=1", "all=32"]
+    assert all(result["items_per_sec"] > 0 for result in benchmark.results.values())
+
+    # The longer chunks compress the redundant frames better
+    assert (
+        benchmark.results["all=32"]["bytes_per_item"]
+        < benchmark.results["all=1"]["bytes_per_item"]
+    )
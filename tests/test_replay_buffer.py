@@ -0,0 +1,99 @@
+import numpy as np
+import reverb
+import tensorflow as tf
+
+from rl_toolkit.utils import autotune_reverb_dataset, make_reverb_dataset
+
+
+def test_rebatched_dataset():
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=100,
+                signature={"observation": tf.TensorSpec([3], tf.float32)},
+            )
+        ]
+    )
+    with server.localhost_client().trajectory_writer(1) as writer:
+        for i in range(10):
+            writer.append({"observation": np.full(3, i, np.float32)})
+            writer.create_item(
+                "experience", 1.0, {"observation": writer.history["observation"][-1]}
+            )
+
+    # The batches of two workers are rebatched to the train batch
+    dataset = make_reverb_dataset(
+        f"localhost:{server.port}",
+        "experience",
+        batch_size=8,
+        num_workers=2,
+        worker_batch_size=4,
+        prefetch=2,
+    )
+    for sample in dataset.take(3):
+        assert sample.data["observation"].shape == (8, 3)
+        assert sample.info.key.shape == (8,)
+    server.stop()
+
+
+class _Regression(tf.keras.Model):
+    def __init__(self):
+        super(_Regression, self).__init__()
+        self.dense = tf.keras.layers.Dense(1)
+
+    def call(self, inputs):
+        return self.dense(inputs)
+
+    def train_step(self, sample):
+        with tf.GradientTape() as tape:
+            loss = tf.reduce_mean(tf.square(self(sample.data["observation"]) - 1.0))
+        gradients = tape.gradient(loss, self.trainable_variables)
+        self.optimizer.apply_gradients(zip(gradients, self.trainable_variables))
+        return {"loss": loss}
+
+
+def test_autotune_untrained():
+    # The training budget allows a few batches only
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.SampleToInsertRatio(
+                    samples_per_insert=1.0, min_size_to_sample=1, error_buffer=16.0
+                ),
+                max_size=100,
+                signature={"observation": tf.TensorSpec([3], tf.float32)},
+            )
+        ]
+    )
+    with server.localhost_client().trajectory_writer(1) as writer:
+        for i in range(16):
+            writer.append({"observation": np.full(3, i, np.float32)})
+            writer.create_item(
+                "experience", 1.0, {"observation": writer.history["observation"][-1]}
+            )
+
+    model = _Regression()
+    model.build((None, 3))
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.1))
+    weights = model.get_weights()
+
+    dataset, num_workers = autotune_reverb_dataset(
+        model, f"localhost:{server.port}", "experience", batch_size=8, candidates=(1, 2)
+    )
+    assert num_workers in (1, 2)
+
+    # The model is not trained by the tuning
+    for before, after in zip(weights, model.get_weights()):
+        np.testing.assert_array_equal(before, after)
+    assert int(model.optimizer.iterations) == 0
+
+    # The tuning took one batch of the budget, the training continues
+    assert next(iter(dataset)).data["observation"].shape == (8, 3)
+    server.stop()
@@ -0,0 +1,26 @@
+import numpy as np
+
+from rl_toolkit.core.returns import NStepReturn
+
+
+def test_n_step_return():
+    gamma = 0.9
+    n_step_return = NStepReturn(3, gamma)
+
+    for reward in [1.0, 2.0]:
+        n_step_return.append(reward)
+    assert not n_step_return.full
+
+    # The oldest reward is dropped
+    for reward in [3.0, 4.0]:
+        n_step_return.append(reward)
+    assert n_step_return.full
+
+    np.testing.assert_allclose(
+        n_step_return.value(), [2.0 + gamma * 3.0 + gamma**2 * 4.0]
+    )
+    np.testing.assert_allclose(n_step_return.value(1), [3.0 + gamma * 4.0])
+    np.testing.assert_allclose(n_step_return.value(2), [4.0])
+
+    n_step_return.clear()
+    assert len(n_step_return) == 0
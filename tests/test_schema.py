@@ -0,0 +1,39 @@
+import gymnasium
+import numpy as np
+import reverb
+import tensorflow as tf
+
+from rl_toolkit.utils import ReplaySchema
+
+
+def test_replay_schema():
+    schema = ReplaySchema(
+        reward_dtype="bfloat16", observation_dtype="int8", observation_scale=0.1
+    )
+    observation_space = gymnasium.spaces.Box(-np.inf, np.inf, (4,), np.float32)
+    action_space = gymnasium.spaces.Box(-1.0, 1.0, (2,), np.float32)
+
+    signature = schema.signature(observation_space, action_space)
+    assert signature["observation"].dtype == tf.int8
+    assert ReplaySchema.bytes_per_item(signature) == 4 + 8 + 2 + 4 + 1
+
+    observation = np.array([0.12, -0.5, 20.0, 0.0], np.float32)
+    reward = np.array([1.2345], np.float64)
+    sample = reverb.ReplaySample(
+        info=None,
+        data={
+            "observation": tf.constant(schema.encode_observation(observation)),
+            "next_observation": tf.constant(schema.encode_observation(observation)),
+            "ext_reward": tf.constant(schema.encode_reward(reward)),
+        },
+    )
+    data = schema.decode(sample).data
+
+    # The observations out of the int8 range are clipped
+    np.testing.assert_allclose(data["observation"], [0.1, -0.5, 12.7, 0.0], atol=1e-6)
+    np.testing.assert_allclose(data["ext_reward"], reward, rtol=1e-2)
+    assert data["ext_reward"].dtype == tf.float32
+
+    # The uint8 frames are kept
+    frame = np.zeros((8, 8, 3), np.uint8)
+    assert ReplaySchema(observation_dtype="float16").encode_observation(frame) is frame
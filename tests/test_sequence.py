@@ -0,0 +1,97 @@
+import gymnasium
+import numpy as np
+import reverb
+
+from rl_toolkit.utils import (
+    ReplaySchema,
+    SequenceTransitions,
+    SequenceWriter,
+    make_reverb_dataset,
+)
+
+
+def test_sequence_transitions():
+    frame_stack, n_step, gamma = 2, 3, 0.5
+    schema = ReplaySchema(reward_dtype="float32", sequence_length=4)
+    observation_space = gymnasium.spaces.Box(
+        -np.inf, np.inf, (frame_stack, 1), np.float32
+    )
+    signature = schema.signature(
+        observation_space, gymnasium.spaces.Discrete(4), n_step
+    )
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=100,
+                signature=signature,
+            )
+        ]
+    )
+
+    # The terminated and the truncated episode, the frame is the id of the step
+    episodes = [(0, 7, True), (100, 9, False)]
+    expected = {}
+    client = server.localhost_client()
+    num_keep_alive_refs = SequenceWriter.num_keep_alive_refs(4, frame_stack, n_step)
+    with client.trajectory_writer(num_keep_alive_refs) as writer:
+        sequence = SequenceWriter(writer, schema, frame_stack, n_step)
+        for first, length, terminated in episodes:
+            frames = [first] * (frame_stack - 1) + list(
+                range(first, first + length + 1)
+            )
+            for t in range(length):
+                observation = np.array(frames[t : t + frame_stack], np.float32)
+                sequence.append(
+                    observation[:, None],
+                    np.int64(first + t),
+                    float(t + 1),
+                    terminated and t == length - 1,
+                )
+
+                # The transitions of the per-step layout
+                k = min(n_step, length - t)
+                if k == n_step or terminated:
+                    expected[first + t] = (
+                        sum(gamma**i * (t + 1 + i) for i in range(k)),
+                        k < n_step or (terminated and t + n_step == length),
+                        frames[t + n_step : t + n_step + frame_stack],
+                    )
+
+            final_observation = np.array(frames[-frame_stack:], np.float32)[:, None]
+            sequence.end_episode(final_observation, terminated)
+            writer.end_episode()
+
+    # Two items per episode instead of the 14 transitions
+    assert client.server_info()["experience"].current_size == 4
+
+    dataset = make_reverb_dataset(
+        f"localhost:{server.port}",
+        "experience",
+        batch_size=64,
+        schema=schema,
+        map_func=SequenceTransitions(frame_stack, n_step, gamma),
+    )
+    sampled = set()
+    for sample in dataset.take(4):
+        data = sample.data
+        assert data["observation"].shape == (64, frame_stack, 1)
+        for b in range(64):
+            step = int(data["observation"][b, -1, 0])
+            ext_reward, terminal, next_frames = expected[step]
+
+            assert int(data["action"][b]) == step
+            np.testing.assert_allclose(data["ext_reward"][b], [ext_reward])
+            assert bool(data["terminal"][b, 0]) == terminal
+            if not terminal:
+                np.testing.assert_array_equal(
+                    data["next_observation"][b, :, 0], next_frames
+                )
+            sampled.add(step)
+
+    # Only the complete transitions are sampled
+    assert sampled == set(expected)
+    server.stop()
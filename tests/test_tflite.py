@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from rl_toolkit.agents.dueling_dqn import Tester as DQNTester
+from rl_toolkit.agents.sac import Tester as SACTester
+
+
+def _sac_tester(model_path=None):
+    return SACTester(
+        env_name="Pendulum-v1",
+        render=False,
+        max_steps=0,
+        frame_stack=1,
+        actor_units=[16],
+        clip_mean_min=-2.0,
+        clip_mean_max=2.0,
+        init_noise=-1.0,
+        model_path=model_path,
+        enable_wandb=False,
+    )
+
+
+def _dqn_tester(model_path=None):
+    return DQNTester(
+        env_name="CartPole-v1",
+        render=False,
+        max_steps=0,
+        num_layers=1,
+        embed_dim=8,
+        ff_mult=2,
+        num_heads=2,
+        dropout_rate=0.0,
+        attention_dropout_rate=0.0,
+        gamma=0.99,
+        tau=0.01,
+        frame_stack=2,
+        model_path=model_path,
+        enable_wandb=False,
+    )
+
+
+def test_sac_export(tmp_path):
+    tester = _sac_tester()
+    rng = np.random.default_rng(0)
+    inputs = rng.uniform(-1.0, 1.0, (8, 3)).astype(np.float32)
+    expected = np.stack([tester.policy(x) for x in inputs])
+
+    # The tester of the `.tflite` file does not build the Keras model
+    for quantization, atol in (("none", 1e-5), ("float16", 1e-2)):
+        path = str(tmp_path / f"{quantization}.tflite")
+        tester.export(path, quantization)
+        exported = _sac_tester(path)
+        assert exported.model is None
+        np.testing.assert_allclose(exported.policy(inputs), expected, atol=atol)
+        with pytest.raises(ValueError):
+            exported.export(str(tmp_path / "again.tflite"))
+        exported.close()
+
+    # The int8 model is calibrated by the observations
+    path = str(tmp_path / "int8.tflite")
+    tester.export(path, "int8", calibration_data=inputs)
+    exported = _sac_tester(path)
+    actions = exported.policy(inputs)
+    assert actions.shape == expected.shape
+    assert np.all(np.abs(actions) <= 1.0)
+    exported.close()
+    tester.close()
+
+
+def test_dqn_export(tmp_path):
+    tester = _dqn_tester()
+    rng = np.random.default_rng(0)
+    inputs = rng.uniform(-1.0, 1.0, (8, 2, 4)).astype(np.float32)
+    expected = np.stack([tester.policy(x) for x in inputs])
+
+    path = str(tmp_path / "policy.tflite")
+    tester.export(path)
+    exported = _dqn_tester(path)
+    assert exported.model is None
+    np.testing.assert_array_equal(exported.policy(inputs), expected)
+    exported.close()
+    tester.close()
@@ -0,0 +1,76 @@
+import gymnasium
+import numpy as np
+import reverb
+import tensorflow as tf
+
+from rl_toolkit.core.transitions import TransitionWriter
+from rl_toolkit.utils import ReplaySchema
+
+
+def test_transition_writer():
+    frame_stack, n_step, gamma = 2, 3, 0.5
+    schema = ReplaySchema(reward_dtype="float32")
+    observation_space = gymnasium.spaces.Box(
+        -np.inf, np.inf, (frame_stack, 1), np.float32
+    )
+    signature = schema.signature(observation_space, gymnasium.spaces.Discrete(4))
+    server = reverb.Server(
+        tables=[
+            reverb.Table(
+                name="experience",
+                sampler=reverb.selectors.Uniform(),
+                remover=reverb.selectors.Fifo(),
+                rate_limiter=reverb.rate_limiters.MinSize(1),
+                max_size=100,
+                signature=signature,
+            )
+        ]
+    )
+
+    # The terminated and the truncated episode, the frame is the id of the step
+    episodes = [(0, 7, True), (100, 9, False)]
+    expected = {}
+    client = server.localhost_client()
+    num_keep_alive_refs = TransitionWriter.num_keep_alive_refs(frame_stack, n_step)
+    with client.trajectory_writer(num_keep_alive_refs) as writer:
+        transitions = TransitionWriter(writer, schema, frame_stack, n_step, gamma)
+        for first, length, terminated in episodes:
+            frames = [first] * (frame_stack - 1) + list(
+                range(first, first + length + 1)
+            )
+            for t in range(length):
+                observation = np.array(frames[t : t + frame_stack], np.float32)
+                transitions.append(observation[:, None], np.int64(first + t), t + 1.0)
+
+                # The shorter returns are kept for the terminated episode only
+                k = min(n_step, length - t)
+                if k == n_step or terminated:
+                    expected[first + t] = (
+                        sum(gamma**i * (t + 1 + i) for i in range(k)),
+                        terminated and t + k == length,
+                        frames[t + k : t + k + frame_stack],
+                    )
+
+            final_observation = np.array(frames[-frame_stack:], np.float32)[:, None]
+            transitions.end_episode(final_observation, terminated)
+            writer.end_episode()
+
+    assert client.server_info()["experience"].current_size == len(expected)
+
+    sampled = set()
+    for sample in client.sample("experience", num_samples=256, emit_timesteps=False):
+        data = tf.nest.pack_sequence_as(signature, sample.data)
+        assert data["observation"].shape == (frame_stack, 1)
+        step = int(data["observation"][-1, 0])
+        ext_reward, terminal, next_frames = expected[step]
+
+        # The first observation of the episode is padded by its first frame
+        assert int(data["observation"][0, 0]) == max(step - 1, step // 100 * 100)
+        assert int(data["action"]) == step
+        np.testing.assert_allclose(data["ext_reward"], [ext_reward])
+        assert bool(data["terminal"][0]) == terminal
+        np.testing.assert_array_equal(data["next_observation"][:, 0], next_frames)
+        sampled.add(step)
+
+    assert sampled == set(expected)
+    server.stop()